@@ -1,10 +1,38 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 from flask_cors import CORS
+import functools
+import hashlib
+import io
+import json
+import logging
 import os
+import random
+import threading
+import time
 
-# Import analysis function
-from resume_analyzer.nlp_processor import process_resume_file
+# Import analysis function (cheap: NLP resources are loaded lazily)
+from resume_analyzer.nlp_processor import process_resume_file, SCORING_VERSION
+from resume_analyzer.sections import PARSER_VERSION
+from resume_analyzer.catalog import get_catalog, UnknownRole
+from resume_analyzer import resources
+from resume_analyzer.cache import ResultCache, make_cache_key
+from resume_analyzer.executor import AnalysisPool, JobTimeout, QueueFull
+from resume_analyzer.batch import BatchSummary, iter_batch_results, iter_zip
+from resume_analyzer.dedupe import DuplicateIndex
+from resume_analyzer.history import MAX_DAYS as HISTORY_MAX_DAYS, AnalysisHistory
+from resume_analyzer.jobs import JobStore, SQLiteJobBackend, DONE, FAILED, RUNNING
+from resume_analyzer import metrics
+from resume_analyzer.log import configure_logging
+from resume_analyzer.search import InvalidQuery, ResumeIndex, make_document
+from resume_analyzer import profiling
+from resume_analyzer.profiling import ProfileStore, run_profiled
+from resume_analyzer.scheduler import estimate_cost
+
+# Leveled, non-blocking logging; RESUME_LOG_LEVEL=off silences it
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 CORS(app)  # Allow frontend (3000) to access backend (5000)
@@ -13,11 +41,145 @@ CORS(app)  # Allow frontend (3000) to access backend (5000)
 # Configuration
 # ---------------------------------------------------------
 
-UPLOAD_FOLDER = 'temp_uploads'
 ALLOWED_EXTENSIONS = {'pdf', 'docx'}
 
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Resumes larger than this are rejected: a single-resume request with 413
+# before it is read, a file in a batch with an error record. PDFs are
+# additionally cut off at RESUME_PDF_MAX_PAGES / RESUME_PDF_MAX_CHARS
+# (see resume_analyzer/extractors.py).
+MAX_UPLOAD_MB = float(os.environ.get('RESUME_MAX_UPLOAD_MB', 10))
+MAX_UPLOAD_BYTES = int(MAX_UPLOAD_MB * 1024 * 1024)
+# Room for the other form fields (role, job description) of a single-resume request
+FORM_FIELDS_BYTES = 256 * 1024
+UPLOAD_TOO_LARGE_ERROR = f"File is too large. The maximum upload size is {MAX_UPLOAD_MB:g} MB."
+
+# Largest request body of any endpoint, i.e. of a batch (/api/analyze-batch)
+MAX_BATCH_MB = float(os.environ.get('RESUME_MAX_BATCH_MB', 200))
+app.config['MAX_CONTENT_LENGTH'] = int(MAX_BATCH_MB * 1024 * 1024)
+BATCH_TOO_LARGE_ERROR = f"Batch is too large. The maximum batch upload size is {MAX_BATCH_MB:g} MB."
+
+# Analysis errors, shared with the ASGI server (asgi.py)
+NO_FILE_ERROR = "No file part. Use key 'resumeFile'."
+INVALID_FILE_ERROR = "Invalid file or unsupported format. Please upload PDF or DOCX files only."
+BUSY_ERROR = "Server is busy analyzing other resumes. Please retry shortly."
+TIMEOUT_ERROR = "Resume analysis took too long. Please upload a smaller or simpler file."
+
+# Longest 'jobDescription' accepted for job description matching, in characters
+JD_MAX_CHARS = int(os.environ.get('RESUME_JD_MAX_CHARS', 20000))
+
+# NLP warm-up: "background" loads models in a thread so the worker can
+# serve /api/health immediately, "eager" blocks startup until they are
+# loaded, "lazy" loads them on the first analysis request.
+NLP_WARMUP = os.environ.get('RESUME_NLP_WARMUP', 'background')
+
+if NLP_WARMUP == 'eager':
+    resources.warm_up(background=False)
+elif NLP_WARMUP == 'background':
+    resources.warm_up(background=True)
+
+# Result cache keyed by upload content + job role + scoring version. It
+# also keeps each upload's parsed resume (keyed by content + parser
+# version), so scoring it for another role or scoring version skips text
+# extraction. Set RESUME_CACHE_DB to a file path to share cached results between workers.
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('RESUME_CACHE_SIZE', 512)),
+    ttl_seconds=int(os.environ.get('RESUME_CACHE_TTL', 3600)),
+    db_path=os.environ.get('RESUME_CACHE_DB') or None,
+    db_max_entries=int(os.environ.get('RESUME_CACHE_DB_SIZE', 10000)),
+)
+
+# Set RESUME_INDEX_DB to a file path to make analyzed resumes searchable
+# (/api/search); every worker writes to the same index.
+INDEX_DB = os.environ.get('RESUME_INDEX_DB') or None
+resume_index = ResumeIndex(INDEX_DB) if INDEX_DB else None
+SEARCH_MAX_RESULTS = 100
+
+# Set RESUME_HISTORY_DB to a file path to keep the history of analyses and
+# serve its aggregates (/api/stats); every worker writes to the same file.
+HISTORY_DB = os.environ.get('RESUME_HISTORY_DB') or None
+analysis_history = AnalysisHistory(HISTORY_DB) if HISTORY_DB else None
+
+# Most roles a single analysis may rank the resume against ('topRoles')
+TOP_ROLES_MAX = 50
+
+# Request profiling (see resume_analyzer/profiling.py), off unless
+# RESUME_PROFILE_SECRET is set. An analysis request carrying the secret in
+# an X-Profile header or ?profile= runs under cProfile (or the stack
+# sampler with ?profileFormat=collapsed) and links its profile in the
+# result; RESUME_PROFILE_SAMPLE_RATE of all other analyses run under the
+# stack sampler, and the RESUME_PROFILE_KEEP slowest of those are kept.
+# Profiles are listed on /api/profiles (same secret).
+PROFILE_SECRET = os.environ.get('RESUME_PROFILE_SECRET') or None
+PROFILE_SAMPLE_RATE = float(os.environ.get('RESUME_PROFILE_SAMPLE_RATE', 0.01))
+profile_store = ProfileStore(keep=int(os.environ.get('RESUME_PROFILE_KEEP', 20)))
+
+# Analyses run in a process pool (0 workers = inline in the request thread).
+# When the queue is full, requests get 503 + Retry-After instead of waiting.
+ANALYSIS_WORKERS = int(os.environ.get('RESUME_ANALYSIS_WORKERS', os.cpu_count() or 1))
+ANALYSIS_QUEUE_SIZE = int(os.environ.get('RESUME_ANALYSIS_QUEUE', 4 * max(1, ANALYSIS_WORKERS)))
+ANALYSIS_TIMEOUT = float(os.environ.get('RESUME_ANALYSIS_TIMEOUT', 30))
+
+_analysis_pool = None
+_analysis_pool_lock = threading.Lock()
+
+# The pool's fair scheduler shares it out by client: the address a request
+# comes from or, behind RESUME_PROXY_HOPS trusted reverse proxies, the
+# address they put in X-Forwarded-For. With RESUME_CLIENT_HEADER set (e.g.
+# X-API-Key), requests carrying that header are told apart by its value
+# instead; set it only when a gateway in front checks the header, or a
+# client could send a fresh value with every request.
+PROXY_HOPS = int(os.environ.get('RESUME_PROXY_HOPS', 0))
+CLIENT_HEADER = os.environ.get('RESUME_CLIENT_HEADER') or None
+if PROXY_HOPS > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS)
+
+# Without a pool, each async analysis runs on a thread of its own; beyond
+# RESUME_ASYNC_INLINE_JOBS running at once, requests get 503 + Retry-After
+# like a full pool queue.
+ASYNC_INLINE_JOBS = int(os.environ.get('RESUME_ASYNC_INLINE_JOBS', 2 * (os.cpu_count() or 1)))
+ASYNC_INLINE_RETRY_AFTER = 2
+_inline_jobs = threading.BoundedSemaphore(max(1, ASYNC_INLINE_JOBS))
+
+# Async analyses (POST /api/analyze-resume?async=1) are tracked as jobs
+# that clients poll (/api/jobs/<id>) or stream (/api/jobs/<id>/events).
+# With several server workers the jobs must be in a file they all share:
+# RESUME_JOB_DB, else the result cache's RESUME_CACHE_DB (the production
+# server sets one up when it runs more than one worker).
+JOB_DB = os.environ.get('RESUME_JOB_DB') or os.environ.get('RESUME_CACHE_DB') or None
+job_store = JobStore(
+    backend=SQLiteJobBackend(JOB_DB) if JOB_DB else None,
+    ttl_seconds=int(os.environ.get('RESUME_JOB_TTL', 3600)),
+    max_jobs=int(os.environ.get('RESUME_JOB_MAX', 10000)),
+)
+
+
+# ---------------------------------------------------------
+# Metrics (served on /api/metrics)
+# ---------------------------------------------------------
+# Stage timings (resume_stage_seconds) are recorded with metrics.span()
+# here and in the analyzer; worker processes send theirs back with each
+# result.
+
+REQUEST_SECONDS = metrics.Summary(
+    'resume_request_seconds', 'HTTP request latency in seconds', ('endpoint', 'status'))
+ANALYSES = metrics.Counter(
+    'resume_analyses_total', 'Analysis requests by file type and outcome', ('file_type', 'outcome'))
+
+
+def _pool_gauge(field):
+    return lambda: {(): _analysis_pool.stats()[field]} if _analysis_pool else {}
+
+
+metrics.Gauge('resume_analysis_queue_depth', 'Analyses waiting for a worker', collect=_pool_gauge('queueDepth'))
+metrics.Gauge('resume_analysis_running', 'Analyses running in workers', collect=_pool_gauge('running'))
+metrics.Gauge('resume_nlp_state', 'NLP resource state (1 for the current state)', ('state',), collect=lambda: {
+    (state,): int(resources.status()["status"] == state)
+    for state in (resources.COLD, resources.LOADING, resources.READY, resources.FAILED)
+})
+metrics.Gauge('resume_cache_entries', 'Results held in the in-memory cache',
+              collect=lambda: {(): result_cache.stats()["size"]})
+metrics.Gauge('resume_jobs', 'Async analysis jobs held in the job store',
+              collect=lambda: {(): job_store.stats()["jobs"]})
 
 
 # ---------------------------------------------------------
@@ -32,113 +194,709 @@ def allowed_file(filename):
     )
 
 
+def count_analysis(filename, outcome):
+    """Counts an analysis request by file type and outcome."""
+    extension = filename.rsplit('.', 1)[-1].lower() if filename and '.' in filename else ''
+    ANALYSES.inc(file_type=extension if extension in ALLOWED_EXTENSIONS else 'other', outcome=outcome)
+
+
+def json_response(body):
+    """jsonify() timed as the serialization stage."""
+    with metrics.span("serialization"):
+        return jsonify(body)
+
+
+def get_analysis_pool():
+    """Creates the analysis process pool on first use (i.e. after any server fork)."""
+    global _analysis_pool
+    if ANALYSIS_WORKERS <= 0:
+        return None
+    with _analysis_pool_lock:
+        if _analysis_pool is None:
+            _analysis_pool = AnalysisPool(
+                workers=ANALYSIS_WORKERS,
+                queue_size=ANALYSIS_QUEUE_SIZE,
+                timeout=ANALYSIS_TIMEOUT,
+            )
+        return _analysis_pool
+
+
+def requested_role():
+    """
+    The job role named by the request ('role' form field or query parameter),
+    resolved against the catalog. Raises UnknownRole.
+    """
+    return get_catalog().resolve(request.form.get('role') or request.args.get('role'))
+
+
+def requested_job_description():
+    """The optional 'jobDescription' form field, see parse_job_description."""
+    return parse_job_description(request.form.get('jobDescription'))
+
+
+def parse_job_description(value):
+    """
+    A 'jobDescription' value, stripped (None if absent or blank). Raises
+    ValueError if it is longer than JD_MAX_CHARS.
+    """
+    job_description = (value or '').strip()
+    if len(job_description) > JD_MAX_CHARS:
+        raise ValueError(f"Job description is too long. The maximum is {JD_MAX_CHARS} characters.")
+    return job_description or None
+
+
+def requested_top_roles():
+    """The optional 'topRoles' form field or query parameter, see parse_top_roles."""
+    return parse_top_roles(request.form.get('topRoles') or request.args.get('topRoles'))
+
+
+def parse_top_roles(value):
+    """
+    A 'topRoles' value: how many best fitting catalog roles to list (None
+    if absent). Raises ValueError unless it is a number from 1 to
+    TOP_ROLES_MAX.
+    """
+    if not value:
+        return None
+    try:
+        top_roles = int(value)
+    except ValueError:
+        top_roles = 0
+    if not 1 <= top_roles <= TOP_ROLES_MAX:
+        raise ValueError(f"topRoles must be a number from 1 to {TOP_ROLES_MAX}.")
+    return top_roles
+
+
+def client_id():
+    """Who the analysis pool's fair scheduler treats as the submitter of this request, see client_key."""
+    return client_key(request.remote_addr, request.headers.get(CLIENT_HEADER) if CLIENT_HEADER else None)
+
+
+def client_key(address, header_value=None):
+    """The scheduler's client for a request: its RESUME_CLIENT_HEADER value if it has one, else its address."""
+    return f"key:{header_value}" if header_value else address
+
+
+def forwarded_address(address, forwarded_for):
+    """
+    The client address behind PROXY_HOPS proxies given an X-Forwarded-For
+    value, as ProxyFix finds it (`address` if the header has too few).
+    """
+    if PROXY_HOPS <= 0 or not forwarded_for:
+        return address
+    values = forwarded_for.split(',')
+    return values[-PROXY_HOPS].strip() if len(values) >= PROXY_HOPS else address
+
+
+def profile_token():
+    """The profiling secret sent with the request (X-Profile header or 'profile' query parameter), if any."""
+    return request.headers.get('X-Profile') or request.args.get('profile')
+
+
+def requested_profile_format():
+    """
+    The profiler the client asked for ('profileFormat', default pstats),
+    or None if the request is not to be profiled. Raises PermissionError
+    for a wrong secret and ValueError for an unknown format.
+    """
+    token = profile_token()
+    if not token:
+        return None
+    if not profiling.token_matches(PROFILE_SECRET, token):
+        raise PermissionError("Profiling is disabled or the profiling token is wrong.")
+    profile_format = request.args.get('profileFormat', profiling.PSTATS)
+    if profile_format not in profiling.FORMATS:
+        raise ValueError(f"profileFormat must be one of: {', '.join(profiling.FORMATS)}.")
+    return profile_format
+
+
+def role_cache_key(data, role, job_description=None, top_roles=None, digest=None):
+    """
+    Cache key for an upload scored against a role of the current catalog
+    (and a job description, and ranked against the top roles). `digest`
+    is the upload's SHA-256 hex digest, if already computed.
+    """
+    variant = f"{role.id}@{get_catalog().version}"
+    if job_description:
+        variant += "#" + hashlib.sha256(job_description.encode("utf-8")).hexdigest()[:16]
+    if top_roles:
+        variant += f"+top{top_roles}"
+    return make_cache_key(data, variant, SCORING_VERSION, digest)
+
+
+def unknown_role_response(error):
+    return jsonify({"error": str(error), "availableRoles": error.available}), 400
+
+
+def parse_cache_key(data, digest=None):
+    """Cache key for the parsed (extracted and segmented) resume of an upload, shared by all roles."""
+    return make_cache_key(data, "parsed", PARSER_VERSION, digest)
+
+
+def analysis_source(data, digest=None):
+    """The upload's cached parse if there is one (skips extraction), else its bytes."""
+    parsed = result_cache.get(parse_cache_key(data, digest))
+    return parsed if parsed is not None else data
+
+
+def run_analysis(data, filename, role=None, job_description=None, top_roles=None, profile_format=None,
+                 digest=None):
+    """
+    Analyzes uploaded bytes in the process pool, or inline if it is disabled.
+
+    With a `profile_format` the analysis runs under that profiler wherever
+    it runs, from the upload itself (so the profile includes extraction),
+    and (result, seconds, profile artifact) is returned.
+    """
+    pool = get_analysis_pool()
+    if profile_format is not None:
+        args = (io.BytesIO(data) if pool is None else data, filename, None, role, job_description, True, top_roles)
+        if pool is None:
+            return run_profiled(profile_format, process_resume_file, *args)
+        return pool.run(run_profiled, profile_format, process_resume_file, *args,
+                        cost=estimate_cost(data, filename), client=client_id())
+    source = analysis_source(data, digest)
+    if pool is None:
+        if source is data:
+            source = io.BytesIO(data)
+        return process_resume_file(source, filename=filename, role=role, job_description=job_description,
+                                   include_document=True, top_roles=top_roles)
+    return pool.run(process_resume_file, source, filename, None, role, job_description, True, top_roles,
+                    cost=estimate_cost(source, filename), client=client_id())
+
+
+def keep_parsed_resume(data, filename, result, digest=None):
+    """
+    Takes the parsed resume out of a result: it is cached for later
+    analyses of the same file (other roles, job descriptions or scoring
+    versions) and queued for the search index.
+    """
+    parsed = result.pop("parsedResume", None) if isinstance(result, dict) else None
+    if parsed is None:
+        return
+    digest = digest or hashlib.sha256(data).hexdigest()
+    result_cache.set(parse_cache_key(data, digest), parsed)
+    if resume_index is not None:
+        resume_index.add(make_document(digest, filename, result, parsed))
+
+
+def record_history(filename, result):
+    """Queues a computed (not cached) analysis for the history store, if it is enabled."""
+    if analysis_history is not None:
+        analysis_history.record(filename, result)
+
+
+def normalize_result(result):
+    """Ensures an analysis result has the fields and types the frontend expects."""
+    if not isinstance(result, dict):
+        raise ValueError("Invalid response format from analyzer.")
+
+    # Ensure required fields exist
+    required_fields = ["atsScore", "keywordSuggestions", "formattingTips"]
+    for field in required_fields:
+        if field not in result:
+            logger.warning("Missing field '%s', adding default value", field)
+            result[field] = [] if field != "atsScore" else 0
+
+    # Validate data types
+    if not isinstance(result.get("atsScore"), (int, float)):
+        result["atsScore"] = 0
+    if not isinstance(result.get("keywordSuggestions"), list):
+        result["keywordSuggestions"] = []
+    if not isinstance(result.get("formattingTips"), list):
+        result["formattingTips"] = []
+    return result
+
+
+def start_analysis_job(data, filename, cache_key, role=None, job_description=None, top_roles=None):
+    """
+    Queues an analysis as a job and returns it without waiting.
+
+    No request thread is held while it runs: the pool's slot thread
+    records progress and the result. Raises QueueFull like run_analysis,
+    or without a pool when ASYNC_INLINE_JOBS analyses are already running.
+    """
+    job = job_store.create(filename)
+    job_id = job["jobId"]
+
+    def on_progress(stage):
+        job_store.update(job_id, status=RUNNING, stage=stage)
+
+    def on_finished(result=None, error=None):
+        if error is None:
+            keep_parsed_resume(data, filename, result)
+            try:
+                result = normalize_result(result)
+            except ValueError as e:
+                error = e
+        if error is not None:
+            logger.warning("Async analysis %s failed: %s", job_id, error)
+            count_analysis(filename, 'timeout' if isinstance(error, JobTimeout) else 'error')
+            message = str(error)
+            if isinstance(error, JobTimeout):
+                message = TIMEOUT_ERROR
+            job_store.update(job_id, status=FAILED, stage=FAILED, error=message)
+            return
+        if result["atsScore"] > 0:
+            result_cache.set(cache_key, result)
+        result["cached"] = False
+        count_analysis(filename, 'ok' if result["atsScore"] > 0 else 'unreadable')
+        record_history(filename, result)
+        job_store.update(job_id, status=DONE, stage=DONE, result=result)
+
+    source = analysis_source(data)
+    pool = get_analysis_pool()
+    if pool is None:
+        if not _inline_jobs.acquire(blocking=False):
+            job_store.delete(job_id)
+            raise QueueFull(ASYNC_INLINE_RETRY_AFTER)
+
+        def run_inline():
+            try:
+                result = process_resume_file(io.BytesIO(data) if source is data else source, filename=filename,
+                                             progress=on_progress, role=role, job_description=job_description,
+                                             include_document=True, top_roles=top_roles)
+            except Exception as e:
+                on_finished(error=e)
+            else:
+                on_finished(result)
+            finally:
+                _inline_jobs.release()
+        threading.Thread(target=run_inline, name=f"analysis-job-{job_id}", daemon=True).start()
+        return job
+
+    try:
+        # The worker passes progress= itself, so the other options go by keyword too
+        analyze = functools.partial(process_resume_file, role=role, job_description=job_description,
+                                    include_document=True, top_roles=top_roles)
+        future = pool.submit(analyze, source, filename, progress=on_progress,
+                             cost=estimate_cost(source, filename), client=client_id())
+    except QueueFull:
+        job_store.delete(job_id)
+        raise
+    future.add_done_callback(
+        lambda f: on_finished(error=f.exception()) if f.exception() else on_finished(f.result())
+    )
+    return job
+
+
+def job_response(job):
+    """Public view of a job for the API."""
+    return {key: job[key] for key in ("jobId", "status", "stage", "filename", "result", "error", "createdAt", "updatedAt")}
+
+
+def accepted_job_response(job):
+    """202 response pointing the client at the job's status and event stream."""
+    job_id = job["jobId"]
+    body = job_response(job)
+    body["statusUrl"] = f"/api/jobs/{job_id}"
+    body["eventsUrl"] = f"/api/jobs/{job_id}/events"
+    response = jsonify(body)
+    response.headers['Location'] = body["statusUrl"]
+    return response, 202
+
+
 # ---------------------------------------------------------
 # Routes
 # ---------------------------------------------------------
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def record_request_time(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                endpoint=request.endpoint or 'unknown', status=response.status_code)
+    return response
+
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    """JSON error for request bodies over the endpoint's limit."""
+    if request.endpoint == 'analyze_batch_endpoint':
+        return jsonify({"error": BATCH_TOO_LARGE_ERROR}), 413
+    return jsonify({"error": UPLOAD_TOO_LARGE_ERROR}), 413
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint to verify backend is running."""
-    try:
-        # Test if analysis module can be imported
-        from resume_analyzer.nlp_processor import process_resume_file
-        return jsonify({
-            "status": "ok", 
-            "message": "Backend is running",
-            "analysis_module": "loaded"
-        }), 200
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": f"Backend running but analysis module error: {str(e)}"
-        }), 500
+    """Liveness check: the process is up and can serve requests."""
+    return jsonify(health_status()), 200
+
+
+def health_status():
+    """Body of /api/health."""
+    nlp_status = resources.status()
+    return {
+        "status": "ok",
+        "message": "Backend is running",
+        "analysis_module": "loaded",
+        "ready": nlp_status["status"] == resources.READY,
+        "nlp": nlp_status,
+        "cache": result_cache.stats(),
+        "analysisPool": _analysis_pool.stats() if _analysis_pool else None,
+        "jobs": job_store.stats(),
+        "searchIndex": resume_index.stats() if resume_index else None,
+        "history": analysis_history.status() if analysis_history else None
+    }
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness check: NLP resources are loaded and analyses will not stall."""
+    nlp_status = resources.status()
+    ready = nlp_status["status"] == resources.READY
+    return jsonify({
+        "status": "ready" if ready else "not_ready",
+        "nlp": nlp_status
+    }), 200 if ready else 503
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Counters, gauges and stage latency quantiles in Prometheus text format."""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/roles', methods=['GET'])
+def roles_endpoint():
+    """Job roles available for scoring, from the (hot-reloaded) catalog."""
+    return jsonify(get_catalog().describe())
 
 @app.route('/api/analyze-resume', methods=['POST'])
 def analyze_resume_endpoint():
-    """Handles file upload + resume analysis."""
-    print("=" * 50)
-    print("Resume Analysis Request Received")
-    print("=" * 50)
-    
+    """
+    Handles file upload + resume analysis.
+
+    An optional 'role' (form field or query parameter) selects the job role
+    from the catalog (see /api/roles); an optional 'jobDescription' form
+    field adds a "jobMatch" (TF-IDF similarity, matched and missing terms)
+    to the result, and an optional 'topRoles' count adds "roleMatches": the
+    catalog roles the resume fits best, each with its score and missing
+    keywords. With the profiling secret (X-Profile header or ?profile=)
+    the analysis skips the cache, runs under the profiler and the result
+    links the stored profile. With ?async=1 the analysis is queued
+    as a job and 202 is returned with its id; poll /api/jobs/<id> or stream
+    /api/jobs/<id>/events.
+    """
+    # One resume per request: the batch-sized app limit does not apply
+    request.max_content_length = MAX_UPLOAD_BYTES + FORM_FIELDS_BYTES
     if 'resumeFile' not in request.files:
-        print("ERROR: No file part in request")
-        return jsonify({"error": "No file part. Use key 'resumeFile'."}), 400
+        logger.info("Rejected analysis request: no file part")
+        return jsonify({"error": NO_FILE_ERROR}), 400
 
     file = request.files['resumeFile']
-    print(f"File received: {file.filename}, Content-Type: {file.content_type}")
+    logger.debug("File received: %s, Content-Type: %s", file.filename, file.content_type)
 
     if file.filename == '' or not allowed_file(file.filename):
-        print(f"ERROR: Invalid file - filename: '{file.filename}'")
-        return jsonify({"error": "Invalid file or unsupported format. Please upload PDF or DOCX files only."}), 400
+        logger.info("Rejected invalid file: '%s'", file.filename)
+        count_analysis(file.filename, 'invalid')
+        return jsonify({"error": INVALID_FILE_ERROR}), 400
 
     # -------------------------
-    # 1. Save file locally
+    # 1. Serve repeated uploads from the cache
     # -------------------------
-    filename = secure_filename(file.filename)
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    print(f"Saving file to: {filepath}")
-
     try:
-        file.save(filepath)
-        file_size = os.path.getsize(filepath)
-        print(f"File saved successfully. Size: {file_size} bytes")
-    except Exception as e:
-        import traceback
-        print(f"File save error: {e}")
-        print(traceback.format_exc())
-        return jsonify({"error": f"Could not save uploaded file: {str(e)}"}), 500
+        role = requested_role()
+    except UnknownRole as e:
+        logger.info("%s", e)
+        return unknown_role_response(e)
+    try:
+        job_description = requested_job_description()
+        top_roles = requested_top_roles()
+        profile_format = requested_profile_format()
+    except PermissionError as e:
+        return jsonify({"error": str(e)}), 403
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    with metrics.span("upload_read"):
+        data = file.read()
+    if len(data) > MAX_UPLOAD_BYTES:
+        count_analysis(file.filename, 'invalid')
+        return jsonify({"error": UPLOAD_TOO_LARGE_ERROR}), 413
+    run_async = request.args.get('async', '').lower() in ('1', 'true', 'yes')
+    if run_async and profile_format is not None:
+        return jsonify({"error": "Profiling is only available for synchronous analyses."}), 400
+    # Hashed once for the result cache, the parse cache and the search index
+    digest = hashlib.sha256(data).hexdigest()
+    cache_key = role_cache_key(data, role, job_description, top_roles, digest)
+    # A profiled request is about the analysis, not the cache
+    cached_result = result_cache.get(cache_key) if profile_format is None else None
+    if cached_result is not None:
+        logger.debug("Cache hit for %s. ATS Score: %s", file.filename, cached_result.get('atsScore', 'N/A'))
+        cached_result["cached"] = True
+        count_analysis(file.filename, 'cached')
+        if run_async:
+            job = job_store.create(file.filename)
+            job = job_store.update(job["jobId"], status=DONE, stage=DONE, result=cached_result)
+            return accepted_job_response(job)
+        return json_response(cached_result)
 
     # -------------------------
-    # 2. Process resume
+    # 2. Process resume straight from memory
     # -------------------------
+    # No temp file: nothing to clean up, and concurrent uploads with the
+    # same filename cannot overwrite each other.
     try:
-        print("Starting resume analysis...")
-        result = process_resume_file(filepath)
-        print(f"Analysis complete. ATS Score: {result.get('atsScore', 'N/A')}")
-        
+        if run_async:
+            job = start_analysis_job(data, file.filename, cache_key, role.id, job_description, top_roles)
+            logger.debug("Queued async analysis of %s as job %s", secure_filename(file.filename), job['jobId'])
+            return accepted_job_response(job)
+
+        logger.debug("Starting resume analysis of %s (%d bytes) for role '%s'",
+                     secure_filename(file.filename), len(data), role.id)
+        sampled = (profile_format is None and PROFILE_SECRET is not None
+                   and random.random() < PROFILE_SAMPLE_RATE)
+        profile = None
+        if profile_format is not None or sampled:
+            result, seconds, artifact = run_analysis(data, file.filename, role.id, job_description, top_roles,
+                                                     profile_format or profiling.COLLAPSED)
+            profile = profile_store.add(profile_format or profiling.COLLAPSED, artifact, seconds,
+                                        filename=file.filename, sampled=sampled)
+        else:
+            result = run_analysis(data, file.filename, role.id, job_description, top_roles, digest=digest)
+        keep_parsed_resume(data, file.filename, result, digest)
+
         # Validate result structure matches frontend expectations
-        if not isinstance(result, dict):
-            print("ERROR: Result is not a dictionary")
-            return jsonify({"error": "Invalid response format from analyzer."}), 500
-        
-        # Ensure required fields exist
-        required_fields = ["atsScore", "keywordSuggestions", "formattingTips"]
-        for field in required_fields:
-            if field not in result:
-                print(f"WARNING: Missing field '{field}', adding default value")
-                result[field] = [] if field != "atsScore" else 0
-        
-        # Validate data types
-        if not isinstance(result.get("atsScore"), (int, float)):
-            result["atsScore"] = 0
-        if not isinstance(result.get("keywordSuggestions"), list):
-            result["keywordSuggestions"] = []
-        if not isinstance(result.get("formattingTips"), list):
-            result["formattingTips"] = []
-        
-        print(f"Returning result: Score={result['atsScore']}, Keywords={len(result['keywordSuggestions'])}, Tips={len(result['formattingTips'])}")
-        return jsonify(result)
+        try:
+            result = normalize_result(result)
+        except ValueError as e:
+            logger.error("%s", e)
+            count_analysis(file.filename, 'error')
+            return jsonify({"error": str(e)}), 500
+
+        # Only cache successful analyses; failures may be transient
+        if result["atsScore"] > 0:
+            result_cache.set(cache_key, result)
+        result["cached"] = False
+        if profile is not None and not sampled:
+            result["profile"] = dict(profile, url=f"/api/profiles/{profile['profileId']}")
+        count_analysis(file.filename, 'ok' if result["atsScore"] > 0 else 'unreadable')
+        record_history(file.filename, result)
+
+        logger.info("Analyzed %s: score=%s, keywords=%d, tips=%d", secure_filename(file.filename),
+                    result['atsScore'], len(result['keywordSuggestions']), len(result['formattingTips']))
+        return json_response(result)
+
+    except QueueFull as e:
+        logger.warning("Analysis queue full, rejecting request: %s", e)
+        count_analysis(file.filename, 'rejected')
+        response = jsonify({"error": BUSY_ERROR})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 503
+
+    except JobTimeout as e:
+        logger.warning("Analysis timed out: %s", e)
+        count_analysis(file.filename, 'timeout')
+        return jsonify({"error": TIMEOUT_ERROR}), 504
 
     except Exception as e:
-        import traceback
-        print("=" * 50)
-        print("RESUME PROCESSING ERROR")
-        print("=" * 50)
-        print(f"Error: {e}")
-        print(traceback.format_exc())
-        print("=" * 50)
+        logger.exception("Resume processing error for %s", secure_filename(file.filename))
+        count_analysis(file.filename, 'error')
         return jsonify({"error": f"Internal server error while analyzing resume: {str(e)}"}), 500
 
-    finally:
-        # -------------------------
-        # 3. Always delete temp file
-        # -------------------------
-        try:
-            if os.path.exists(filepath):
-                os.remove(filepath)
-                print(f"Temporary file deleted: {filepath}")
-        except Exception as e:
-            print(f"Warning: Could not delete temp file: {e}")
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status_endpoint(job_id):
+    """Status, current stage and (once done) the result of an async analysis."""
+    job = job_store.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job id."}), 404
+    return jsonify(job_response(job))
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events_endpoint(job_id):
+    """
+    Server-Sent Events stream of a job's progress: a "progress" event per
+    stage (queued, extracting, scoring), then "done" with the result or
+    "failed" with the error.
+    """
+    if job_store.get(job_id) is None:
+        return jsonify({"error": "Unknown or expired job id."}), 404
+
+    def generate():
+        for job in job_store.watch(job_id):
+            if job is None:
+                yield ": keepalive\n\n"
+                continue
+            event = job["status"] if job["status"] in (DONE, FAILED) else "progress"
+            yield f"event: {event}\ndata: {json.dumps(job_response(job))}\n\n"
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def checked_batch_file(data):
+    """Loader of a batch file's bytes: raises ValueError if it is over the per-resume limit."""
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise ValueError(UPLOAD_TOO_LARGE_ERROR)
+    return data
+
+
+@app.route('/api/analyze-batch', methods=['POST'])
+def analyze_batch_endpoint():
+    """
+    Analyzes many resumes in one request: any number of 'resumeFiles'
+    (PDF, DOCX or ZIP archives of them). Results stream back as JSON Lines,
+    one record per file in completion order, then a final summary record.
+    With a 'jobDescription' the summary lists the best matching resumes.
+    With 'dedupe' set, near duplicates of a resume earlier in the request
+    are not analyzed but reported with status "duplicate". Each resume may
+    be up to RESUME_MAX_UPLOAD_MB (larger ones get an error record), the
+    whole request up to RESUME_MAX_BATCH_MB. A client's batches are
+    scheduled as a client of their own ("<client>/batch"), so they take
+    their own share of the pool's queue rather than the one its single
+    analyses need, and several of them share that one.
+    """
+    files = request.files.getlist('resumeFiles')
+    if not files:
+        return jsonify({"error": "No files. Use key 'resumeFiles' (PDF, DOCX or ZIP)."}), 400
+    try:
+        role = requested_role()
+    except UnknownRole as e:
+        return unknown_role_response(e)
+    try:
+        job_description = requested_job_description()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    inputs = []
+    for file in files:
+        if file.filename.lower().endswith('.zip'):
+            try:
+                inputs.extend(iter_zip(io.BytesIO(file.read()), max_file_bytes=MAX_UPLOAD_BYTES))
+            except Exception as e:
+                return jsonify({"error": f"Could not read zip archive '{file.filename}': {e}"}), 400
+        elif allowed_file(file.filename):
+            # Read now (the upload is closed when the response streams), but no more than is allowed
+            inputs.append((file.filename, functools.partial(checked_batch_file, file.read(MAX_UPLOAD_BYTES + 1))))
+        else:
+            return jsonify({"error": f"Unsupported file '{file.filename}'. Upload PDF, DOCX or ZIP files."}), 400
+
+    dedupe = DuplicateIndex() if request.form.get('dedupe', '').lower() in ('1', 'true', 'yes') else None
+    client = f"{client_id()}/batch"
+    logger.info("Batch analysis request: %d resumes", len(inputs))
+
+    def generate():
+        summary = BatchSummary()
+        for record in iter_batch_results(inputs, pool=get_analysis_pool(), role=role.id,
+                                         job_description=job_description, index=resume_index, dedupe=dedupe,
+                                         client=client):
+            summary.add(record)
+            yield json.dumps(record) + "\n"
+        yield json.dumps({"summary": summary.as_dict()}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+def _int_arg(name, default=None):
+    value = request.args.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise InvalidQuery(f"'{name}' must be an integer") from None
+
+
+@app.route('/api/search', methods=['GET'])
+def search_endpoint():
+    """
+    Searches analyzed resumes (needs RESUME_INDEX_DB).
+
+    Query parameters: q (terms, "phrases", prefix*, AND/OR/NOT, parentheses,
+    keywords:term for matched role keywords only), minScore/maxScore, role,
+    section (repeatable: skills, experience, education, contact),
+    sort=relevance|score, limit (top-k, at most SEARCH_MAX_RESULTS) and
+    collapse=1 (one result per group of near-duplicate resumes).
+    """
+    if resume_index is None:
+        return jsonify({"error": "Search is not enabled. Set RESUME_INDEX_DB to index analyzed resumes."}), 404
+    start = time.perf_counter()
+    try:
+        limit = _int_arg('limit', 10)
+        if not 1 <= limit <= SEARCH_MAX_RESULTS:
+            raise InvalidQuery(f"'limit' must be between 1 and {SEARCH_MAX_RESULTS}")
+        sections = [name for value in request.args.getlist('section') for name in value.split(',') if name]
+        results = resume_index.search(
+            request.args.get('q'),
+            min_score=_int_arg('minScore'),
+            max_score=_int_arg('maxScore'),
+            role=request.args.get('role'),
+            sections=sections,
+            sort=request.args.get('sort', 'relevance'),
+            limit=limit,
+            collapse=request.args.get('collapse', '').lower() in ('1', 'true', 'yes'),
+        )
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
+    return json_response({
+        "results": results,
+        "count": len(results),
+        "tookMs": round((time.perf_counter() - start) * 1000, 3),
+    })
+
+
+@app.route('/api/stats', methods=['GET'])
+def stats_endpoint():
+    """
+    Aggregates of past analyses (needs RESUME_HISTORY_DB): score
+    distribution, analyses and mean score per day and per role, most
+    frequent formatting tips and each role's most often missing keywords.
+
+    Query parameters: days (window ending today, 1-365, default 30), role
+    and top (list lengths, 1-100, default 10). Served from precomputed
+    aggregate tables, never from the raw rows.
+    """
+    if analysis_history is None:
+        return jsonify({"error": "Statistics are not enabled. Set RESUME_HISTORY_DB to keep analysis history."}), 404
+    start = time.perf_counter()
+    try:
+        days = _int_arg('days', 30)
+        top = _int_arg('top', 10)
+        if not 1 <= days <= HISTORY_MAX_DAYS:
+            raise InvalidQuery(f"'days' must be between 1 and {HISTORY_MAX_DAYS}")
+        if not 1 <= top <= SEARCH_MAX_RESULTS:
+            raise InvalidQuery(f"'top' must be between 1 and {SEARCH_MAX_RESULTS}")
+    except InvalidQuery as e:
+        return jsonify({"error": str(e)}), 400
+    stats = analysis_history.stats(days=days, role=request.args.get('role'), top=top)
+    stats["tookMs"] = round((time.perf_counter() - start) * 1000, 3)
+    return json_response(stats)
+
+
+@app.route('/api/profiles', methods=['GET'])
+def profiles_endpoint():
+    """Kept request profiles (requested and slowest sampled), slowest first; needs the profiling secret."""
+    if not profiling.token_matches(PROFILE_SECRET, profile_token()):
+        return jsonify({"error": "Profiling is disabled or the profiling token is wrong."}), 403
+    profiles = profile_store.list()
+    for profile in profiles:
+        profile["url"] = f"/api/profiles/{profile['profileId']}"
+    return json_response({"profiles": profiles, "sampleRate": PROFILE_SAMPLE_RATE, "keep": profile_store.keep})
+
+
+@app.route('/api/profiles/<profile_id>', methods=['GET'])
+def profile_endpoint(profile_id):
+    """Downloads a profile: marshalled pstats, or collapsed stacks as text."""
+    if not profiling.token_matches(PROFILE_SECRET, profile_token()):
+        return jsonify({"error": "Profiling is disabled or the profiling token is wrong."}), 403
+    entry = profile_store.get(profile_id)
+    if entry is None:
+        return jsonify({"error": "Profile not found. Only the most recent and slowest profiles are kept."}), 404
+    profile, artifact = entry
+    if profile["format"] == profiling.PSTATS:
+        mimetype, extension = "application/octet-stream", "pstats"
+    else:
+        mimetype, extension = "text/plain; charset=utf-8", "collapsed.txt"
+    response = Response(artifact, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="profile-{profile_id}.{extension}"'
+    return response
 
 
 # ---------------------------------------------------------
@@ -152,5 +910,11 @@ if __name__ == '__main__':
     print(f"Server will run on: http://127.0.0.1:5000")
     print(f"Health check: http://127.0.0.1:5000/api/health")
     print(f"Analyze endpoint: http://127.0.0.1:5000/api/analyze-resume")
+    print(f"Batch endpoint: http://127.0.0.1:5000/api/analyze-batch")
+    if resume_index is not None:
+        print(f"Search endpoint: http://127.0.0.1:5000/api/search?q=python")
+    if analysis_history is not None:
+        print(f"Stats endpoint: http://127.0.0.1:5000/api/stats")
+    print("Development server only; in production run: python -m resume_analyzer.serve")
     print("=" * 60)
     app.run(debug=True, port=5000, host='127.0.0.1')
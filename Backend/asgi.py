@@ -0,0 +1,335 @@
+"""
+ASGI serving mode for the resume analyzer:
+
+    python asgi.py [--bind 0.0.0.0:5000]        (needs uvicorn)
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Serves the same /api/health, /api/health/ready and /api/analyze-resume
+contract as the Flask app (app.py), sharing its configuration, caches,
+search index, history and analysis pool. Other endpoints (batch, jobs,
+search, stats, profiles) are only served by the Flask app.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import time
+from urllib.parse import parse_qs
+
+import app as backend
+from resume_analyzer import metrics
+from resume_analyzer.catalog import UnknownRole, get_catalog
+from resume_analyzer.executor import JobTimeout, QueueFull
+from resume_analyzer.multipart import MultipartError, MultipartParser, parse_boundary
+from resume_analyzer.nlp_processor import process_resume_file
+from resume_analyzer.scheduler import estimate_cost
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------
+# Event loop in front, process pool behind
+# ---------------------------------------------------------
+# Under the Flask servers every connection holds a thread from the moment
+# its request arrives, so a few clients uploading slowly (mobile networks)
+# occupy all of a worker's threads while they trickle in their files, and
+# everyone else waits. Here a connection is a coroutine on one event loop:
+# the upload is parsed as its chunks arrive (resume_analyzer/multipart.py),
+# counted against the size cap (413 as soon as it is exceeded) and hashed
+# on the way in, so thousands of slow uploads cost only their buffers.
+# Only a complete upload that misses the result cache is handed to the
+# analysis pool (app.py's AnalysisPool; a thread when
+# RESUME_ANALYSIS_WORKERS=0), and the loop awaits its future. Nothing
+# else that can block runs on the loop either: cache lookups and stores
+# (the SQLite tier) and the job's cost estimate (a scan of the upload)
+# run on the default executor's threads.
+#
+# An upload must arrive within RESUME_UPLOAD_TIMEOUT seconds (408 if not),
+# so stalled connections do not hold their buffers forever.
+
+UPLOAD_TIMEOUT = float(os.environ.get('RESUME_UPLOAD_TIMEOUT', 120))
+# One resume and its form fields (the app's MAX_CONTENT_LENGTH is sized for batches)
+MAX_CONTENT_LENGTH = backend.MAX_UPLOAD_BYTES + backend.FORM_FIELDS_BYTES
+
+CORS_HEADERS = [(b"access-control-allow-origin", b"*")]
+
+
+class RequestError(Exception):
+    """An error response for the client (status and JSON error message)."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ClientDisconnected(Exception):
+    """The client went away before its request was read."""
+
+
+def header(scope, name):
+    """The value of a request header (lowercase bytes name), as str, or None."""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_id(scope):
+    """The fair scheduler's client for a request, as app.client_id finds it."""
+    address = backend.forwarded_address(scope["client"][0] if scope.get("client") else None,
+                                        header(scope, b"x-forwarded-for"))
+    return backend.client_key(address, header(scope, backend.CLIENT_HEADER.lower().encode())
+                              if backend.CLIENT_HEADER else None)
+
+
+async def send_json(send, status, body, headers=()):
+    with metrics.span("serialization"):
+        payload = json.dumps(body).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode()),
+                    *CORS_HEADERS, *headers],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def read_upload(scope, receive):
+    """
+    Streams a multipart/form-data request body through the parser and
+    returns it. Raises RequestError (400, 408, 413) or ClientDisconnected.
+    """
+    try:
+        parser = MultipartParser(parse_boundary(header(scope, b"content-type")))
+    except MultipartError:
+        raise RequestError(400, backend.NO_FILE_ERROR)
+    length = header(scope, b"content-length")
+    if length and length.isdigit() and int(length) > MAX_CONTENT_LENGTH:
+        raise RequestError(413, backend.UPLOAD_TOO_LARGE_ERROR)
+
+    deadline = time.monotonic() + UPLOAD_TIMEOUT
+    received = 0
+    more_body = True
+    while more_body:
+        try:
+            message = await asyncio.wait_for(receive(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            raise RequestError(408, f"The upload did not arrive within {UPLOAD_TIMEOUT:g} seconds.")
+        if message["type"] == "http.disconnect":
+            raise ClientDisconnected()
+        chunk = message.get("body", b"")
+        received += len(chunk)
+        if received > MAX_CONTENT_LENGTH:
+            raise RequestError(413, backend.UPLOAD_TOO_LARGE_ERROR)
+        try:
+            parser.feed(chunk)
+        except MultipartError as e:
+            raise RequestError(400, str(e))
+        more_body = message.get("more_body", False)
+    try:
+        parser.close()
+    except MultipartError as e:
+        raise RequestError(400, str(e))
+    return parser
+
+
+def prepare_analysis(data, filename, digest):
+    """The analysis input (the cached parse, else the bytes) and its estimated cost. Blocking: SQLite, a scan of the upload."""
+    source = backend.analysis_source(data, digest)
+    return source, estimate_cost(source, filename)
+
+
+def store_result(data, filename, result, digest, cache_key):
+    """Keeps the parsed resume, checks the result and caches it if successful. Blocking: SQLite."""
+    backend.keep_parsed_resume(data, filename, result, digest)
+    result = backend.normalize_result(result)
+    # Only cache successful analyses; failures may be transient
+    if result["atsScore"] > 0:
+        backend.result_cache.set(cache_key, result)
+    return result
+
+
+async def analyze(data, filename, role, job_description, top_roles, digest, client):
+    """Runs the analysis off the event loop: in the analysis pool, or a thread if it is disabled."""
+    source, cost = await asyncio.to_thread(prepare_analysis, data, filename, digest)
+    pool = backend.get_analysis_pool()
+    if pool is None:
+        return await asyncio.to_thread(
+            process_resume_file, io.BytesIO(data) if source is data else source, filename=filename, role=role,
+            job_description=job_description, include_document=True, top_roles=top_roles)
+    future = pool.submit(process_resume_file, source, filename, None, role, job_description, True, top_roles,
+                         cost=cost, client=client)
+    return await asyncio.wrap_future(future)
+
+
+async def analyze_resume(scope, receive, send):
+    """POST /api/analyze-resume: the contract of app.analyze_resume_endpoint, without ?async=1 and profiling."""
+    query = {key: values[0] for key, values in parse_qs(scope["query_string"].decode("latin-1")).items()}
+    if query.get('async', '').lower() in ('1', 'true', 'yes') or query.get('profile') \
+            or header(scope, b"x-profile"):
+        raise RequestError(400, "Async and profiled analyses are only served by the Flask app (app.py).")
+
+    # Not a metrics.span: spans nest per thread, and other requests run on this one while the upload arrives
+    started = time.perf_counter()
+    upload = await read_upload(scope, receive)
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - started, stage="upload_read")
+    file = upload.files.get('resumeFile')
+    if file is None:
+        logger.info("Rejected analysis request: no file part")
+        raise RequestError(400, backend.NO_FILE_ERROR)
+    filename = file.filename
+    if filename == '' or not backend.allowed_file(filename):
+        logger.info("Rejected invalid file: '%s'", filename)
+        backend.count_analysis(filename, 'invalid')
+        raise RequestError(400, backend.INVALID_FILE_ERROR)
+    if len(file.data) > backend.MAX_UPLOAD_BYTES:
+        backend.count_analysis(filename, 'invalid')
+        raise RequestError(413, backend.UPLOAD_TOO_LARGE_ERROR)
+
+    try:
+        role = get_catalog().resolve(upload.fields.get('role') or query.get('role'))
+    except UnknownRole as e:
+        logger.info("%s", e)
+        await send_json(send, 400, {"error": str(e), "availableRoles": e.available})
+        return
+    try:
+        job_description = backend.parse_job_description(upload.fields.get('jobDescription'))
+        top_roles = backend.parse_top_roles(upload.fields.get('topRoles') or query.get('topRoles'))
+    except ValueError as e:
+        raise RequestError(400, str(e))
+
+    data = bytes(file.data)
+    digest = file.digest
+    cache_key = backend.role_cache_key(data, role, job_description, top_roles, digest)
+    cached_result = await asyncio.to_thread(backend.result_cache.get, cache_key)
+    if cached_result is not None:
+        cached_result["cached"] = True
+        backend.count_analysis(filename, 'cached')
+        await send_json(send, 200, cached_result)
+        return
+
+    client = client_id(scope)
+    try:
+        result = await analyze(data, filename, role.id, job_description, top_roles, digest, client)
+        result = await asyncio.to_thread(store_result, data, filename, result, digest, cache_key)
+    except QueueFull as e:
+        logger.warning("Analysis queue full, rejecting request: %s", e)
+        backend.count_analysis(filename, 'rejected')
+        await send_json(send, 503, {"error": backend.BUSY_ERROR}, [(b"retry-after", str(e.retry_after).encode())])
+        return
+    except JobTimeout as e:
+        logger.warning("Analysis timed out: %s", e)
+        backend.count_analysis(filename, 'timeout')
+        raise RequestError(504, backend.TIMEOUT_ERROR)
+    except Exception as e:
+        logger.exception("Resume processing error for %s", filename)
+        backend.count_analysis(filename, 'error')
+        raise RequestError(500, f"Internal server error while analyzing resume: {str(e)}")
+
+    result["cached"] = False
+    backend.count_analysis(filename, 'ok' if result["atsScore"] > 0 else 'unreadable')
+    backend.record_history(filename, result)
+    logger.info("Analyzed %s: score=%s", filename, result['atsScore'])
+    await send_json(send, 200, result)
+
+
+async def health(scope, receive, send):
+    # Reads the SQLite-backed stores' status
+    await send_json(send, 200, await asyncio.to_thread(backend.health_status))
+
+
+async def readiness(scope, receive, send):
+    nlp_status = backend.resources.status()
+    ready = nlp_status["status"] == backend.resources.READY
+    await send_json(send, 200 if ready else 503, {"status": "ready" if ready else "not_ready", "nlp": nlp_status})
+
+
+# (method, path) -> (handler, endpoint name in the request metrics)
+ROUTES = {
+    ("GET", "/api/health"): (health, "health_check"),
+    ("GET", "/api/health/ready"): (readiness, "readiness_check"),
+    ("POST", "/api/analyze-resume"): (analyze_resume, "analyze_resume_endpoint"),
+}
+
+
+async def lifespan(receive, send):
+    """Starts the analysis pool with the server (its workers load the NLP resources) and stops it after."""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await asyncio.get_running_loop().run_in_executor(None, backend.get_analysis_pool)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if backend._analysis_pool is not None:
+                await asyncio.get_running_loop().run_in_executor(None, backend._analysis_pool.shutdown)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    """The ASGI application."""
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    started = time.perf_counter()
+    method, path = scope["method"], scope["path"]
+    if method == "OPTIONS":
+        # CORS preflight, as flask-cors answers it
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            *CORS_HEADERS,
+            (b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+            (b"access-control-allow-headers", (header(scope, b"access-control-request-headers") or "*").encode()),
+            (b"content-length", b"0"),
+        ]})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    route = ROUTES.get((method, path))
+    if route is None:
+        known = any(route_path == path for _, route_path in ROUTES)
+        await send_json(send, 405 if known else 404,
+                        {"error": "Method not allowed." if known else "Not found."})
+        return
+
+    handler, endpoint = route
+    status = [499]
+
+    async def send_and_record(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+        await send(message)
+
+    try:
+        await handler(scope, receive, send_and_record)
+    except RequestError as e:
+        await send_json(send_and_record, e.status, {"error": str(e)})
+    except ClientDisconnected:
+        pass
+    finally:
+        backend.REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, status=status[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python asgi.py",
+                                     description="Serve the resume analyzer API on an asyncio event loop (uvicorn).")
+    parser.add_argument("--bind", default=os.environ.get("RESUME_SERVER_BIND", "0.0.0.0:5000"),
+                        help="address to listen on (default: 0.0.0.0:5000)")
+    parser.add_argument("--backlog", type=int, default=4096, help="pending connections the socket may hold")
+    args = parser.parse_args(argv)
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The ASGI server needs uvicorn: pip install uvicorn")
+    host, _, port = args.bind.rpartition(":")
+    print(f"Serving asgi:app on {args.bind} with {backend.ANALYSIS_WORKERS} analysis worker(s)")
+    # Client addresses behind proxies are resolved by RESUME_PROXY_HOPS, as in the Flask app, not by uvicorn
+    uvicorn.run(app, host=host or "0.0.0.0", port=int(port), backlog=args.backlog, log_level="warning",
+                proxy_headers=False)
+
+
+if __name__ == "__main__":
+    main()
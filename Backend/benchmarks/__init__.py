@@ -0,0 +1,10 @@
+"""
+Performance benchmarks for the resume analyzer backend.
+
+Run from the Backend directory, e.g.:
+    python -m benchmarks.bench_nlp_stage
+
+The whole suite, with a regression check against a recorded baseline:
+    python -m benchmarks.run --save-baseline    # before a change
+    python -m benchmarks.run                    # after; exits 1 on regression
+"""
@@ -0,0 +1,152 @@
+"""
+The Flask app under its production server versus the ASGI server while
+many clients upload slowly.
+
+"serve" is `python -m resume_analyzer.serve` (gunicorn, gthread workers);
+"asgi" is `python asgi.py` (uvicorn, analyses in the process pool). Each
+gets the same CPU budget: one gunicorn worker, or one analysis worker.
+
+`--slow` clients each upload a DOCX resume trickled in small chunks over
+`--slow-seconds`, as from a bad mobile connection. They all send the
+same file, analyzed once before the run, so finishing them costs only a
+cache lookup and the test measures what holding their connections costs.
+Meanwhile `--clients` fast clients post whole resumes back to back for
+`--seconds`; each carries a different job description, so every one of
+them is analyzed. Reported: slow uploads completed and failed, the fast
+clients' successful requests/sec and latency (errors include timeouts),
+and the server's RSS while the slow uploads were open. Linux only.
+
+    python -m benchmarks.bench_asgi [--slow 1000] [--slow-seconds 30] [--clients 4] [--seconds 20]
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import resource
+import signal
+import subprocess
+import sys
+import time
+
+from benchmarks.bench_serve import BACKEND_DIR, memory_mb, wait_ready
+from benchmarks.common import encode_multipart, percentile
+from benchmarks.corpus import make_resume_file
+
+HOST = "127.0.0.1"
+# Seconds a request may take beyond its upload before it counts as failed
+RESPONSE_TIMEOUT = 60
+
+
+async def post(port, body, content_type, chunk_size=None, interval=0.0):
+    """POSTs a body over a raw connection, in chunks `interval` seconds apart if chunk_size is set; returns the HTTP status."""
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        writer.write(f"POST /api/analyze-resume HTTP/1.1\r\nHost: {HOST}:{port}\r\n"
+                     f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode())
+        chunk_size = chunk_size or len(body)
+        for offset in range(0, len(body), chunk_size):
+            if offset:
+                await asyncio.sleep(interval)
+            writer.write(body[offset:offset + chunk_size])
+            await writer.drain()
+        response = await asyncio.wait_for(reader.read(), RESPONSE_TIMEOUT)
+        return int(response.split(b" ", 2)[1])
+    finally:
+        writer.close()
+
+
+async def slow_client(port, body, content_type, seconds, delay, outcomes):
+    await asyncio.sleep(delay)
+    chunks = max(1, int(seconds / 0.5))
+    try:
+        status = await post(port, body, content_type, chunk_size=-(-len(body) // chunks), interval=0.5)
+        outcomes["ok" if status == 200 else "failed"] += 1
+    except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+        outcomes["failed"] += 1
+
+
+async def fast_client(port, document, seconds, counter, latencies, errors):
+    deadline = time.monotonic() + seconds
+    name, data = document
+    while time.monotonic() < deadline:
+        body, content_type = encode_multipart({"resumeFile": (name, data)},
+                                              {"jobDescription": f"Python engineer with SQL and AWS, opening {next(counter)}"})
+        start = time.perf_counter()
+        try:
+            status = await post(port, body, content_type)
+        except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+            status = None
+        if status == 200:
+            latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            errors.append(status)
+
+
+async def run_load(port, pid, args):
+    slow_name, slow_data = "slow.docx", make_resume_file(0, "docx")
+    slow_body, slow_type = encode_multipart({"resumeFile": (slow_name, slow_data)})
+    # Cache the slow clients' result, so completing them costs no analysis
+    await post(port, slow_body, slow_type)
+
+    outcomes = {"ok": 0, "failed": 0}
+    slow = [asyncio.ensure_future(slow_client(port, slow_body, slow_type, args.slow_seconds, i * 2.0 / max(1, args.slow),
+                                              outcomes))
+            for i in range(args.slow)]
+    # Let every slow client connect before the fast clients start
+    await asyncio.sleep(3)
+    documents = [(f"resume.{kind}", make_resume_file(seed, kind)) for seed in range(1, 5) for kind in ("pdf", "docx")]
+    counter = itertools.count()
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(fast_client(port, documents[i % len(documents)], args.seconds, counter, latencies, errors)
+                           for i in range(args.clients)))
+    rps = len(latencies) / (time.perf_counter() - start)
+    rss, _ = memory_mb(pid)
+    await asyncio.gather(*slow)
+    return outcomes, rps, latencies, errors, rss
+
+
+def run_setup(label, command, env, port, args):
+    # A cache large enough that the fast clients' results never evict the slow clients' one
+    env = dict(os.environ, RESUME_LOG_LEVEL="WARNING", RESUME_CACHE_SIZE="1000000", **env)
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        wait_ready(f"http://{HOST}:{port}", timeout=120)
+        outcomes, rps, latencies, errors, rss = asyncio.run(run_load(port, process.pid, args))
+        print(f"{label:<10} {outcomes['ok']:>7} {outcomes['failed']:>7} {rps:>7.1f} {percentile(latencies, 50):>8.0f} "
+              f"{percentile(latencies, 99):>8.0f} {len(errors):>6} {rss:>7.0f}")
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slow", type=int, default=1000, help="slow uploading clients")
+    parser.add_argument("--slow-seconds", type=float, default=30, help="seconds each slow upload takes")
+    parser.add_argument("--clients", type=int, default=4, help="fast clients")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--threads", type=int, default=4, help="threads of the gunicorn worker")
+    parser.add_argument("--port", type=int, default=5072)
+    args = parser.parse_args()
+
+    # Every connection is a file descriptor, in this process and the server's
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(soft, min(hard, 2 * args.slow + 1024)), hard))
+
+    print(f"{os.cpu_count()} CPU(s); {args.slow} slow uploads over {args.slow_seconds:g}s each, "
+          f"{args.clients} fast clients for {args.seconds:g}s")
+    print(f"{'setup':<10} {'slow ok':>7} {'failed':>7} {'req/s':>7} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6} {'RSS MB':>7}")
+    bind = f"{HOST}:{args.port}"
+    run_setup("serve", [sys.executable, "-m", "resume_analyzer.serve", "--bind", bind, "--workers", "1",
+                        "--threads", str(args.threads), "--max-requests", "0"], {}, args.port, args)
+    # All clients come from one address, which the pool's scheduler would limit to half its queue
+    run_setup("asgi", [sys.executable, "asgi.py", "--bind", bind],
+              {"RESUME_ANALYSIS_WORKERS": "1", "RESUME_CLIENT_QUEUE_SHARE": "1"}, args.port, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Keyword matching cost per resume as the job role catalog grows: the
+compiled catalog index versus per-keyword substring scans (the rule
+engine's keyword rules), for catalogs of 2 to 500 roles with up to 300
+keywords each.
+
+Then the cost of ranking a resume against every role: one analysis plus
+rank_roles (the role matrix product) versus analyze_resume_text once per
+role.
+
+    python -m benchmarks.bench_catalog [--docs 200] [--loop-docs 10]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.corpus import SKILLS, make_corpus
+from resume_analyzer.catalog import RoleCatalog
+from resume_analyzer.nlp_processor import analyze_resume_text, rank_roles, score_resume
+from resume_analyzer.rules import keyword_rule, matcher_for_keywords
+from resume_analyzer.sections import parse_resume
+
+
+def make_catalog(roles, keywords_per_role, seed=0):
+    """Synthetic catalog: real skills plus random words, phrases and synonyms."""
+    rng = random.Random(seed)
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = list(SKILLS) + [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(4, 10))) for _ in range(5000)
+    ]
+    synonyms = {word: [word[:3] + str(i)] for i, word in enumerate(rng.sample(vocabulary, 500))}
+    spec = {}
+    for r in range(roles):
+        keywords = rng.sample(vocabulary, keywords_per_role - 5)
+        keywords += [f"{rng.choice(vocabulary)} {rng.choice(vocabulary)}" for _ in range(5)]
+        spec[f"role_{r}"] = {"keywords": keywords}
+    return RoleCatalog({"roles": spec, "synonyms": synonyms})
+
+
+def per_resume_us(func, corpus):
+    start = time.perf_counter()
+    for text in corpus:
+        func(text)
+    return (time.perf_counter() - start) / len(corpus) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--loop-docs", type=int, default=10, help="resumes for the slow one-analysis-per-role loop")
+    args = parser.parse_args()
+
+    corpus = [text.lower() for text in make_corpus(args.docs)]
+    print(f"{args.docs} one-page resumes; microseconds per resume to find one role's keywords")
+    print(f"{'roles':>5} {'kw/role':>8} {'terms':>7} {'catalog index':>14} {'substring scans':>16}")
+    for roles, keywords_per_role in ((2, 6), (2, 300), (50, 300), (500, 100), (500, 300)):
+        index = make_catalog(roles, keywords_per_role)
+        role = index.resolve("role_0")
+        matcher = matcher_for_keywords(tuple(role.keywords))
+
+        def substring_scan(text):
+            hits = matcher.scan(text)
+            return [kw for kw in role.keywords if hits[keyword_rule(kw)]]
+
+        # Warm the token cache the way a long-running worker would
+        for text in corpus:
+            index.match_role(role, text)
+        indexed = per_resume_us(lambda text: index.match_role(role, text), corpus)
+        scanned = per_resume_us(substring_scan, corpus)
+        print(f"{roles:>5} {keywords_per_role:>8} {index.term_count:>7} {indexed:>14.0f} {scanned:>16.0f}")
+
+    documents = [parse_resume(text) for text in make_corpus(args.docs)]
+    print()
+    print("microseconds per resume to score it against every role (top 5 listed)")
+    print(f"{'roles':>5} {'kw/role':>8} {'role matrix':>12} {'analysis per role':>18}")
+    for roles, keywords_per_role in ((2, 30), (50, 30), (500, 30), (500, 100)):
+        index = make_catalog(roles, keywords_per_role)
+        default = index.resolve("role_0")
+        index.role_matrix()
+
+        def ranked(document):
+            found = index.match(document.lower)
+            hits = default.matched_keywords(found)
+            _, base_points = score_resume(document, default.keywords, keyword_hits=hits)
+            return rank_roles(index, found, base_points, 5)
+
+        def per_role(document):
+            found = index.match(document.lower)
+            scores = [(analyze_resume_text(document, role.keywords, keyword_hits=role.matched_keywords(found)),
+                       role.id) for role in index.roles.values()]
+            return sorted(scores, key=lambda score: -score[0]["atsScore"])[:5]
+
+        for document in documents:
+            ranked(document)
+        matrix = per_resume_us(ranked, documents)
+        loop = per_resume_us(per_role, documents[:args.loop_docs])
+        print(f"{roles:>5} {keywords_per_role:>8} {matrix:>12.0f} {loop:>18.0f}")
+
+
+if __name__ == "__main__":
+    main()
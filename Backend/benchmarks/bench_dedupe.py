@@ -0,0 +1,109 @@
+"""
+Batch throughput with and without near-duplicate detection, on a PDF/DOCX
+corpus where a controlled share of files are edited copies (one line
+changed, possibly saved in the other format) of earlier resumes; also
+how many duplicates are found and how many distinct resumes are wrongly
+grouped.
+
+Then the cost of finding the near duplicates of one resume as the number
+of resumes seen grows: LSH bucket lookups versus comparing its signature
+with every one.
+
+    python -m benchmarks.bench_dedupe [--docs 200] [--rates 0,0.25,0.5] [--pdf-ratio 0.5]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.corpus import make_docx_bytes, make_pdf_bytes, make_resume_lines, lines_to_text
+from resume_analyzer.batch import BatchSummary, iter_batch_results
+from resume_analyzer.dedupe import DuplicateIndex, minhash, similarity
+
+
+def make_duplicate_corpus(docs, duplicate_rate, pdf_ratio=0.5, seed=0):
+    """
+    [(name, bytes)] where about `duplicate_rate` of the files are edited
+    copies of an earlier original, and {copy name: original name}.
+    """
+    rng = random.Random(seed)
+    files, originals, truth = [], [], {}
+    for i in range(docs):
+        kind = "pdf" if rng.random() < pdf_ratio else "docx"
+        if originals and rng.random() < duplicate_rate:
+            original, lines = rng.choice(originals)
+            lines = list(lines)
+            lines[rng.randrange(len(lines))] = f"Completed certification number {i}"
+            truth[f"{i}.{kind}"] = original
+        else:
+            lines = make_resume_lines(seed * 100000 + i)
+            originals.append((f"{i}.{kind}", lines))
+        text = lines_to_text(lines)
+        files.append((f"{i}.{kind}", make_pdf_bytes(text) if kind == "pdf" else make_docx_bytes(text)))
+    return files, truth
+
+
+def run(files, dedupe):
+    summary = BatchSummary()
+    records = []
+    for record in iter_batch_results([(name, lambda data=data: data) for name, data in files], dedupe=dedupe):
+        summary.add(record)
+        records.append(record)
+    return summary.as_dict(), records
+
+
+def lookup_us(probes, index):
+    start = time.perf_counter()
+    for i, signature in enumerate(probes):
+        index.match(f"probe_{i}", signature)
+    return (time.perf_counter() - start) / len(probes) * 1e6
+
+
+def scan_us(signatures, probes, threshold):
+    start = time.perf_counter()
+    for signature in probes:
+        max(similarity(signature, other) for other in signatures) >= threshold
+    return (time.perf_counter() - start) / len(probes) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--rates", default="0,0.25,0.5", help="comma-separated duplicate rates")
+    parser.add_argument("--pdf-ratio", type=float, default=0.5)
+    args = parser.parse_args()
+
+    # Load spaCy and the parser caches before timing
+    run(make_duplicate_corpus(2, 0)[0], None)
+    print(f"{args.docs} resumes ({args.pdf_ratio:.0%} PDF), analyzed inline")
+    print(f"{'dup rate':>8} {'plain files/s':>14} {'dedupe files/s':>15} {'speedup':>8} "
+          f"{'found':>9} {'wrong':>6}")
+    for rate in (float(value) for value in args.rates.split(",")):
+        files, truth = make_duplicate_corpus(args.docs, rate, args.pdf_ratio)
+        plain, _ = run(files, None)
+        deduped, records = run(files, DuplicateIndex())
+        found = {r["file"]: r["duplicateOf"] for r in records if r["status"] == "duplicate"}
+        # A copy grouped with another copy of the same original is right too
+        root = {name: truth.get(name, name) for name, _ in files}
+        wrong = sum(root[name] != root[representative] for name, representative in found.items())
+        print(f"{rate:>8.0%} {plain['filesPerSecond']:>14.1f} {deduped['filesPerSecond']:>15.1f} "
+              f"{deduped['filesPerSecond'] / plain['filesPerSecond']:>7.2f}x "
+              f"{len(found) - wrong:>4}/{len(truth):<4} {wrong:>6}")
+
+    print()
+    print("microseconds to find the near duplicates of one resume")
+    print(f"{'seen':>7} {'LSH buckets':>12} {'compare all':>12}")
+    rng = random.Random(1)
+    words = [f"w{i}" for i in range(20000)]
+    pool = [minhash(" ".join(rng.choice(words) for _ in range(300))) for _ in range(10000)]
+    probes = [minhash(" ".join(rng.choice(words) for _ in range(300))) for _ in range(50)]
+    for seen in (100, 1000, 10000):
+        index = DuplicateIndex()
+        for i, signature in enumerate(pool[:seen]):
+            index.match(i, signature)
+        print(f"{seen:>7} {lookup_us(probes, index):>12.0f} "
+              f"{scan_us(pool[:seen], probes, index.threshold):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
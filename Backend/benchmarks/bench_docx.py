@@ -0,0 +1,90 @@
+"""
+DOCX extraction: streaming word/document.xml through expat versus the
+python-docx object model, on table-heavy resumes.
+
+Reports time per document, the peak memory growth of a fresh process
+extracting one large document (Linux VmHWM, which includes lxml's C
+allocations that tracemalloc cannot see), and how many extra words
+python-docx produced by repeating merged cells.
+
+    python -m benchmarks.bench_docx [--docs 20] [--pages 3]
+"""
+
+import argparse
+import io
+import multiprocessing
+
+from benchmarks.common import summarize, time_calls
+from benchmarks.corpus import make_docx_bytes, make_resume_lines
+from resume_analyzer.extractors import extract_docx, extract_docx_python_docx
+
+METHODS = {
+    "python-docx (before)": extract_docx_python_docx,
+    "streaming (after)": extract_docx,
+}
+
+
+def merge_cells(data):
+    """Merges the first row of every table across all columns, like a title row."""
+    from docx import Document
+
+    document = Document(io.BytesIO(data))
+    for table in document.tables:
+        row = table.rows[0].cells
+        merged = row[0].merge(row[-1])
+        merged.text = row[0].text.split("\n")[0]
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def _status_kb(field):
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def _peak_child(method, data, results):
+    before = _status_kb("VmRSS")
+    METHODS[method](io.BytesIO(data))
+    results.put(_status_kb("VmHWM") - before)
+
+
+def peak_memory_kb(method, data):
+    """Peak RSS growth of a fresh (forked) process extracting `data`."""
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(target=_peak_child, args=(method, data, results))
+    process.start()
+    growth = results.get(timeout=120)
+    process.join()
+    return growth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = [
+        merge_cells(make_docx_bytes(make_resume_lines(seed, pages=args.pages, table_density=0.8)))
+        for seed in range(args.docs)
+    ]
+    large = merge_cells(make_docx_bytes(make_resume_lines(0, pages=60, table_density=0.8)))
+    print(f"{args.docs} resumes of ~{args.pages} page(s), 80% of experience entries in tables")
+
+    for method, extract in METHODS.items():
+        latencies = time_calls(lambda data: extract(io.BytesIO(data)), documents, repeat=3)
+        words = sum(len(extract(io.BytesIO(data)).split()) for data in documents)
+        print(summarize(f"  {method}", latencies) + f"  words={words}")
+
+    print(f"Peak memory growth extracting one {len(large) // 1024} KB, ~60 page document")
+    for method in METHODS:
+        print(f"  {method:<26} {peak_memory_kb(method, large) / 1024:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Analysis history: cost on the request path and /api/stats latency as the
+history grows.
+
+record() (a queue put, written by the background writer) is compared with
+inserting and committing each analysis synchronously. Then the stats of
+the last 30 days are read from the aggregate tables and, for comparison,
+recomputed by scanning the raw rows, at 1,000 to `--analyses` (default
+100,000) analyses spread over 90 days and 20 roles.
+
+    python -m benchmarks.bench_history [--analyses 100000] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.common import summarize, time_calls
+from resume_analyzer.history import AnalysisHistory, day_of, make_entry
+
+TIPS = [
+    "Add quantifiable metrics (percentages, numbers, timeframes) to demonstrate your impact.",
+    "Use more action verbs (e.g., 'developed', 'created', 'implemented') to make your achievements stand out.",
+    "Your resume is quite short (212 words). Add more detail about your experience, projects, and achievements.",
+    "Include an 'Education' section with your academic qualifications.",
+    "Ensure your contact information (email, phone) is clearly visible.",
+]
+
+
+def make_entries(count, now, seed=0):
+    rng = random.Random(seed)
+    keywords = [f"keyword{i}" for i in range(40)]
+    for _ in range(count):
+        result = {
+            "jobRole": f"role_{rng.randrange(20)}",
+            "atsScore": rng.randint(0, 100),
+            "keywordSuggestions": rng.sample(keywords, rng.randint(0, 15)),
+            "formattingTips": rng.sample(TIPS, rng.randint(1, 3)),
+        }
+        yield make_entry("resume.pdf", result, created=now - rng.random() * 90 * 86400)
+
+
+def scan_stats(db_path, days, now):
+    """The same numbers as AnalysisHistory.stats, computed from the raw rows."""
+    since = day_of(now - (days - 1) * 86400)
+    db = sqlite3.connect(db_path)
+    scores, tips, missing = Counter(), Counter(), Counter()
+    for role, score, keywords, row_tips in db.execute(
+            "SELECT role, score, missing_keywords, tips FROM analyses WHERE day >= ?", (since,)):
+        scores[min(score // 10, 9)] += 1
+        tips.update(json.loads(row_tips))
+        missing.update((role, keyword) for keyword in json.loads(keywords))
+    db.close()
+    return scores, tips.most_common(10), missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--analyses", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    now = time.time()
+
+    with tempfile.TemporaryDirectory() as directory:
+        entries = list(make_entries(2000, now))
+        history = AnalysisHistory(os.path.join(directory, "queued.db"))
+        result = {"jobRole": "role_0", "atsScore": 70, "keywordSuggestions": ["keyword1"], "formattingTips": TIPS}
+        start = time.perf_counter()
+        for _ in entries:
+            history.record("resume.pdf", result)
+        queued_us = (time.perf_counter() - start) / len(entries) * 1e6
+        history.flush()
+        synchronous = AnalysisHistory(os.path.join(directory, "sync.db"))
+        start = time.perf_counter()
+        for entry in entries:
+            synchronous.add_many([entry])
+        sync_us = (time.perf_counter() - start) / len(entries) * 1e6
+        print("microseconds added to a request per analysis recorded")
+        print(f"  record() (background batches) {queued_us:10.1f}")
+        print(f"  insert + commit each          {sync_us:10.1f}")
+        print()
+
+        history = AnalysisHistory(os.path.join(directory, "history.db"), retention_days=0)
+        written = 0
+        size = 1000
+        while written < args.analyses:
+            size = min(size, args.analyses)
+            history.add_many(make_entries(size - written, now, seed=size))
+            written = size
+            aggregate = time_calls(lambda _: history.stats(days=30, now=now), [None], repeat=args.repeat)
+            scan = time_calls(lambda _: scan_stats(history.db_path, 30, now), [None], repeat=max(1, args.repeat // 5))
+            print(summarize(f"{written:>7} analyses, aggregates", aggregate))
+            print(summarize(f"{written:>7} analyses, raw scan", scan))
+            size *= 10
+
+
+if __name__ == "__main__":
+    main()
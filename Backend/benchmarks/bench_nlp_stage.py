@@ -0,0 +1,51 @@
+"""
+p50/p99 latency of analyze_resume_text before and after the feature-gated
+NLP stage.
+
+"before" reproduces the old behaviour of running the full en_core_web_sm
+pipeline on every resume; "after" is the current analyzer, which skips
+spaCy unless an enabled feature needs it.
+
+    python -m benchmarks.bench_nlp_stage [--count 200] [--pages 1]
+"""
+
+import argparse
+
+from benchmarks.common import summarize, time_calls
+from benchmarks.corpus import make_corpus
+from resume_analyzer.catalog import resolve_role
+from resume_analyzer.features import SPACY_MODEL
+from resume_analyzer.nlp_processor import analyze_resume_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=1)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.count, pages=args.pages)
+    keywords = resolve_role().keywords
+
+    print(f"Corpus: {args.count} synthetic resumes, ~{args.pages} page(s) each")
+
+    try:
+        import spacy
+        full_nlp = spacy.load(SPACY_MODEL)
+    except (ImportError, IOError, OSError) as e:
+        full_nlp = None
+        print(f"before: skipped, full '{SPACY_MODEL}' pipeline unavailable ({e})")
+
+    if full_nlp is not None:
+        def before(text):
+            full_nlp(text)
+            return analyze_resume_text(text, keywords)
+
+        print(summarize("before (full spaCy parse)", time_calls(before, corpus)))
+
+    after = time_calls(lambda text: analyze_resume_text(text, keywords), corpus)
+    print(summarize("after (feature-gated)", after))
+
+
+if __name__ == "__main__":
+    main()
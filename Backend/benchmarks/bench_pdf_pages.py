@@ -0,0 +1,58 @@
+"""
+Peak RSS and time of PDF text extraction versus page count: pdfminer's
+whole-document extract_text() against the page-streaming extract_pdf()
+(with and without its default page limit).
+
+Each measurement runs in a fresh process so peak RSS is not inherited.
+
+    python -m benchmarks.bench_pdf_pages [--pages 1 5 20 50 200]   # resume length in pages of text
+"""
+
+import argparse
+import io
+import multiprocessing
+import resource
+import time
+
+from benchmarks.corpus import PDF_LINES_PER_PAGE, make_pdf_bytes, make_resume_text
+
+
+def _measure(mode, pages):
+    from pdfminer.high_level import extract_text
+    from pdfminer.layout import LAParams
+    from resume_analyzer.extractors import extract_pdf
+
+    data = make_pdf_bytes(make_resume_text(0, pages=pages))
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if mode == "extract_text":
+        text = extract_text(io.BytesIO(data))
+    elif mode == "streaming":
+        text = extract_pdf(io.BytesIO(data), max_pages=0, max_chars=0).text
+    elif mode == "streaming, no layout flow":
+        text = extract_pdf(io.BytesIO(data), max_pages=0, max_chars=0, laparams=LAParams(boxes_flow=None)).text
+    else:
+        text = extract_pdf(io.BytesIO(data)).text
+    elapsed = time.perf_counter() - start
+    peak_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    return elapsed * 1000, peak_growth / 1024, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20, 50, 200])
+    args = parser.parse_args()
+
+    modes = ["extract_text", "streaming", "streaming, no layout flow", "streaming, limits"]
+    context = multiprocessing.get_context("spawn")
+    print(f"{'PDF pages':>9}  {'mode':<26} {'time ms':>9} {'peak RSS +MB':>13} {'chars':>9}")
+    for pages in args.pages:
+        pdf_pages = -(-len(make_resume_text(0, pages=pages).splitlines()) // PDF_LINES_PER_PAGE)
+        for mode in modes:
+            with context.Pool(1) as pool:
+                ms, mb, chars = pool.apply(_measure, (mode, pages))
+            print(f"{pdf_pages:>9}  {mode:<26} {ms:>9.1f} {mb:>13.1f} {chars:>9}")
+
+
+if __name__ == "__main__":
+    main()
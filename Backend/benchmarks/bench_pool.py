@@ -0,0 +1,52 @@
+"""
+Analysis throughput through AnalysisPool as the worker count grows from
+1 to N cores, compared with running inline in one thread.
+
+    python -m benchmarks.bench_pool [--docs 60] [--max-workers N]
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.corpus import make_docx_bytes, make_resume_text
+from resume_analyzer.executor import AnalysisPool
+from resume_analyzer.nlp_processor import process_resume_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=60)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    documents = [make_docx_bytes(make_resume_text(seed, pages=args.pages)) for seed in range(args.docs)]
+    print(f"{args.docs} DOCX resumes of ~{args.pages} pages, {os.cpu_count()} CPU(s)")
+
+    start = time.perf_counter()
+    for data in documents:
+        process_resume_file(data, "resume.docx")
+    inline = args.docs / (time.perf_counter() - start)
+    print(f"  inline (1 thread)   {inline:8.1f} resumes/s")
+
+    workers = 1
+    while workers <= args.max_workers:
+        pool = AnalysisPool(workers=workers, queue_size=args.docs)
+        try:
+            # Let every worker finish loading before timing
+            for future in [pool.submit(len, b"") for _ in range(workers)]:
+                future.result()
+            start = time.perf_counter()
+            futures = [pool.submit(process_resume_file, data, "resume.docx") for data in documents]
+            for future in futures:
+                future.result()
+            rate = args.docs / (time.perf_counter() - start)
+        finally:
+            pool.shutdown()
+        print(f"  pool, {workers:>2} worker(s) {rate:8.1f} resumes/s  (x{rate / inline:.2f} vs inline)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Throughput of rule scoring: the old per-rule re.search / substring scans
+(benchmarks.legacy) versus the compiled rule engine, on 1-page
+and 10-page synthetic resumes.
+
+    python -m benchmarks.bench_rules [--count 200]
+"""
+
+import argparse
+import time
+
+from benchmarks.corpus import make_corpus
+from benchmarks.legacy import legacy_analyze_resume_text
+from resume_analyzer.catalog import resolve_role
+from resume_analyzer.nlp_processor import analyze_resume_text
+
+
+def throughput(func, corpus, keywords):
+    start = time.perf_counter()
+    for text in corpus:
+        func(text, keywords)
+    elapsed = time.perf_counter() - start
+    megabytes = sum(len(text) for text in corpus) / 1e6
+    return len(corpus) / elapsed, megabytes / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    keywords = resolve_role().keywords
+    for pages in (1, 10):
+        corpus = make_corpus(args.count, pages=pages)
+        # Warm up compiled-pattern caches on both sides
+        legacy_analyze_resume_text(corpus[0], keywords)
+        analyze_resume_text(corpus[0], keywords)
+
+        print(f"{pages}-page resumes ({args.count} docs, avg {sum(map(len, corpus)) // len(corpus)} chars)")
+        for label, func in (("legacy per-rule scans", legacy_analyze_resume_text),
+                            ("compiled rule engine", analyze_resume_text)):
+            docs_per_sec, mb_per_sec = throughput(func, corpus, keywords)
+            print(f"  {label:<24} {docs_per_sec:10.1f} resumes/s  {mb_per_sec:8.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Tail latency of small resumes under a mixed workload, with the pool's
+queue first-come first-served versus scheduled by estimated cost and
+client (scheduler.FairQueue).
+
+Uploads arrive at random (Poisson) from several clients: mostly one-page
+DOCX and PDF resumes, plus `--large-ratio` of 30-page PDFs, all from one
+bulk uploader. The arrival rate is set from the measured analysis times
+so the workers (at most one per CPU) are busy `--load` of the time. Latency is from submission
+to result, so it includes the time spent queued.
+
+    python -m benchmarks.bench_scheduler [--seconds 30] [--workers 2] [--load 0.8] [--large-ratio 0.1]
+"""
+
+import argparse
+import os
+import random
+import threading
+import time
+
+from benchmarks.common import summarize
+from benchmarks.corpus import make_resume_file
+from resume_analyzer.executor import AnalysisPool
+from resume_analyzer.nlp_processor import process_resume_file
+from resume_analyzer.scheduler import estimate_cost
+
+CLIENTS = 4
+
+
+def make_uploads(count=8):
+    small = [(f"small_{i}.docx", make_resume_file(i, "docx")) for i in range(count)]
+    small += [(f"small_{i}.pdf", make_resume_file(i, "pdf")) for i in range(count)]
+    large = [(f"large_{i}.pdf", make_resume_file(i, "pdf", pages=30)) for i in range(count // 2)]
+    return small, large
+
+
+def mean_seconds(pool, uploads):
+    start = time.perf_counter()
+    for name, data in uploads:
+        pool.run(process_resume_file, data, name)
+    return (time.perf_counter() - start) / len(uploads)
+
+
+def run(pool, small, large, rate, seconds, large_ratio, scheduled, seed=0):
+    """Submits Poisson arrivals for `seconds`; returns {"small": [ms], "large": [ms]}."""
+    rng = random.Random(seed)
+    latencies = {"small": [], "large": []}
+    lock = threading.Lock()
+    futures = []
+    start = time.perf_counter()
+    next_arrival = start
+    while next_arrival - start < seconds:
+        time.sleep(max(0.0, next_arrival - time.perf_counter()))
+        is_large = rng.random() < large_ratio
+        name, data = rng.choice(large if is_large else small)
+        # The bulk uploader sends the large PDFs; small ones come from everyone else
+        client = "bulk" if is_large else f"client{rng.randrange(CLIENTS)}"
+        kind = "large" if is_large else "small"
+        submitted = time.perf_counter()
+        if scheduled:
+            future = pool.submit(process_resume_file, data, name, cost=estimate_cost(data, name), client=client)
+        else:
+            future = pool.submit(process_resume_file, data, name)
+
+        def finished(_, kind=kind, submitted=submitted):
+            with lock:
+                latencies[kind].append((time.perf_counter() - submitted) * 1000)
+
+        future.add_done_callback(finished)
+        futures.append(future)
+        next_arrival += rng.expovariate(rate)
+    for future in futures:
+        future.result()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--load", type=float, default=0.8, help="target fraction of worker time in use")
+    parser.add_argument("--large-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    small, large = make_uploads()
+    pool = AnalysisPool(workers=args.workers, queue_size=1024)
+    try:
+        # Let every worker finish loading before timing
+        for future in [pool.submit(len, b"") for _ in range(args.workers)]:
+            future.result()
+        mean_seconds(pool, small[:2])
+        small_s, large_s = mean_seconds(pool, small), mean_seconds(pool, large)
+        service = (1 - args.large_ratio) * small_s + args.large_ratio * large_s
+        # Analysis times were measured one at a time: workers beyond the CPU count add no capacity
+        rate = args.load * min(args.workers, os.cpu_count() or 1) / service
+        print(f"{args.workers} workers, {os.cpu_count()} CPU(s); small resume {small_s * 1000:.0f} ms, 30-page PDF {large_s * 1000:.0f} ms; "
+              f"{rate:.1f} arrivals/s for {args.seconds:g}s ({args.large_ratio:.0%} large)")
+        for label, scheduled in (("first come, first served", False), ("size-aware fair queue", True)):
+            latencies = run(pool, small, large, rate, args.seconds, args.large_ratio, scheduled)
+            print(label)
+            print("  " + summarize("small files", latencies["small"]))
+            print("  " + summarize("30-page PDFs", latencies["large"]))
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
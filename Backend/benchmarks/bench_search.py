@@ -0,0 +1,99 @@
+"""
+Search index: indexing throughput and query latency at scale.
+
+Indexes `--resumes` synthetic resumes (default 100,000) into a fresh
+SQLite FTS5 index, in batches through add_many (bulk load) and through
+the background writer (add + flush, as the API does), then reports the
+latency percentiles of boolean, phrase, prefix, top-k and score range
+queries.
+
+The synthetic vocabulary is small, so common terms match roughly half
+of all resumes: this is the worst case for top-k ranking, which has to
+score every match.
+
+    python -m benchmarks.bench_search [--resumes 100000] [--repeat 20] [--db path]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import summarize, time_calls
+from benchmarks.corpus import SKILLS, make_resume_text
+from resume_analyzer.search import SECTIONS, ResumeIndex, section_mask
+
+QUERIES = [
+    ("one common term", {"query": "python"}),
+    ("one rare term", {"query": "muller"}),
+    ("AND", {"query": "kubernetes AND go"}),
+    ("AND of common terms", {"query": "docker AND redis AND linux"}),
+    ("OR + NOT", {"query": "(pytorch OR tensorflow) NOT react"}),
+    ("phrase", {"query": '"data pipeline"'}),
+    ("prefix", {"query": "graph*"}),
+    ("keywords field", {"query": "keywords:kubernetes"}),
+    ("term + score range", {"query": "docker", "min_score": 70, "max_score": 80}),
+    ("term, sort by score", {"query": "flask", "sort": "score"}),
+    ("score range only", {"min_score": 90}),
+    ("sections only", {"sections": ["skills", "education"], "limit": 50}),
+]
+
+
+def make_documents(count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        text = make_resume_text(i, keyword_coverage=rng.choice((0.25, 0.5, 0.75)))
+        lower = text.lower()
+        yield {
+            "digest": hashlib.sha256(f"resume-{i}".encode()).hexdigest(),
+            "filename": f"resume_{i}.pdf",
+            "role": "developer",
+            "score": rng.randint(30, 100),
+            "keywords": [skill for skill in SKILLS if skill.lower() in lower],
+            "sections": section_mask(name for name in SECTIONS if rng.random() < 0.9),
+            "text": text,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", default=None, help="Index file (default: a temporary file)")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    db_path = args.db or os.path.join(directory, "index.db")
+    index = ResumeIndex(db_path)
+
+    background = min(10000, args.resumes // 10)
+    start = time.perf_counter()
+    documents = list(make_documents(args.resumes))
+    print(f"Generated {len(documents)} resumes in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    index.add_many(documents[background:])
+    elapsed = time.perf_counter() - start
+    print(f"Bulk indexing (add_many):      {(len(documents) - background) / elapsed:8.0f} resumes/s")
+
+    start = time.perf_counter()
+    for document in documents[:background]:
+        index.add(document)
+    queued = time.perf_counter() - start
+    index.flush()
+    elapsed = time.perf_counter() - start
+    print(f"Background writer (add+flush): {background / elapsed:8.0f} resumes/s "
+          f"({queued / background * 1e6:.1f} us per add() call, {index.stats()['batches']} transactions)")
+    print(f"Index: {index.stats()['documents']} resumes, {os.path.getsize(db_path) / 2 ** 20:.0f} MB")
+
+    print(f"Top-10 queries, {args.repeat} runs each")
+    for label, options in QUERIES:
+        latencies = time_calls(lambda kwargs: index.search(**kwargs), [options], repeat=args.repeat)
+        matches = len(index.search(**dict(options, limit=args.resumes)))
+        print(summarize(f"  {label}", latencies) + f"  matches={matches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Total memory and throughput of the production server versus the current
+development setup.
+
+"app.py" is `python app.py`: Flask's development server (reloader on)
+with analyses in its process pool, whose workers each load their own NLP
+resources. "serve xN" is `python -m resume_analyzer.serve` with N
+gunicorn workers forked from a master that preloaded and froze the
+resources.
+
+For each setup, concurrent clients post a mix of PDF and DOCX resumes for
+a fixed time (errors include 503s from a full analysis queue); then the
+RSS and PSS (proportional set size, which splits shared pages between
+the processes sharing them) of the whole process tree are summed. Linux
+only.
+
+    python -m benchmarks.bench_serve [--workers 1 2 4] [--clients 8] [--seconds 15]
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.common import encode_multipart, percentile
+from benchmarks.corpus import make_resume_file
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _children(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as fh:
+                    fields = fh.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            if int(fields[1]) == pid:
+                children.append(int(entry))
+    return children
+
+
+def process_tree(pid):
+    tree = [pid]
+    for child in _children(pid):
+        tree.extend(process_tree(child))
+    return tree
+
+
+def memory_mb(pid):
+    """(RSS, PSS) of a process and all its descendants, in MB."""
+    rss = pss = 0
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/smaps_rollup") as fh:
+                for line in fh:
+                    if line.startswith("Rss:"):
+                        rss += int(line.split()[1])
+                    elif line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+        except OSError:
+            continue
+    return rss / 1024, pss / 1024
+
+
+def wait_ready(base_url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + "/api/health/ready", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{base_url} did not become ready")
+
+
+def load(base_url, documents, clients, seconds):
+    """
+    Posts documents from `clients` threads for `seconds`, each cycling
+    through all of them; returns (successful req/s, latencies, errors).
+    """
+    url = base_url + "/api/analyze-resume"
+    bodies = [encode_multipart({"resumeFile": (name, data)}) for name, data in documents]
+    deadline = time.monotonic() + seconds
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def client(offset):
+        i = offset
+        while time.monotonic() < deadline:
+            body, content_type = bodies[i % len(bodies)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    json.loads(response.read())
+                with lock:
+                    latencies.append((time.perf_counter() - start) * 1000)
+            except (urllib.error.URLError, OSError) as e:
+                with lock:
+                    errors.append(e)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies) / (time.perf_counter() - start), latencies, errors
+
+
+def run_setup(label, command, port, documents, args):
+    env = dict(os.environ, RESUME_CACHE_SIZE="0", RESUME_LOG_LEVEL="WARNING")
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=True)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(base_url)
+        # A first round of requests, so every process has warmed up
+        load(base_url, documents, args.clients, 2)
+        idle_rss, idle_pss = memory_mb(process.pid)
+        rps, latencies, errors = load(base_url, documents, args.clients, args.seconds)
+        rss, pss = memory_mb(process.pid)
+        print(f"{label:<14} {len(process_tree(process.pid)):>5} {idle_pss:>9.0f} {rss:>8.0f} {pss:>8.0f} "
+              f"{rps:>7.1f} {percentile(latencies, 50):>8.0f} {percentile(latencies, 99):>8.0f} {len(errors):>6}")
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--port", type=int, default=5071)
+    args = parser.parse_args()
+
+    documents = [(f"resume.{kind}", make_resume_file(seed, kind)) for seed in range(10) for kind in ("pdf", "docx")]
+    print(f"{os.cpu_count()} CPU(s), {args.clients} clients for {args.seconds:g}s, PDF/DOCX mix, cache off")
+    print(f"{'setup':<14} {'procs':>5} {'idle PSS':>9} {'RSS MB':>8} {'PSS MB':>8} {'req/s':>7} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'errors':>6}")
+
+    # app.py always listens on 127.0.0.1:5000
+    run_setup("app.py", [sys.executable, "app.py"], 5000, documents, args)
+    for workers in args.workers:
+        command = [sys.executable, "-m", "resume_analyzer.serve", "--bind", f"127.0.0.1:{args.port}",
+                   "--workers", str(workers)]
+        run_setup(f"serve x{workers}", command, args.port, documents, args)
+
+
+if __name__ == "__main__":
+    main()
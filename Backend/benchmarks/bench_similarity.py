@@ -0,0 +1,68 @@
+"""
+Ranking many resumes against one job description: one sparse CSR
+matrix-vector product over every resume versus job_match() per resume.
+
+Resume texts are generated (no extraction); the IDF table is built from
+the same corpus. Vectorizing (done once, as resumes are indexed) is timed
+separately from ranking (done per job description).
+
+    python -m benchmarks.bench_similarity [--resumes 10000] [--queries 5]
+"""
+
+import argparse
+import time
+
+from benchmarks.common import summarize
+from benchmarks.corpus import make_resume_text
+from resume_analyzer import similarity
+from resume_analyzer.similarity import IdfTable, ResumeMatrix, job_match
+
+JOB_DESCRIPTIONS = [
+    "Backend Python developer: Django, REST APIs, PostgreSQL, Docker and Kubernetes.",
+    "Frontend engineer with React, TypeScript, HTML and CSS.",
+    "Data scientist: machine learning, pandas, scikit-learn, SQL and statistics.",
+    "DevOps engineer, AWS, CI/CD pipelines, Terraform and Linux.",
+    "Java developer with Spring, microservices and Git.",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = [make_resume_text(seed, keyword_coverage=(seed % 10) / 10) for seed in range(args.resumes)]
+    queries = (JOB_DESCRIPTIONS * args.queries)[:args.queries]
+
+    start = time.perf_counter()
+    idf = IdfTable.build(texts)
+    print(f"IDF table: {len(idf.idf)} terms from {idf.documents} resumes in {time.perf_counter() - start:.2f}s")
+    # job_match() uses the process-wide table
+    similarity._idf_table = idf
+
+    start = time.perf_counter()
+    matrix = ResumeMatrix(idf)
+    for seed, text in enumerate(texts):
+        matrix.add(f"resume_{seed}", text)
+    matrix.matrix()
+    print(f"Vectorized {len(matrix)} resumes ({matrix.matrix().nnz} non-zeros) in {time.perf_counter() - start:.2f}s")
+
+    sparse, loop = [], []
+    for query in queries:
+        start = time.perf_counter()
+        ranked = matrix.rank(query, top_k=10)
+        sparse.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        scores = [(job_match(text, query)["score"], seed) for seed, text in enumerate(texts)]
+        loop.append((time.perf_counter() - start) * 1000)
+        assert ranked[0][1] * 100 >= max(scores)[0] - 1
+
+    print(f"Ranking {len(matrix)} resumes per job description")
+    print(summarize("  job_match per resume (before)", loop))
+    print(summarize("  sparse matrix product (after)", sparse))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Worker startup time: how long `import app` takes (what each gunicorn
+worker pays before it can answer /api/health) and how long until NLP
+resources are ready, for each RESUME_NLP_WARMUP mode.
+
+"eager" matches the old behaviour of loading nltk/spaCy at import time
+(minus the download attempts).
+
+    python -m benchmarks.bench_startup [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.common import percentile
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+serving = time.perf_counter() - start
+client = app.app.test_client()
+assert client.get('/api/health').status_code == 200
+from resume_analyzer import resources
+resources.warm_up(background=False)
+ready = time.perf_counter() - start
+print(json.dumps({"serving": serving, "ready": ready}))
+"""
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(mode):
+    env = dict(os.environ, RESUME_NLP_WARMUP=mode)
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for mode in ("eager", "background", "lazy"):
+        samples = [measure(mode) for _ in range(args.runs)]
+        serving = [s["serving"] * 1000 for s in samples]
+        ready = [s["ready"] * 1000 for s in samples]
+        print(
+            f"{mode:<11} serving /api/health after p50={percentile(serving, 50):7.1f} ms"
+            f"   NLP ready after p50={percentile(ready, 50):7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
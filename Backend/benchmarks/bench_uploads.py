@@ -0,0 +1,104 @@
+"""
+Upload handling without the temp_uploads round trip.
+
+1. Per-request cost of analyzing from memory versus the old
+   save-to-temp_uploads / reopen / delete round trip.
+2. Load test: concurrent uploads that all use the same filename
+   ("resume.docx") against a live threaded server, checking every
+   response carries the score of its own file.
+
+    python -m benchmarks.bench_uploads [--clients 8] [--requests 200]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+
+os.environ.setdefault("RESUME_NLP_WARMUP", "eager")
+os.environ.setdefault("RESUME_CACHE_SIZE", "0")
+
+from werkzeug.serving import make_server
+
+import app as backend
+from benchmarks.common import encode_multipart, summarize, time_calls
+from benchmarks.corpus import make_docx_bytes, make_resume_text
+from resume_analyzer.nlp_processor import process_resume_file
+
+
+def via_temp_file(data, directory):
+    path = os.path.join(directory, "resume.docx")
+    with open(path, "wb") as fh:
+        fh.write(data)
+    os.path.getsize(path)
+    try:
+        return process_resume_file(path)
+    finally:
+        os.remove(path)
+
+
+def post(url, data):
+    body, content_type = encode_multipart({"resumeFile": ("resume.docx", data)})
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return json.loads(response.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--docs", type=int, default=40)
+    args = parser.parse_args()
+
+    documents = [make_docx_bytes(make_resume_text(seed, pages=1 + seed % 3)) for seed in range(args.docs)]
+    expected = [process_resume_file(io.BytesIO(d), filename="resume.docx")["atsScore"] for d in documents]
+
+    print("Per-request analysis cost (DOCX)")
+    with tempfile.TemporaryDirectory() as directory:
+        print(summarize("  temp file round trip", time_calls(lambda d: via_temp_file(d, directory), documents, 3)))
+    print(summarize("  in memory", time_calls(
+        lambda d: process_resume_file(io.BytesIO(d), filename="resume.docx"), documents, 3)))
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/api/analyze-resume"
+
+    latencies = []
+    mismatches = []
+    lock = threading.Lock()
+    counter = iter(range(args.requests))
+
+    def client():
+        for i in counter:
+            index = i % len(documents)
+            start = time.perf_counter()
+            result = post(url, documents[index])
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if result.get("atsScore") != expected[index]:
+                    mismatches.append(index)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"\nLoad test: {args.requests} same-name uploads, {args.clients} concurrent clients")
+    print(summarize("  HTTP latency", latencies))
+    print(f"  throughput: {len(latencies) / elapsed:.1f} req/s, wrong results: {len(mismatches)}")
+
+
+if __name__ == "__main__":
+    main()
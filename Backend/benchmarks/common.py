@@ -0,0 +1,53 @@
+import time
+import uuid
+
+
+def percentile(samples, pct):
+    """Returns the pct-th percentile (nearest-rank) of a list of numbers."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def time_calls(func, inputs, repeat=1):
+    """Calls func once per input (repeat times) and returns latencies in ms."""
+    latencies = []
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            func(item)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(label, latencies_ms):
+    """Returns a one-line p50/p99 summary of a latency list."""
+    return (
+        f"{label:<28} n={len(latencies_ms):<5} "
+        f"p50={percentile(latencies_ms, 50):8.3f} ms  "
+        f"p99={percentile(latencies_ms, 99):8.3f} ms"
+    )
+
+
+def encode_multipart(files, fields=None):
+    """
+    Encodes a multipart/form-data body.
+
+    files: {field: (filename, bytes)}; fields: {field: str}.
+    Returns (body bytes, content type).
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in (fields or {}).items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, data) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n".encode() + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
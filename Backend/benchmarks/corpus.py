@@ -0,0 +1,234 @@
+import io
+import random
+
+# ----------------------------------------------------------
+# Deterministic synthetic resume text
+# ----------------------------------------------------------
+
+FIRST_NAMES = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Avery", "Quinn"]
+LAST_NAMES = ["Smith", "Patel", "Garcia", "Nguyen", "Kim", "Okafor", "Rossi", "Muller"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Hooli", "Stark Industries"]
+TITLES = ["Software Engineer", "Backend Developer", "Data Scientist", "Full Stack Developer"]
+SCHOOLS = ["State University", "Institute of Technology", "City College"]
+SKILLS = [
+    "Python", "Flask", "React", "TypeScript", "SQL", "Git", "Docker", "Kubernetes",
+    "Pandas", "NumPy", "TensorFlow", "PyTorch", "AWS", "Linux", "Redis", "GraphQL",
+]
+VERBS = [
+    "Developed", "Created", "Implemented", "Designed", "Managed", "Led", "Improved",
+    "Optimized", "Built", "Delivered", "Launched", "Maintained", "Supported",
+]
+OBJECTS = [
+    "a billing service", "the data pipeline", "internal dashboards", "REST APIs",
+    "the CI workflow", "a recommendation engine", "customer onboarding flows",
+]
+METRICS = ["by 30%", "for 2000+ users", "saving $50000 per year", "within 6 months", "", ""]
+
+# Roughly how many words fit on one page of a resume.
+WORDS_PER_PAGE = 450
+
+
+# Section layout: which sections a resume has, in order. The header (name,
+# contact line) always comes first.
+SECTIONS = ("summary", "skills", "experience", "education", "projects")
+
+
+def make_resume_lines(seed, pages=1, keyword_coverage=0.5, sections=SECTIONS, table_density=0.0):
+    """
+    Builds a resume as a list of lines, reproducible per seed.
+
+    A line is a string, or a tuple of cells for a table row. Each
+    experience entry is laid out as a table (title/company/year row, then
+    one row per achievement) with probability `table_density`.
+    `keyword_coverage` is the fraction of SKILLS the candidate lists.
+    """
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, max(1, int(len(SKILLS) * keyword_coverage)))
+
+    content = {"header": [name, f"Email: {name.lower().replace(' ', '.')}@example.com | Phone: 555-01{rng.randint(10, 99)}"]}
+    content["summary"] = [
+        "Summary",
+        f"{rng.choice(TITLES)} with {rng.randint(2, 12)} years of experience building software.",
+    ]
+    content["skills"] = ["Technical Skills", ", ".join(skills)]
+
+    # Experience fills the resume up to the target length
+    experience = ["Professional Experience"]
+    words = sum(_word_count(line) for section in content.values() for line in section) + 2
+    target_words = WORDS_PER_PAGE * pages
+    while words < target_words:
+        if len(experience) > 1:
+            experience.append("")
+        title = rng.choice(TITLES)
+        company = rng.choice(COMPANIES)
+        year = rng.randint(2012, 2024)
+        bullets = [
+            (rng.choice(VERBS), rng.choice(OBJECTS), rng.choice(skills), rng.choice(METRICS))
+            for _ in range(rng.randint(3, 6))
+        ]
+        if table_density and rng.random() < table_density:
+            entry = [(title, company, str(year))]
+            entry += [(f"{verb} {obj}", f"using {skill}", metric) for verb, obj, skill, metric in bullets]
+        else:
+            entry = [f"{title} - {company} ({year})"]
+            entry += [f"- {verb} {obj} using {skill} {metric}".rstrip() for verb, obj, skill, metric in bullets]
+        experience += entry
+        words += sum(_word_count(line) for line in entry)
+    content["experience"] = experience
+
+    content["education"] = ["Education", f"B.Sc. Computer Science, {rng.choice(SCHOOLS)}, {rng.randint(2008, 2020)}"]
+    content["projects"] = ["Projects", f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} with {rng.choice(skills)}"]
+
+    lines = list(content["header"])
+    for section in sections:
+        lines.append("")
+        lines += content[section]
+    return lines
+
+
+def _word_count(line):
+    if isinstance(line, tuple):
+        return sum(len(cell.split()) for cell in line)
+    return len(line.split())
+
+
+def lines_to_text(lines):
+    """Plain text of make_resume_lines() output, table cells joined by ' | '."""
+    return "\n".join(" | ".join(line) if isinstance(line, tuple) else line for line in lines)
+
+
+def make_resume_text(seed, pages=1, keyword_coverage=0.5, sections=SECTIONS, table_density=0.0):
+    """Builds a plain-text resume of about `pages` pages, reproducible per seed."""
+    return lines_to_text(make_resume_lines(seed, pages, keyword_coverage, sections, table_density))
+
+
+def make_corpus(count, pages=1, seed=0):
+    """Returns `count` synthetic resumes with varying keyword coverage."""
+    return [
+        make_resume_text(seed + i, pages=pages, keyword_coverage=0.2 + 0.6 * ((i % 5) / 4))
+        for i in range(count)
+    ]
+
+
+def make_docx_bytes(text):
+    """
+    Builds a DOCX file in memory with one paragraph per line.
+
+    `text` is a string or make_resume_lines() output, whose consecutive
+    table rows become one table.
+    """
+    from docx import Document
+
+    document = Document()
+    lines = text.splitlines() if isinstance(text, str) else text
+    table = None
+    for line in lines:
+        if isinstance(line, tuple):
+            if table is None:
+                table = document.add_table(rows=0, cols=len(line))
+            cells = table.add_row().cells
+            for cell, value in zip(cells, line):
+                cell.text = value
+        else:
+            table = None
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+# Lines of 10pt text that fit on one US-letter PDF page.
+PDF_LINES_PER_PAGE = 60
+
+
+def make_pdf_bytes(text, image_pages=()):
+    """
+    Builds a text-based PDF in memory, PDF_LINES_PER_PAGE lines per page.
+
+    `text` is a string or make_resume_lines() output; table rows are drawn
+    as cells in fixed columns. Pages numbered in `image_pages` (1-based)
+    are inserted as image-only pages, like a scanned sheet with no
+    selectable text. Only uses the standard Helvetica font, so no PDF
+    library is required.
+    """
+    lines = text.splitlines() if isinstance(text, str) else list(text)
+    chunks = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)] or [[]]
+    for number in sorted(image_pages):
+        chunks.insert(number - 1, None)
+
+    # Object 1: catalog, 2: page tree, 3: font, 4: 8x8 grey image; pages follow
+    objects = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    pixels = bytes(range(0, 256, 4))
+    objects.append(
+        b"<< /Type /XObject /Subtype /Image /Width 8 /Height 8 /ColorSpace /DeviceGray "
+        b"/BitsPerComponent 8 /Length %d >>\nstream\n" % len(pixels) + pixels + b"\nendstream"
+    )
+    page_ids = []
+    for chunk in chunks:
+        if chunk is None:
+            content = b"q 500 0 0 700 50 50 cm /Im1 Do Q"
+        else:
+            content = b"BT /F1 10 Tf 12 TL 50 760 Td " + b" ".join(_pdf_line(line) for line in chunk) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 3 0 R >> /XObject << /Im1 4 0 R >> >> >>" % len(objects)
+        )
+        page_ids.append(len(objects))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % i for i in page_ids), len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+# Left edges of table columns, relative to the text margin
+PDF_COLUMN_OFFSETS = (0, 200, 340)
+
+
+def _pdf_string(text):
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(%s)" % escaped.encode("latin-1", "replace")
+
+
+def _pdf_line(line):
+    if not isinstance(line, tuple):
+        return _pdf_string(line) + b" Tj T*"
+    # Move to each column, then back to the margin for the next line
+    parts = []
+    x = 0
+    for offset, cell in zip(PDF_COLUMN_OFFSETS, line):
+        if offset != x:
+            parts.append(b"%d 0 Td" % (offset - x))
+            x = offset
+        parts.append(_pdf_string(cell) + b" Tj")
+    if x:
+        parts.append(b"%d 0 Td" % -x)
+    parts.append(b"T*")
+    return b" ".join(parts)
+
+
+# ----------------------------------------------------------
+# Resume files of a controlled shape
+# ----------------------------------------------------------
+
+def make_resume_file(seed, file_type="docx", pages=1, keyword_coverage=0.5, sections=SECTIONS, table_density=0.0):
+    """Returns the bytes of a synthetic 'pdf' or 'docx' resume (see make_resume_lines)."""
+    lines = make_resume_lines(seed, pages, keyword_coverage, sections, table_density)
+    if file_type == "pdf":
+        return make_pdf_bytes(lines)
+    if file_type == "docx":
+        return make_docx_bytes(lines)
+    raise ValueError(f"Unknown file type '{file_type}'")
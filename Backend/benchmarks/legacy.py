@@ -0,0 +1,181 @@
+"""
+Reference copy of analyze_resume_text as it was before the single-pass
+rule engine (minus the discarded spaCy parse). Used as the "before" side
+of benchmarks and to check that scores and tips stay byte-identical.
+"""
+
+import re
+
+
+def legacy_analyze_resume_text(raw_text, job_keywords):
+    """
+    Analyzes resume text based on ATS (Applicant Tracking System) criteria.
+    
+    Analysis Basis:
+    - Keyword Optimization: Matches resume against target job keywords
+    - Structural Completeness: Checks for essential resume sections
+    - Content Quality: Evaluates depth, clarity, and impact
+    - ATS Compatibility: Ensures resume can be parsed by ATS systems
+    
+    Returns:
+        dict with atsScore, keywordSuggestions, and formattingTips
+    """
+    if not raw_text:
+        return {
+            "atsScore": 0,
+            "keywordSuggestions": job_keywords.copy() if job_keywords else [],
+            "formattingTips": ["Could not read file text. Please ensure the file is not corrupted and is a valid PDF or DOCX format."]
+        }
+
+    text_lower = raw_text.lower()
+    text_words = raw_text.split()
+    word_count = len(text_words)
+    
+    score = 0
+    matched_keywords = []
+    tips = []
+
+    # ============================================
+    # 1. KEYWORD OPTIMIZATION (40 points max)
+    # ============================================
+    keyword_score = 0
+    max_keyword_points = min(40, len(job_keywords) * 8)
+    points_per_keyword = max_keyword_points / len(job_keywords) if job_keywords else 0
+    
+    for kw in job_keywords:
+        # Check for exact keyword match (case-insensitive)
+        if kw.lower() in text_lower:
+            keyword_score += points_per_keyword
+            matched_keywords.append(kw)
+        # Also check for partial matches (e.g., "Python" matches "Python3", "Pythonic")
+        elif any(kw.lower() in word.lower() for word in text_words if len(word) > 3):
+            keyword_score += points_per_keyword * 0.5  # Partial credit
+            matched_keywords.append(kw)
+    
+    score += int(keyword_score)
+    
+    # ============================================
+    # 2. STRUCTURAL COMPLETENESS (30 points max)
+    # ============================================
+    structural_score = 0
+    
+    # Skills section check (10 points)
+    skills_patterns = [r"\bskills\b", r"\btechnical\s+skills\b", r"\bcompetencies\b", r"\bproficiencies\b"]
+    has_skills = any(re.search(pattern, text_lower) for pattern in skills_patterns)
+    if has_skills:
+        structural_score += 10
+    else:
+        tips.append("Add a dedicated 'Skills' or 'Technical Skills' section to highlight your competencies.")
+    
+    # Experience section check (10 points)
+    experience_patterns = [r"\bexperience\b", r"\bwork\s+history\b", r"\bemployment\b", r"\bprofessional\s+experience\b", r"\bwork\s+experience\b"]
+    has_experience = any(re.search(pattern, text_lower) for pattern in experience_patterns)
+    if has_experience:
+        structural_score += 10
+    else:
+        tips.append("Add an 'Experience', 'Work History', or 'Professional Experience' section.")
+    
+    # Education section check (5 points)
+    education_patterns = [r"\beducation\b", r"\bacademic\b", r"\bqualifications\b"]
+    has_education = any(re.search(pattern, text_lower) for pattern in education_patterns)
+    if has_education:
+        structural_score += 5
+    else:
+        tips.append("Include an 'Education' section with your academic qualifications.")
+    
+    # Contact information check (5 points)
+    contact_patterns = [r"@", r"\bemail\b", r"\bphone\b", r"\bmobile\b", r"\bcontact\b"]
+    has_contact = any(re.search(pattern, text_lower) for pattern in contact_patterns)
+    if has_contact:
+        structural_score += 5
+    else:
+        tips.append("Ensure your contact information (email, phone) is clearly visible.")
+    
+    score += structural_score
+
+    # ============================================
+    # 3. CONTENT QUALITY (20 points max)
+    # ============================================
+    content_score = 0
+    
+    # Length check (10 points)
+    if 200 <= word_count <= 800:  # Ideal range: 200-800 words
+        content_score += 10
+    elif word_count < 200:
+        content_score += 5
+        tips.append(f"Your resume is quite short ({word_count} words). Add more detail about your experience, projects, and achievements.")
+    elif word_count > 800:
+        content_score += 5
+        tips.append(f"Your resume is lengthy ({word_count} words). Consider condensing to 1-2 pages for better readability.")
+    else:
+        content_score += 3
+    
+    # Action verbs check (5 points) - Strong action verbs indicate impact
+    action_verbs = ["developed", "created", "implemented", "designed", "managed", "led", "improved", 
+                    "achieved", "optimized", "built", "delivered", "executed", "launched", "established"]
+    action_verb_count = sum(1 for verb in action_verbs if verb in text_lower)
+    if action_verb_count >= 5:
+        content_score += 5
+    elif action_verb_count >= 3:
+        content_score += 3
+        tips.append("Use more action verbs (e.g., 'developed', 'created', 'implemented') to make your achievements stand out.")
+    else:
+        tips.append("Include more action verbs to describe your accomplishments and responsibilities.")
+    
+    # Quantifiable achievements check (5 points)
+    number_patterns = [r"\d+%", r"\d+\+", r"\$\d+", r"\d+\s+(years?|months?)", r"\d+\s+(people|users|customers)"]
+    has_numbers = any(re.search(pattern, text_lower) for pattern in number_patterns)
+    if has_numbers:
+        content_score += 5
+    else:
+        tips.append("Add quantifiable metrics (percentages, numbers, timeframes) to demonstrate your impact.")
+    
+    score += content_score
+
+    # ============================================
+    # 4. ATS COMPATIBILITY (10 points max)
+    # ============================================
+    ats_score = 10  # Base score - if text was extracted, it's likely ATS-compatible
+    ats_tips = []
+    
+    # Check for common ATS-unfriendly elements
+    if re.search(r"\.(jpg|jpeg|png|gif)", text_lower):
+        ats_tips.append("Avoid embedding images in your resume. ATS systems cannot read text from images.")
+    
+    # Check for proper section headers
+    section_headers = ["summary", "objective", "skills", "experience", "education", "projects"]
+    found_headers = sum(1 for header in section_headers if re.search(rf"\b{header}\b", text_lower))
+    if found_headers < 3:
+        ats_tips.append("Use clear, standard section headers (e.g., 'Experience', 'Education', 'Skills') for better ATS parsing.")
+    
+    if ats_tips:
+        tips.extend(ats_tips)
+    
+    score += ats_score
+
+    # ============================================
+    # FINAL SCORE CALCULATION
+    # ============================================
+    # Normalize to 0-100 scale
+    max_possible_score = 100  # 40 + 30 + 20 + 10
+    ats_final_score = min(100, max(0, int((score / max_possible_score) * 100)))
+    
+    # Ensure we always return lists
+    keyword_suggestions = [kw for kw in job_keywords if kw not in matched_keywords]
+    
+    # Add positive feedback if score is high
+    if ats_final_score >= 80:
+        if not any("good" in tip.lower() or "great" in tip.lower() for tip in tips):
+            tips.insert(0, "Excellent resume! Your resume shows strong ATS compatibility and structure.")
+    elif ats_final_score >= 60:
+        tips.insert(0, "Your resume has a solid foundation. Consider the suggestions below to improve your ATS score further.")
+    
+    # If no tips, add a generic positive message
+    if not tips:
+        tips.append("Your resume structure looks good! Keep up the great work.")
+
+    return {
+        "atsScore": ats_final_score,
+        "keywordSuggestions": keyword_suggestions,
+        "formattingTips": tips
+    }
@@ -0,0 +1,194 @@
+"""
+Benchmark suite with a regression gate.
+
+Times extract_text_from_file, analyze_resume_text and process_resume_file
+on deterministic synthetic PDF and DOCX corpora of several shapes (see
+PROFILES), writes the results as JSON and compares each stage's time with
+a stored baseline. Exits with status 1 if any stage got slower than the
+baseline by more than --threshold percent.
+
+    python -m benchmarks.run [--docs 20] [--repeat 3] [--threshold 25]
+                             [--output benchmark_results.json]
+                             [--baseline benchmarks/baseline.json] [--save-baseline]
+
+Baselines are only comparable on the machine they were recorded on:
+record one with --save-baseline before tuning, then rerun after.
+Everything runs offline; no model downloads are needed.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+from benchmarks.common import percentile
+from benchmarks.corpus import SECTIONS, make_resume_file
+from resume_analyzer.catalog import resolve_role
+from resume_analyzer.nlp_processor import SCORING_VERSION, analyze_resume_text, extract_text_from_file, process_resume_file
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Corpus shapes: keyword arguments for make_resume_file()
+PROFILES = {
+    "docx-1p": {"file_type": "docx", "pages": 1},
+    "docx-3p-tables": {"file_type": "docx", "pages": 3, "table_density": 0.5},
+    "pdf-1p": {"file_type": "pdf", "pages": 1},
+    "pdf-3p-tables": {"file_type": "pdf", "pages": 3, "table_density": 0.5},
+    "pdf-2p-sparse": {"file_type": "pdf", "pages": 2, "keyword_coverage": 0.1,
+                      "sections": ("experience", "education")},
+}
+
+STAGES = ("extract", "analyze", "process")
+
+
+def make_profile_corpus(profile, docs):
+    spec = dict(PROFILES[profile])
+    file_type = spec.pop("file_type")
+    spec.setdefault("sections", SECTIONS)
+    filename = f"resume.{file_type}"
+    return [(make_resume_file(seed, file_type, **spec), filename) for seed in range(docs)]
+
+
+# A timed round over a corpus is repeated until it lasts at least this long,
+# so sub-millisecond stages are not dominated by timer and scheduling noise.
+MIN_ROUND_SECONDS = 0.2
+
+
+def time_stage(func, inputs, repeat):
+    """
+    Warms up once, then times `repeat` rounds over the inputs.
+
+    Returns (per-call latencies in ms, best round's mean ms per call). The
+    best round mean is what the regression gate compares: it is the most
+    stable figure on a shared or noisy machine.
+    """
+    start = time.perf_counter()
+    for item in inputs:
+        func(item)
+    passes = max(1, math.ceil(MIN_ROUND_SECONDS / max(time.perf_counter() - start, 1e-9)))
+    gc.collect()
+    latencies = []
+    round_means = []
+    for _ in range(repeat):
+        round_start = time.perf_counter()
+        for _ in range(passes):
+            for item in inputs:
+                start = time.perf_counter()
+                func(item)
+                latencies.append((time.perf_counter() - start) * 1000)
+        round_means.append((time.perf_counter() - round_start) * 1000 / (passes * len(inputs)))
+    return latencies, min(round_means)
+
+
+def run_profile(profile, docs, repeat, keywords):
+    files = make_profile_corpus(profile, docs)
+    texts = [extract_text_from_file(data, filename) for data, filename in files]
+    stage_funcs = {
+        "extract": (lambda item: extract_text_from_file(*item), files),
+        "analyze": (lambda text: analyze_resume_text(text, keywords), texts),
+        "process": (lambda item: process_resume_file(*item), files),
+    }
+    results = {}
+    for stage in STAGES:
+        func, inputs = stage_funcs[stage]
+        latencies, best_mean = time_stage(func, inputs, repeat)
+        results[f"{profile}/{stage}"] = {
+            "bestMeanMs": round(best_mean, 4),
+            "p50Ms": round(percentile(latencies, 50), 4),
+            "p95Ms": round(percentile(latencies, 95), 4),
+            "samples": len(latencies),
+        }
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "scoringVersion": SCORING_VERSION,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns (name, baseline ms, current ms, change %) for every benchmark
+    in both runs, comparing best round means, and the names that regressed
+    by more than threshold %.
+    """
+    rows = []
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get("bestMeanMs"):
+            continue
+        change = (current["bestMeanMs"] / previous["bestMeanMs"] - 1) * 100
+        rows.append((name, previous["bestMeanMs"], current["bestMeanMs"], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20, help="documents per profile")
+    parser.add_argument("--repeat", type=int, default=3, help="timed rounds over each corpus")
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES),
+                        help="run only these profiles (repeatable)")
+    parser.add_argument("--threshold", type=float, default=25.0,
+                        help="allowed slowdown vs the baseline, in percent")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    keywords = resolve_role().keywords
+    results = {}
+    for profile in args.profile or PROFILES:
+        profile_results = run_profile(profile, args.docs, args.repeat, keywords)
+        for name, stats in profile_results.items():
+            print(f"{name:<24} best mean={stats['bestMeanMs']:9.3f} ms  "
+                  f"p50={stats['p50Ms']:9.3f} ms  p95={stats['p95Ms']:9.3f} ms")
+        results.update(profile_results)
+
+    report = {
+        "environment": environment(),
+        "config": {"docs": args.docs, "repeat": args.repeat},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return 0
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    if baseline.get("environment") != report["environment"]:
+        print("Warning: baseline was recorded in a different environment:", baseline.get("environment"))
+
+    rows, regressions = compare(results, baseline.get("results", {}), args.threshold)
+    print(f"\nvs baseline (threshold +{args.threshold:g}%)")
+    for name, previous, current, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<24} {previous:9.3f} -> {current:9.3f} ms  {change:+6.1f}%{flag}")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:g}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Command line entry points for the resume analyzer.
+
+    python -m resume_analyzer download    # install NLTK stopwords + spaCy model
+    python -m resume_analyzer batch <dir|zip> [-o results.jsonl] [--role R] [--workers N]
+                                    [--job-description jd.txt] [--index resumes.db] [--dedupe]
+    python -m resume_analyzer idf <dir|zip> [-o idf.json]   # IDF table for job matching
+    python -m resume_analyzer search <resumes.db> "kubernetes AND go" [--min-score 60] [--limit 10]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+
+def cmd_download(args):
+    from resume_analyzer.resources import download_resources
+    return 0 if download_resources() else 1
+
+
+def cmd_batch(args):
+    from resume_analyzer.batch import run_batch
+    from resume_analyzer.catalog import UnknownRole, resolve_role
+    from resume_analyzer.executor import AnalysisPool
+
+    try:
+        role = resolve_role(args.role)
+    except UnknownRole as e:
+        print(e, file=sys.stderr)
+        return 2
+    job_description = None
+    if args.job_description:
+        with open(args.job_description, encoding="utf-8") as fh:
+            job_description = fh.read()
+
+    def progress(summary, record):
+        if record["status"] == "error":
+            print(f"  {record['file']}: {record['error'].splitlines()[0]}", file=sys.stderr)
+        elif summary.processed % 100 == 0:
+            print(f"  {summary.processed} files analyzed", file=sys.stderr)
+
+    index = None
+    if args.index:
+        from resume_analyzer.search import ResumeIndex
+        index = ResumeIndex(args.index)
+    dedupe = None
+    if args.dedupe:
+        from resume_analyzer.dedupe import DuplicateIndex
+        dedupe = DuplicateIndex(args.dedupe_threshold)
+
+    pool = AnalysisPool(workers=args.workers, timeout=args.timeout) if args.workers != 0 else None
+    try:
+        summary = run_batch(args.path, args.output, pool=pool, restart=args.restart, progress=progress, role=role.id,
+                            job_description=job_description, index=index, dedupe=dedupe)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    latency = summary["latencyMs"]
+    print(f"Analyzed {summary['processed']} files for role '{role.id}' ({summary['skipped']} already done, "
+          f"{summary['errors']} errors, {summary['duplicates']} duplicates) in {summary['seconds']}s -> {args.output}")
+    print(f"  {summary['filesPerSecond']} files/s, per-file latency "
+          f"p50 {latency['p50']}ms  p95 {latency['p95']}ms  p99 {latency['p99']}ms")
+    for match in summary.get("topMatches", ()):
+        print(f"  {match['score']:>3}  {match['file']}")
+    if args.summary:
+        print(json.dumps(summary))
+    return 0 if summary["errors"] == 0 else 1
+
+
+def cmd_search(args):
+    from resume_analyzer.search import InvalidQuery, ResumeIndex
+
+    if not os.path.exists(args.db):
+        print(f"No search index at {args.db}", file=sys.stderr)
+        return 2
+    try:
+        results = ResumeIndex(args.db).search(args.query, min_score=args.min_score, max_score=args.max_score,
+                                              role=args.role, sections=args.section, sort=args.sort,
+                                              limit=args.limit, collapse=args.collapse)
+    except InvalidQuery as e:
+        print(e, file=sys.stderr)
+        return 2
+    for result in results:
+        duplicates = f"  (+{result['duplicates']} near duplicates)" if result.get("duplicates") else ""
+        print(f"{result['atsScore']:>3}  {result['file']}  [{', '.join(result['keywords'])}]{duplicates}")
+        if result["snippet"]:
+            print(f"       {' '.join(result['snippet'].split())}")
+    return 0
+
+
+def cmd_idf(args):
+    from resume_analyzer.batch import iter_batch_inputs
+    from resume_analyzer.nlp_processor import extract_text_from_file
+    from resume_analyzer.similarity import IDF_PATH, IdfTable
+
+    def texts():
+        for name, load in iter_batch_inputs(args.path):
+            try:
+                text = extract_text_from_file(load(), name)
+            except Exception as e:
+                print(f"  {name}: {e}", file=sys.stderr)
+                continue
+            if text:
+                yield text
+
+    table = IdfTable.build(texts())
+    if not table.documents:
+        print(f"No readable resumes found in {args.path}", file=sys.stderr)
+        return 1
+    output = args.output or IDF_PATH
+    table.save(output)
+    print(f"IDF table of {len(table.idf)} terms from {table.documents} resumes -> {output}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m resume_analyzer", description="Resume analyzer tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    download = subparsers.add_parser("download", help="Download NLP models and corpora (run once at deploy time)")
+    download.set_defaults(func=cmd_download)
+
+    batch = subparsers.add_parser("batch", help="Analyze a directory or zip of resumes into a JSON Lines file")
+    batch.add_argument("path", help="Directory (searched recursively) or .zip of PDF/DOCX resumes")
+    batch.add_argument("-o", "--output", default="results.jsonl",
+                       help="JSON Lines output; files already in it are skipped (default: results.jsonl)")
+    batch.add_argument("--workers", type=int, default=None,
+                       help="Worker processes (default: one per CPU, 0 = analyze inline)")
+    batch.add_argument("--role", default=None, help="Job role id or alias from the catalog (default role if omitted)")
+    batch.add_argument("--timeout", type=float, default=30, help="Per-file timeout in seconds")
+    batch.add_argument("--restart", action="store_true", help="Discard existing output and start over")
+    batch.add_argument("--summary", action="store_true", help="Also print the summary as JSON")
+    batch.add_argument("--job-description", default=None,
+                       help="Text file with a job description to match every resume against")
+    batch.add_argument("--index", default=None, help="Also add the resumes to this search index database")
+    batch.add_argument("--dedupe", action="store_true",
+                       help="Analyze one resume per group of near duplicates; list the others as duplicates")
+    batch.add_argument("--dedupe-threshold", type=float, default=None,
+                       help="Estimated similarity (0-1) from which resumes are near duplicates (default 0.8)")
+    batch.set_defaults(func=cmd_batch)
+
+    search = subparsers.add_parser("search", help="Search resumes indexed with batch --index")
+    search.add_argument("db", help="Search index database")
+    search.add_argument("query", nargs="?", default=None,
+                        help='Terms, "phrases", prefix*, AND/OR/NOT, keywords:term (default: all resumes)')
+    search.add_argument("--min-score", type=int, default=None)
+    search.add_argument("--max-score", type=int, default=None)
+    search.add_argument("--role", default=None, help="Only resumes scored for this job role id")
+    search.add_argument("--section", action="append", default=[], help="Require a section (repeatable)")
+    search.add_argument("--sort", choices=("relevance", "score"), default="relevance")
+    search.add_argument("--limit", type=int, default=10)
+    search.add_argument("--collapse", action="store_true", help="One result per group of near-duplicate resumes")
+    search.set_defaults(func=cmd_search)
+
+    idf = subparsers.add_parser("idf", help="Build the IDF table used for job description matching")
+    idf.add_argument("path", help="Directory (searched recursively) or .zip of PDF/DOCX resumes")
+    idf.add_argument("-o", "--output", default=None, help="Output JSON file (default: RESUME_IDF_PATH)")
+    idf.set_defaults(func=cmd_idf)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
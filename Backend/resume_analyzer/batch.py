@@ -0,0 +1,424 @@
+import hashlib
+import heapq
+import json
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from resume_analyzer.dedupe import fingerprint_text, minhash
+from resume_analyzer.executor import QueueFull
+from resume_analyzer.metrics import span
+from resume_analyzer.scheduler import estimate_cost
+from resume_analyzer.nlp_processor import process_resume_file
+from resume_analyzer.search import make_document
+
+# ----------------------------------------------------------
+# Batch analysis
+# ----------------------------------------------------------
+# Streams many resumes (a directory tree or a zip archive) through
+# process_resume_file on an AnalysisPool, yielding one JSON-serializable
+# record per file as soon as it completes. The CLI appends records to a
+# JSON Lines file and, when restarted, skips files already recorded there,
+# so a crash never restarts the whole batch.
+#
+# With a dedupe.DuplicateIndex, each file is first fingerprinted (a cheap
+# text pass and a MinHash signature) and a near duplicate of a file
+# already seen in the batch is not analyzed: its record has status
+# "duplicate" and names the representative it was grouped with, whose
+# record carries the analysis. A duplicate's record is held until its
+# representative's analysis succeeds; if that fails, the representative
+# is dropped from the index and its duplicates are analyzed after all. A resumed run first re-fingerprints the files the
+# earlier run analyzed, so new files are still grouped with them.
+#
+# With a pool, fingerprinting is a pool job of its own, queued ahead of
+# the analysis: the text pass still parses PDFs with pdfminer, so it gets
+# the pool's timeout and never runs on the calling (e.g. request) thread.
+# Fingerprints are still matched in the order the files came in, so the
+# same files form the same groups with or without a pool.
+
+BATCH_EXTENSIONS = (".pdf", ".docx")
+
+# Zip archives are checked against their directory before anything is
+# decompressed: a member larger than a single resume upload gets an error
+# record, and an archive with too many members or too many bytes in all
+# is rejected, so a small zip bomb cannot exhaust memory or CPU.
+MAX_FILE_BYTES = int(float(os.environ.get("RESUME_MAX_UPLOAD_MB", 10)) * 1024 * 1024)
+ZIP_MAX_MEMBERS = int(os.environ.get("RESUME_ZIP_MAX_FILES", 10000))
+ZIP_MAX_TOTAL_BYTES = int(float(os.environ.get("RESUME_ZIP_MAX_TOTAL_MB", 2048)) * 1024 * 1024)
+
+
+def analyze_batch_item(data, filename, role=None, job_description=None, for_index=False):
+    """
+    Worker-side job: analyze one file and time it. Returns (result,
+    latency_ms, search index document or None).
+    """
+    start = time.perf_counter()
+    result = process_resume_file(data, filename, role=role, job_description=job_description,
+                                 include_document=for_index)
+    latency_ms = (time.perf_counter() - start) * 1000
+    parsed = result.pop("parsedResume", None)
+    document = make_document(hashlib.sha256(data).hexdigest(), filename, result, parsed) if parsed else None
+    return result, latency_ms, document
+
+
+def iter_directory(path):
+    """Yields (name, loader) for every PDF/DOCX file under a directory, sorted."""
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.lower().endswith(BATCH_EXTENSIONS):
+                full_path = os.path.join(root, filename)
+                name = os.path.relpath(full_path, path)
+                yield name, (lambda p=full_path: _read_file(p))
+
+
+def iter_zip(source, max_file_bytes=None, max_members=None, max_total_bytes=None):
+    """
+    Returns (name, loader) for every PDF/DOCX member of a zip file (path or
+    stream). Members over `max_file_bytes` uncompressed load as a
+    ValueError; raises ValueError if the archive has more than
+    `max_members` of them or more than `max_total_bytes` in all.
+    """
+    max_file_bytes = MAX_FILE_BYTES if max_file_bytes is None else max_file_bytes
+    max_members = ZIP_MAX_MEMBERS if max_members is None else max_members
+    max_total_bytes = ZIP_MAX_TOTAL_BYTES if max_total_bytes is None else max_total_bytes
+    archive = zipfile.ZipFile(source)
+    members = [info for info in archive.infolist()
+               if not info.is_dir() and info.filename.lower().endswith(BATCH_EXTENSIONS)]
+    if len(members) > max_members:
+        raise ValueError(f"archive has {len(members)} resumes, the maximum is {max_members}")
+    # file_size is binding: zipfile stops reading a member there and fails its CRC check
+    total = sum(info.file_size for info in members if info.file_size <= max_file_bytes)
+    if total > max_total_bytes:
+        raise ValueError(f"archive expands to {total / 2 ** 20:.0f} MB, "
+                         f"the maximum is {max_total_bytes / 2 ** 20:.0f} MB")
+    return [(info.filename, (lambda i=info: _read_member(archive, i, max_file_bytes))) for info in members]
+
+
+def _read_member(archive, info, max_file_bytes):
+    if info.file_size > max_file_bytes:
+        raise ValueError(f"{info.file_size / 2 ** 20:.1f} MB uncompressed, "
+                         f"the maximum is {max_file_bytes / 2 ** 20:g} MB")
+    return archive.read(info)
+
+
+def iter_batch_inputs(path):
+    """Yields (name, loader) pairs for a directory or a zip archive."""
+    if os.path.isdir(path):
+        return iter_directory(path)
+    if zipfile.is_zipfile(path):
+        return iter_zip(path)
+    raise ValueError(f"{path} is neither a directory nor a zip archive")
+
+
+def _read_file(path):
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+def iter_batch_results(inputs, pool=None, window=None, role=None, job_description=None, index=None,
+                       dedupe=None, client=None):
+    """
+    Analyzes (name, loader) inputs and yields a record per file as it completes.
+
+    With a pool, at most `window` files are in flight (read into memory)
+    at a time; without one, files are analyzed inline one by one. `role`
+    is the catalog job role to score against (default role if None);
+    with a `job_description` every result gets a "jobMatch". With an
+    `index` (search.ResumeIndex), readable resumes are added to it. With
+    `dedupe` (dedupe.DuplicateIndex), near duplicates of earlier files are
+    reported as such instead of being analyzed. On a shared pool, `client`
+    identifies the submitter to its fair scheduler.
+    """
+    for_index = index is not None
+    inputs = iter(inputs)
+    # Duplicates of a representative whose analysis failed, to analyze after all
+    retry = deque()
+    if pool is None:
+        while True:
+            name, load = retry.popleft() if retry else next(inputs, (None, None))
+            if name is None:
+                return
+            try:
+                data = load()
+            except Exception as e:
+                yield _record(name, error=f"Could not read file: {e}")
+                continue
+            duplicate = _find_duplicate(dedupe, name, data)
+            if duplicate is not None:
+                yield duplicate
+                continue
+            try:
+                result, latency_ms, document = analyze_batch_item(data, name, role, job_description, for_index)
+            except Exception as e:
+                record = _record(name, error=str(e))
+            else:
+                if document is not None:
+                    index.add(document)
+                record = _record(name, result=result, latency_ms=latency_ms)
+            yield from _settle(record, {}, dedupe, retry)
+
+    window = window or pool.queue_size + pool.workers
+    # future -> (name, loader, data) of in-flight files, in submission order;
+    # data is set while the file is being fingerprinted, None once it is analyzed
+    in_flight = {}
+    # In-flight file -> (name, loader, record) of the duplicates found of it,
+    # reported once its analysis succeeds
+    held = {}
+    # Fingerprinted files that are not duplicates, to analyze
+    unique = deque()
+    while True:
+        if unique:
+            name, load, data = unique[0]
+            job = (analyze_batch_item, data, name, role, job_description, for_index)
+        elif len(in_flight) < window:
+            name, load = retry.popleft() if retry else next(inputs, (None, None))
+            if name is None:
+                if not in_flight:
+                    return
+                yield from _collect_completed(in_flight, index, dedupe, held, retry, unique)
+                continue
+            try:
+                data = load()
+            except Exception as e:
+                yield _record(name, error=f"Could not read file: {e}")
+                continue
+            if dedupe is None:
+                unique.append((name, load, data))
+                continue
+            job = (fingerprint, name, data)
+        else:
+            yield from _collect_completed(in_flight, index, dedupe, held, retry, unique)
+            continue
+        while True:
+            try:
+                future = pool.submit(*job, cost=estimate_cost(data, name), client=client)
+                break
+            except QueueFull:
+                # The pool is shared (e.g. with the HTTP API): wait for one of ours
+                if in_flight:
+                    yield from _collect_completed(in_flight, index, dedupe, held, retry, unique)
+                else:
+                    time.sleep(0.05)
+        if job[0] is fingerprint:
+            in_flight[future] = (name, load, data)
+        else:
+            unique.popleft()
+            in_flight[future] = (name, load, None)
+            held.setdefault(name, [])
+
+
+def fingerprint(name, data):
+    """MinHash signature of a file's text, or None if it has none."""
+    with span("fingerprint"):
+        text = fingerprint_text(data, name)
+        return minhash(text) if text else None
+
+
+def _find_duplicate(dedupe, name, data):
+    """The "duplicate" record of a file if it is a near duplicate of one seen before (None otherwise)."""
+    if dedupe is None:
+        return None
+    return _duplicate_record(dedupe, name, fingerprint(name, data))
+
+
+def _duplicate_record(dedupe, name, signature):
+    match = dedupe.match(name, signature)
+    if match is None:
+        return None
+    representative, similarity = match
+    return {"file": name, "status": "duplicate", "duplicateOf": representative, "similarity": round(similarity, 3)}
+
+
+def _settle(record, held, dedupe, retry):
+    """
+    Yields a file's record, then those of the duplicates held for it. If
+    its analysis failed it stops being a representative, and its
+    duplicates are queued in `retry` to be analyzed (or grouped) anew.
+    """
+    yield record
+    duplicates = held.pop(record["file"], ())
+    if record["status"] == "ok":
+        for _, _, duplicate in duplicates:
+            yield duplicate
+    elif dedupe is not None:
+        dedupe.remove(record["file"])
+        retry.extend((name, load) for name, load, _ in duplicates)
+
+
+def _collect_completed(in_flight, index, dedupe, held, retry, unique):
+    """
+    Waits until an in-flight file is done, then yields the records of all
+    analyses that are. Fingerprinted files are matched against `dedupe`
+    in submission order: a duplicate's record is yielded (or held), other
+    files join `unique`.
+    """
+    analyses = [future for future, (_, _, data) in in_flight.items() if data is None]
+    fingerprints = [future for future, (_, _, data) in in_flight.items() if data is not None]
+    wait(analyses + fingerprints[:1], return_when=FIRST_COMPLETED)
+    for future in analyses:
+        if future.done():
+            name, _, _ = in_flight.pop(future)
+            yield from _settle(_collect(name, future, index), held, dedupe, retry)
+    for future in fingerprints:
+        if not future.done():
+            break
+        name, load, data = in_flight.pop(future)
+        # A file that could not be fingerprinted in time is analyzed (and most likely fails) on its own
+        signature = future.result() if future.exception() is None else None
+        duplicate = _duplicate_record(dedupe, name, signature)
+        if duplicate is None:
+            unique.append((name, load, data))
+            held[name] = []
+        elif duplicate["duplicateOf"] in held:
+            held[duplicate["duplicateOf"]].append((name, load, duplicate))
+        else:
+            yield duplicate
+
+
+def _collect(name, future, index=None):
+    try:
+        result, latency_ms, document = future.result()
+    except Exception as e:
+        return _record(name, error=str(e))
+    if document is not None:
+        index.add(document)
+    return _record(name, result=result, latency_ms=latency_ms)
+
+
+def _record(name, result=None, latency_ms=None, error=None):
+    record = {"file": name, "status": "error" if error else "ok"}
+    if error:
+        record["error"] = error
+    else:
+        record["latencyMs"] = round(latency_ms, 3)
+        record["result"] = result
+    return record
+
+
+# ----------------------------------------------------------
+# Resumable JSON Lines output
+# ----------------------------------------------------------
+
+def load_completed(output_path):
+    """
+    Returns the file names already recorded in a JSON Lines output, each
+    mapped to its record's status.
+
+    A trailing partial line (from a crash mid-write) is truncated away so
+    that appended records stay valid JSON Lines.
+    """
+    if not os.path.exists(output_path):
+        return {}
+    with open(output_path, "rb+") as fh:
+        content = fh.read()
+        if content and not content.endswith(b"\n"):
+            fh.truncate(content.rfind(b"\n") + 1)
+            content = content[:content.rfind(b"\n") + 1]
+    completed = {}
+    for line in content.splitlines():
+        try:
+            record = json.loads(line)
+            completed[record["file"]] = record.get("status")
+        except (ValueError, KeyError, TypeError):
+            continue
+    return completed
+
+
+# Best job description matches listed in a batch summary
+TOP_MATCHES = 10
+
+
+class BatchSummary:
+    """Accumulates throughput, per-file latency and the best job matches of a batch run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies_ms = []
+        self.matches = []
+        self.processed = 0
+        self.errors = 0
+        self.skipped = 0
+        self.duplicates = 0
+
+    def add(self, record):
+        self.processed += 1
+        if record["status"] == "duplicate":
+            self.duplicates += 1
+        elif record["status"] == "ok":
+            self.latencies_ms.append(record["latencyMs"])
+            match = record["result"].get("jobMatch")
+            if match is not None:
+                self.matches.append((match["score"], record["file"]))
+        else:
+            self.errors += 1
+
+    def as_dict(self):
+        elapsed = time.perf_counter() - self.started
+        summary = {
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "duplicates": self.duplicates,
+            "seconds": round(elapsed, 3),
+            "filesPerSecond": round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+            "latencyMs": {
+                f"p{pct}": round(percentile(self.latencies_ms, pct), 3) for pct in (50, 95, 99)
+            },
+        }
+        if self.matches:
+            best = heapq.nlargest(TOP_MATCHES, self.matches, key=lambda match: match[0])
+            summary["topMatches"] = [{"file": name, "score": score} for score, name in best]
+        return summary
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers (0.0 when empty)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def run_batch(path, output_path, pool=None, restart=False, progress=None, role=None, job_description=None,
+              index=None, dedupe=None):
+    """
+    Analyzes every resume under `path` (directory or zip) into a JSON Lines file.
+
+    Files already present in output_path are skipped unless restart is set.
+    With an `index` (search.ResumeIndex) the analyzed resumes are also made
+    searchable; with `dedupe` (dedupe.DuplicateIndex) only one resume of
+    each group of near duplicates is analyzed. Returns the summary dict.
+    """
+    if restart and os.path.exists(output_path):
+        os.remove(output_path)
+    completed = load_completed(output_path)
+
+    summary = BatchSummary()
+    inputs = []
+    for name, load in iter_batch_inputs(path):
+        if name in completed:
+            summary.skipped += 1
+            # Files the earlier run analyzed still represent their groups
+            if dedupe is not None and completed[name] == "ok":
+                try:
+                    dedupe.add(name, fingerprint(name, load()))
+                except (OSError, ValueError):
+                    continue
+        else:
+            inputs.append((name, load))
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        for record in iter_batch_results(inputs, pool=pool, role=role, job_description=job_description,
+                                         index=index, dedupe=dedupe):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            summary.add(record)
+            if progress is not None:
+                progress(summary, record)
+    if index is not None:
+        index.flush()
+    return summary.as_dict()
@@ -0,0 +1,218 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# Content-hash result cache
+# ----------------------------------------------------------
+# Candidates re-upload the same file many times. Results are keyed by the
+# SHA-256 of the uploaded bytes, the job role and the scoring version, so a
+# re-upload skips text extraction and analysis entirely, while any change
+# to the scoring rules (bump SCORING_VERSION) invalidates old entries.
+#
+# Two tiers:
+#   - an in-process LRU with a TTL (per worker),
+#   - an optional SQLite file shared by all workers on the host.
+#
+# The SQLite tier's size is kept in `result_count` by triggers, so bounding
+# it on every write and reporting it on /api/health read one row instead of
+# counting the table.
+
+COUNT_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS result_count (entries INTEGER NOT NULL)",
+    # Databases created before the counter start from their current size
+    "INSERT INTO result_count SELECT (SELECT COUNT(*) FROM results)"
+    " WHERE NOT EXISTS (SELECT 1 FROM result_count)",
+    "CREATE TRIGGER IF NOT EXISTS results_added AFTER INSERT ON results"
+    " BEGIN UPDATE result_count SET entries = entries + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS results_removed AFTER DELETE ON results"
+    " BEGIN UPDATE result_count SET entries = entries - 1; END",
+)
+
+
+def make_cache_key(data, job_role, scoring_version, digest=None):
+    """Builds the cache key for an upload's bytes (or their SHA-256 hex digest, if already known)."""
+    digest = digest or hashlib.sha256(data).hexdigest()
+    return f"{scoring_version}:{job_role}:{digest}"
+
+
+class ResultCache:
+    """LRU + TTL in-memory cache with an optional shared SQLite tier."""
+
+    def __init__(self, max_entries=512, ttl_seconds=3600, db_path=None, db_max_entries=10000):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.db_max_entries = db_max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters = {
+            "hits": 0,
+            "memoryHits": 0,
+            "diskHits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        if db_path:
+            self._init_db()
+
+    # -------------------------
+    # Public API
+    # -------------------------
+
+    def get(self, key):
+        """Returns a copy of the cached result, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    self.counters["memoryHits"] += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+                self.counters["expirations"] += 1
+
+        value = self._db_get(key, now) if self.db_path else None
+        if value is None:
+            self._count("misses")
+            return None
+
+        self._count("hits", "diskHits")
+        self._memory_set(key, value, now)
+        return copy.deepcopy(value)
+
+    def set(self, key, value):
+        """Stores a result in every tier."""
+        now = time.time()
+        value = copy.deepcopy(value)
+        self._memory_set(key, value, now)
+        if self.db_path:
+            self._db_set(key, value, now)
+        self._count("stores")
+
+    def clear(self):
+        """Drops every entry (both tiers)."""
+        with self._lock:
+            self._entries.clear()
+        if self.db_path:
+            with self._db() as db:
+                db.execute("DELETE FROM results")
+
+    def stats(self):
+        """Returns hit/miss counters and tier sizes."""
+        with self._lock:
+            stats = dict(self.counters)
+            stats["size"] = len(self._entries)
+        stats["maxEntries"] = self.max_entries
+        stats["ttlSeconds"] = self.ttl_seconds
+        lookups = stats["hits"] + stats["misses"]
+        stats["hitRatio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        if self.db_path:
+            stats["diskSize"] = self._db().execute("SELECT entries FROM result_count").fetchone()[0]
+        return stats
+
+    # -------------------------
+    # Memory tier
+    # -------------------------
+
+    def _count(self, *names, amount=1):
+        with self._lock:
+            for name in names:
+                self.counters[name] += amount
+
+    def _memory_set(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    # -------------------------
+    # SQLite tier (shared between worker processes)
+    # -------------------------
+
+    def _db(self):
+        """This thread's connection, opened in this process: a SQLite handle must not cross a fork."""
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            # An inherited handle is abandoned, not closed: closing it could release the parent's locks
+            db = sqlite3.connect(self.db_path, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def _init_db(self):
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A short-lived connection: the cache is created at import, before the server forks
+        db = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            with db:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                    " created REAL NOT NULL, accessed REAL NOT NULL)"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+                for statement in COUNT_SCHEMA:
+                    db.execute(statement)
+        finally:
+            db.close()
+
+    def _db_get(self, key, now):
+        try:
+            db = self._db()
+            row = db.execute("SELECT value, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            with db:
+                if created + self.ttl_seconds <= now:
+                    db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._count("expirations")
+                    return None
+                db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+            return json.loads(value)
+        except sqlite3.Error as e:
+            logger.warning("Result cache read error: %s", e)
+            return None
+
+    def _db_set(self, key, value, now):
+        try:
+            with self._db() as db:
+                # An upsert, not INSERT OR REPLACE: the rows REPLACE deletes do not fire triggers
+                db.execute(
+                    "INSERT INTO results (key, value, created, accessed) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (key) DO UPDATE SET value = excluded.value, created = excluded.created,"
+                    " accessed = excluded.accessed",
+                    (key, json.dumps(value), now, now),
+                )
+                overflow = db.execute("SELECT entries FROM result_count").fetchone()[0] - self.db_max_entries
+                if overflow > 0:
+                    db.execute(
+                        "DELETE FROM results WHERE key IN "
+                        "(SELECT key FROM results ORDER BY accessed LIMIT ?)",
+                        (overflow,),
+                    )
+                    self._count("evictions", amount=overflow)
+        except sqlite3.Error as e:
+            logger.warning("Result cache write error: %s", e)
@@ -0,0 +1,358 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# Job-role keyword catalog
+# ----------------------------------------------------------
+# Roles, their keywords, keyword synonyms ("JS" for JavaScript) and role
+# aliases ("software engineer" for developer) are loaded from a JSON or
+# YAML file (data/job_roles.json by default, RESUME_CATALOG to override):
+#
+#   {"defaultRole": "developer",
+#    "synonyms": {"PostgreSQL": ["Postgres"]},          # apply to every role
+#    "roles": {"developer": {"title": "...", "aliases": ["..."],
+#                            "keywords": ["Python", {"name": "Go", "synonyms": ["Golang"],
+#                                                    "match": "word"}]}}}
+#
+# The whole catalog is compiled once into an index over normalized resume
+# tokens, so matching a resume costs the same whatever the number of roles
+# and keywords:
+#   - a canonical keyword matches anywhere inside a token ("SQL" matches
+#     "MySQL", "Python" matches "Python3"), as the analyzer always has;
+#     `"match": "word"` restricts it to whole tokens (for "Go", "R", ...),
+#   - synonyms match whole tokens only, so "JS" does not match "JSON",
+#   - multi-word terms ("machine learning", "CI/CD") match as consecutive
+#     tokens, walked through a phrase trie.
+# Each distinct resume token is resolved to catalog terms once and cached.
+# role_matrix() scores the resume's terms against every role at once (see
+# RoleMatrix).
+# The catalog file is checked for changes every RESUME_CATALOG_CHECK_SECONDS
+# and recompiled in place, without a restart.
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(__file__), "data", "job_roles.json")
+CATALOG_PATH = os.environ.get("RESUME_CATALOG", DEFAULT_CATALOG_PATH)
+CATALOG_CHECK_SECONDS = float(os.environ.get("RESUME_CATALOG_CHECK_SECONDS", 2))
+
+# Words made of letters/digits/+/#, joined by "." or "-": c++, c#, node.js, front-end
+TOKEN_RE = re.compile(r"[\w+#]+(?:[.\-][\w+#]+)*")
+
+# Distinct resume tokens remembered with their matching terms
+TOKEN_CACHE_SIZE = 100000
+
+SUBSTRING = "substring"
+WORD = "word"
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog file cannot be read or is malformed."""
+
+
+class UnknownRole(KeyError):
+    """Raised when a requested job role is not in the catalog."""
+
+    def __init__(self, name, available):
+        super().__init__(name)
+        self.name = name
+        self.available = available
+
+    def __str__(self):
+        return f"Unknown job role '{self.name}'. Available roles: {', '.join(self.available)}"
+
+
+def tokenize(text_lower):
+    """Normalized tokens of already lowercased text, in order."""
+    return TOKEN_RE.findall(text_lower)
+
+
+def normalize_name(name):
+    """Lowercased, whitespace-collapsed form used for role names and aliases."""
+    return " ".join(str(name).lower().replace("_", " ").split())
+
+
+class Role:
+    """One job role: its keywords (display names) and their catalog term ids."""
+
+    __slots__ = ("id", "title", "aliases", "keywords", "keyword_terms")
+
+    def __init__(self, role_id, title, aliases, keywords, keyword_terms):
+        self.id = role_id
+        self.title = title
+        self.aliases = aliases
+        self.keywords = keywords
+        self.keyword_terms = keyword_terms
+
+    def matched_keywords(self, found_terms):
+        """Keywords of this role with a term among `found_terms`, in catalog order."""
+        return [kw for kw, terms in zip(self.keywords, self.keyword_terms) if not terms.isdisjoint(found_terms)]
+
+    def as_dict(self):
+        return {"id": self.id, "title": self.title, "aliases": self.aliases, "keywords": self.keywords}
+
+
+class RoleCatalog:
+    """Compiled catalog: roles, alias lookup and the term index."""
+
+    def __init__(self, data, version=None):
+        if not isinstance(data, dict) or not isinstance(data.get("roles"), dict) or not data["roles"]:
+            raise CatalogError("Catalog must be an object with a non-empty 'roles' mapping")
+        self.version = version or hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:12]
+
+        self._term_ids = {}
+        self._substrings = {}
+        self._words = {}
+        self._phrases = {}
+        self._token_cache = {}
+        self._role_matrix = None
+
+        global_synonyms = {}
+        for name, synonyms in (data.get("synonyms") or {}).items():
+            global_synonyms[normalize_name(name)] = list(synonyms)
+
+        self.roles = {}
+        self._aliases = {}
+        for role_id, spec in data["roles"].items():
+            if not isinstance(spec, dict) or not isinstance(spec.get("keywords"), list):
+                raise CatalogError(f"Role '{role_id}' needs a 'keywords' list")
+            keywords = []
+            keyword_terms = []
+            for entry in spec["keywords"]:
+                if isinstance(entry, str):
+                    entry = {"name": entry}
+                name = entry.get("name")
+                if not name:
+                    raise CatalogError(f"Role '{role_id}' has a keyword without a name")
+                terms = {self._add_term(name, entry.get("match", SUBSTRING))}
+                for synonym in list(entry.get("synonyms", ())) + global_synonyms.get(normalize_name(name), []):
+                    terms.add(self._add_term(synonym, WORD))
+                terms.discard(None)
+                keywords.append(name)
+                keyword_terms.append(frozenset(terms))
+            role = Role(role_id, spec.get("title", role_id), list(spec.get("aliases", ())), keywords, keyword_terms)
+            self.roles[role_id] = role
+            for alias in [role_id] + role.aliases:
+                self._aliases.setdefault(normalize_name(alias), role_id)
+
+        self.default_role = data.get("defaultRole") or next(iter(self.roles))
+        if self.default_role not in self.roles:
+            raise CatalogError(f"defaultRole '{self.default_role}' is not a role in the catalog")
+        self._substring_lengths = sorted({len(term) for term in self._substrings})
+        self.term_count = len(self._term_ids)
+
+    def _add_term(self, text, mode):
+        """Registers a term and returns its id (None if it has no tokens)."""
+        if mode not in (SUBSTRING, WORD):
+            raise CatalogError(f"Unknown match mode '{mode}' for '{text}'")
+        tokens = tuple(tokenize(str(text).lower()))
+        if not tokens:
+            return None
+        if len(tokens) > 1:
+            mode = WORD
+        key = (mode, tokens)
+        term_id = self._term_ids.get(key)
+        if term_id is not None:
+            return term_id
+        term_id = self._term_ids[key] = len(self._term_ids)
+        if len(tokens) > 1:
+            node = self._phrases
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(None, []).append(term_id)
+        elif mode == SUBSTRING:
+            self._substrings.setdefault(tokens[0], []).append(term_id)
+        else:
+            self._words.setdefault(tokens[0], []).append(term_id)
+        return term_id
+
+    def resolve(self, name=None):
+        """Returns the Role for a role id or alias (the default role for None/"")."""
+        if not name:
+            return self.roles[self.default_role]
+        role_id = self._aliases.get(normalize_name(name))
+        if role_id is None:
+            raise UnknownRole(name, sorted(self.roles))
+        return self.roles[role_id]
+
+    def match(self, text_lower):
+        """Returns the set of catalog term ids occurring in lowercased text."""
+        tokens = tokenize(text_lower)
+        found = set()
+        cache = self._token_cache
+        for token in set(tokens):
+            hits = cache.get(token)
+            if hits is None:
+                if len(cache) >= TOKEN_CACHE_SIZE:
+                    cache.clear()
+                hits = cache[token] = self._token_terms(token)
+            found.update(hits)
+        if self._phrases:
+            self._match_phrases(tokens, found)
+        return found
+
+    def _token_terms(self, token):
+        hits = list(self._words.get(token, ()))
+        size = len(token)
+        for length in self._substring_lengths:
+            if length > size:
+                break
+            for start in range(size - length + 1):
+                terms = self._substrings.get(token[start:start + length])
+                if terms:
+                    hits.extend(terms)
+        return tuple(hits)
+
+    def _match_phrases(self, tokens, found):
+        phrases = self._phrases
+        for start, token in enumerate(tokens):
+            node = phrases.get(token)
+            position = start + 1
+            while node is not None:
+                if None in node:
+                    found.update(node[None])
+                if position >= len(tokens):
+                    break
+                node = node.get(tokens[position])
+                position += 1
+
+    def match_role(self, role, text_lower):
+        """Keywords of `role` found in lowercased resume text."""
+        return role.matched_keywords(self.match(text_lower))
+
+    def role_matrix(self):
+        """The RoleMatrix of this catalog, built on first use."""
+        if self._role_matrix is None:
+            self._role_matrix = RoleMatrix(self)
+        return self._role_matrix
+
+    def describe(self):
+        return {
+            "version": self.version,
+            "defaultRole": self.default_role,
+            "roles": [role.as_dict() for role in self.roles.values()],
+        }
+
+
+class RoleMatrix:
+    """
+    Keyword-presence matrices of a catalog, for matching every role at once.
+
+    `term_keywords` (terms x keywords, every role's keywords side by side)
+    has a 1 where a term matches a keyword, and `keyword_roles` (keywords x
+    roles) a 1 where the keyword belongs to the role. A resume's found
+    terms as a 0/1 row vector times the first gives the keywords it has;
+    that, clipped to 0/1, times the second gives every role's matched
+    keyword count. Both sparse products only touch the rows of the terms
+    and keywords found, so the cost follows the resume rather than the
+    number of roles. Needs numpy and scipy.
+    """
+
+    def __init__(self, catalog):
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        self.roles = list(catalog.roles.values())
+        term_rows, keyword_cols = [], []
+        keyword = 0
+        for role in self.roles:
+            for terms in role.keyword_terms:
+                term_rows.extend(terms)
+                keyword_cols.extend([keyword] * len(terms))
+                keyword += 1
+        self.term_count = catalog.term_count
+        self.term_keywords = csr_matrix(
+            (np.ones(len(term_rows), dtype=np.int32), (term_rows, keyword_cols)),
+            shape=(catalog.term_count, keyword),
+        )
+        keyword_roles = np.repeat(np.arange(len(self.roles)), [len(role.keywords) for role in self.roles])
+        self.keyword_roles = csr_matrix(
+            (np.ones(keyword, dtype=np.int32), (np.arange(keyword), keyword_roles)),
+            shape=(keyword, len(self.roles)),
+        )
+        self.keyword_totals = np.array([len(role.keywords) for role in self.roles], dtype=np.int64)
+
+    def matched_counts(self, found_terms):
+        """Number of matched keywords of every role (numpy array, catalog role order)."""
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        found = np.fromiter(found_terms, dtype=np.int64, count=len(found_terms))
+        resume = csr_matrix(
+            (np.ones(len(found), dtype=np.int32), (np.zeros(len(found), dtype=np.int64), found)),
+            shape=(1, self.term_count),
+        )
+        keywords = resume @ self.term_keywords
+        keywords.data[:] = 1
+        return (keywords @ self.keyword_roles).toarray().ravel()
+
+
+# ----------------------------------------------------------
+# Loading and hot reload
+# ----------------------------------------------------------
+
+def load_catalog_file(path):
+    """Reads and compiles a JSON or YAML (.yaml/.yml, needs PyYAML) catalog file."""
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    try:
+        if path.lower().endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise CatalogError("YAML catalogs need PyYAML: pip install pyyaml")
+            data = yaml.safe_load(raw)
+        else:
+            data = json.loads(raw)
+    except CatalogError:
+        raise
+    except Exception as e:
+        raise CatalogError(f"Could not parse catalog {path}: {e}")
+    return RoleCatalog(data, version=hashlib.sha256(raw).hexdigest()[:12])
+
+
+_catalog = None
+_catalog_stamp = None
+_catalog_checked = 0.0
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    Returns the compiled catalog, reloading it if the file changed.
+
+    A catalog that fails to load is reported and the previous one kept, so
+    a bad edit never takes the service down.
+    """
+    global _catalog, _catalog_stamp, _catalog_checked
+    if _catalog is not None and time.monotonic() - _catalog_checked < CATALOG_CHECK_SECONDS:
+        return _catalog
+    with _catalog_lock:
+        _catalog_checked = time.monotonic()
+        try:
+            stat = os.stat(CATALOG_PATH)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            if _catalog is None:
+                raise CatalogError(f"Job role catalog not found: {e}")
+            return _catalog
+        if stamp != _catalog_stamp:
+            try:
+                _catalog = load_catalog_file(CATALOG_PATH)
+                _catalog_stamp = stamp
+                logger.info("Loaded job role catalog %s (%d roles, version %s)", CATALOG_PATH, len(_catalog.roles), _catalog.version)
+            except CatalogError as e:
+                if _catalog is None:
+                    raise
+                _catalog_stamp = stamp
+                logger.error("Keeping previous job role catalog, reload failed: %s", e)
+        return _catalog
+
+
+def resolve_role(name=None):
+    """Shortcut for get_catalog().resolve(name)."""
+    return get_catalog().resolve(name)
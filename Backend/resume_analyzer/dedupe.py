@@ -0,0 +1,179 @@
+import hashlib
+import io
+import logging
+import os
+import threading
+import zlib
+
+from resume_analyzer.catalog import tokenize
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# Near-duplicate detection (MinHash + LSH)
+# ----------------------------------------------------------
+# A resume is reduced to the set of its word shingles (SHINGLE_WORDS
+# consecutive tokens, tokenized like the role catalog) and that set to a
+# MinHash signature of NUM_PERM values: for each of NUM_PERM fixed hash
+# functions, the smallest hash of any shingle. The fraction of positions
+# where two signatures agree estimates the Jaccard similarity of the two
+# shingle sets, so "the same resume with a changed line" scores ~0.9 while
+# two different resumes from the same template score far lower.
+#
+# Signatures are cut into BANDS bands of NUM_PERM / BANDS values and each
+# band is hashed to a bucket key (LSH banding). Two resumes become
+# candidates if they share any bucket, which happens with high probability
+# above ~0.7 similarity and rarely below ~0.5, so finding the near
+# duplicates of a resume costs BANDS dictionary (or index) lookups instead
+# of a comparison with every resume seen. Candidates are then confirmed
+# against DEDUPE_THRESHOLD with their full signatures.
+#
+# Shingles are hashed with crc32, not hash(), so signatures computed in
+# different processes (pool workers, API workers) can be compared.
+# Signatures need numpy.
+
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_WORDS = 3
+
+# Estimated Jaccard similarity from which two resumes are near duplicates
+DEDUPE_THRESHOLD = float(os.environ.get("RESUME_DEDUPE_THRESHOLD", 0.8))
+
+# Prime just above 2**32 for the (a * x + b) mod p hash family; a < 2**31
+# keeps a * x within uint64.
+_PRIME = (1 << 32) + 15
+_PERMUTATIONS = None
+
+
+def _permutations():
+    global _PERMUTATIONS
+    if _PERMUTATIONS is None:
+        import numpy as np
+        rng = np.random.RandomState(1)
+        a = rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+        b = rng.randint(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+        _PERMUTATIONS = (a.reshape(-1, 1), b.reshape(-1, 1))
+    return _PERMUTATIONS
+
+
+def shingle_hashes(text):
+    """crc32 hashes of the distinct word shingles of a text (single tokens for very short texts)."""
+    tokens = tokenize(text.lower())
+    if len(tokens) < SHINGLE_WORDS:
+        shingles = set(tokens)
+    else:
+        shingles = {" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)}
+    return [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+
+
+def minhash(text):
+    """MinHash signature of a text as a tuple of NUM_PERM ints, or None if it has no words."""
+    import numpy as np
+
+    hashes = shingle_hashes(text)
+    if not hashes:
+        return None
+    a, b = _permutations()
+    values = (a * np.array(hashes, dtype=np.uint64) + b) % _PRIME
+    return tuple(values.min(axis=1).tolist())
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the texts behind two signatures (0..1)."""
+    return sum(x == y for x, y in zip(signature, other)) / len(signature)
+
+
+def band_keys(signature):
+    """The LSH bucket key of each band: 63-bit ints, distinct across bands."""
+    rows = len(signature) // BANDS
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * rows:(band + 1) * rows]
+        digest = hashlib.blake2b(repr((band, chunk)).encode(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big") >> 1)
+    return keys
+
+
+def fingerprint_text(data, filename):
+    """
+    The words of an upload for fingerprinting, cheaper than a full
+    extraction: the streamed DOCX text, or the layout-free strings of a
+    PDF. Returns None if the file cannot be read.
+    """
+    from resume_analyzer.extractors import extract_docx, pdf_strings
+
+    extension = os.path.splitext(filename)[1].lower()
+    try:
+        if extension == ".pdf":
+            return pdf_strings(io.BytesIO(data))
+        if extension == ".docx":
+            return extract_docx(io.BytesIO(data))
+    except Exception as e:
+        logger.debug("Could not fingerprint %s: %s", filename, e)
+    return None
+
+
+class DuplicateIndex:
+    """
+    In-memory LSH index of signatures. match() finds the most similar
+    representative of an earlier cluster; resumes that match none become
+    representatives themselves.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = DEDUPE_THRESHOLD if threshold is None else threshold
+        self._buckets = {}
+        self._signatures = {}
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def match(self, key, signature):
+        """
+        (representative key, similarity) of the closest earlier resume at
+        or above the threshold; otherwise `key` is added as a new
+        representative and None is returned. A None signature never matches.
+        """
+        if signature is None:
+            return None
+        keys = band_keys(signature)
+        with self._lock:
+            best, best_similarity = None, 0.0
+            seen = set()
+            for bucket in keys:
+                for candidate in self._buckets.get(bucket, ()):
+                    if candidate not in seen:
+                        seen.add(candidate)
+                        score = similarity(signature, self._signatures[candidate])
+                        if score > best_similarity:
+                            best, best_similarity = candidate, score
+            if best is not None and best_similarity >= self.threshold:
+                self.duplicates += 1
+                return best, best_similarity
+            self._add(key, signature, keys)
+        return None
+
+    def add(self, key, signature):
+        """Adds `key` as a representative without matching it (e.g. one a previous run analyzed)."""
+        if signature is not None:
+            with self._lock:
+                self._add(key, signature, band_keys(signature))
+
+    def remove(self, key):
+        """Drops a representative (e.g. one whose analysis failed): later resumes no longer match it."""
+        with self._lock:
+            signature = self._signatures.pop(key, None)
+            if signature is None:
+                return
+            for bucket in band_keys(signature):
+                members = self._buckets[bucket]
+                members.remove(key)
+                if not members:
+                    del self._buckets[bucket]
+
+    def _add(self, key, signature, keys):
+        self._signatures[key] = signature
+        for bucket in keys:
+            self._buckets.setdefault(bucket, []).append(key)
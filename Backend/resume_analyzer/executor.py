@@ -0,0 +1,276 @@
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+
+from resume_analyzer import metrics
+from resume_analyzer.scheduler import FairQueue
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# Process-pool analysis executor
+# ----------------------------------------------------------
+# PDF extraction and scoring are CPU-bound, so threads cannot run them in
+# parallel (GIL) and a single 30-page PDF would block a Flask worker.
+# AnalysisPool runs jobs in dedicated worker processes that load the NLP
+# resources once at startup. Each worker is driven by one "slot" thread
+# in the parent which hands it jobs from a bounded queue, so:
+#   - a full queue is rejected immediately (QueueFull) instead of piling up,
+#   - a job exceeding its timeout gets its worker process killed and
+#     replaced, which is the only reliable way to stop a runaway pdfminer,
+#   - queued jobs run by estimated cost and client, not arrival order
+#     (scheduler.FairQueue), so small resumes are not stuck behind large
+#     PDFs and no single client takes over the workers.
+
+
+class QueueFull(Exception):
+    """Raised by submit() when the pool's queue is at capacity."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Analysis queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobTimeout(Exception):
+    """Set on a job's future when it ran longer than the pool timeout."""
+
+
+class WorkerCrashed(Exception):
+    """Set on a job's future when its worker process died unexpectedly."""
+
+
+def _worker_main(conn, initializer):
+    """Worker process loop: run jobs received over the pipe until told to stop."""
+    from resume_analyzer import log
+    log.configure_logging()
+    # Stage timings recorded here are sent back to the parent with each result
+    metrics.forward_to_parent()
+    if initializer is not None:
+        try:
+            initializer()
+        except Exception as e:
+            logger.exception("Analysis worker initializer failed: %s", e)
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        func, args, with_progress = job
+        try:
+            if with_progress:
+                result = func(*args, progress=lambda value: conn.send(("progress", value)))
+            else:
+                result = func(*args)
+            outcome = ("ok", result)
+        except Exception as e:
+            outcome = ("error", f"{e.__class__.__name__}: {e}\n{traceback.format_exc()}")
+        observations = metrics.drain()
+        if observations:
+            conn.send(("metrics", observations))
+        conn.send(outcome)
+
+
+def preload_nlp_resources():
+    """Default worker initializer: load NLP resources once per process."""
+    from resume_analyzer import resources
+    resources.warm_up(background=False)
+
+
+class _Slot:
+    """One worker process plus the parent thread feeding it jobs."""
+
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.thread = threading.Thread(target=self.run, name=f"analysis-slot-{index}", daemon=True)
+
+    def start_process(self):
+        parent_conn, child_conn = self.pool.context.Pipe()
+        self.process = self.pool.context.Process(
+            target=_worker_main, args=(child_conn, self.pool.initializer),
+            name=f"analysis-worker-{self.index}", daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def stop_process(self, kill=False):
+        if self.process is None:
+            return
+        try:
+            if kill:
+                self.process.kill()
+            else:
+                self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+        self.process = None
+        self.conn = None
+
+    def receive(self, deadline, progress):
+        """Waits for the job's outcome, relaying progress and metrics messages; None on timeout."""
+        while self.conn.poll(max(0, deadline - time.perf_counter())):
+            status, payload = self.conn.recv()
+            if status == "metrics":
+                metrics.replay(payload)
+                continue
+            if status != "progress":
+                return status, payload
+            try:
+                progress(payload)
+            except Exception as e:
+                logger.warning("Analysis progress callback failed: %s", e)
+        return None, None
+
+    def run(self):
+        while True:
+            entry = self.pool._queue.get()
+            if entry is None:
+                self.stop_process()
+                return
+            try:
+                self.run_job(*entry.item)
+            finally:
+                self.pool._queue.done(entry)
+
+    def run_job(self, future, func, args, timeout, progress):
+        if not future.set_running_or_notify_cancel():
+            return
+        self.pool._job_started()
+        started = time.perf_counter()
+        try:
+            if self.process is None or not self.process.is_alive():
+                self.start_process()
+            self.conn.send((func, args, progress is not None))
+            status, payload = self.receive(started + timeout, progress)
+            if status == "ok":
+                future.set_result(payload)
+                self.pool._job_finished(time.perf_counter() - started)
+            elif status == "error":
+                future.set_exception(RuntimeError(payload))
+                self.pool._job_finished(time.perf_counter() - started)
+            else:
+                self.stop_process(kill=True)
+                self.pool._job_finished(time.perf_counter() - started, timed_out=True)
+                future.set_exception(JobTimeout(f"Analysis exceeded {timeout}s and was stopped"))
+        except (EOFError, OSError) as e:
+            self.stop_process(kill=True)
+            self.pool._job_finished(time.perf_counter() - started, crashed=True)
+            future.set_exception(WorkerCrashed(f"Analysis worker died: {e!r}"))
+        except Exception as e:
+            # e.g. arguments or result that cannot be pickled
+            self.pool._job_finished(time.perf_counter() - started)
+            future.set_exception(e)
+
+
+class AnalysisPool:
+    """Bounded-queue process pool with per-job timeouts."""
+
+    def __init__(self, workers=None, queue_size=None, timeout=30, initializer=preload_nlp_resources,
+                 start_method=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size if queue_size is not None else 4 * self.workers
+        self.timeout = timeout
+        self.initializer = initializer
+        if start_method is None:
+            # forkserver: safe with the parent's threads and cheap to respawn killed workers
+            methods = multiprocessing.get_all_start_methods()
+            start_method = "forkserver" if "forkserver" in methods else "spawn"
+        self.context = multiprocessing.get_context(start_method)
+        self._queue = FairQueue(self.queue_size, self.workers)
+        self._lock = threading.Lock()
+        self._avg_seconds = None
+        self.counters = {"submitted": 0, "rejected": 0, "completed": 0, "timeouts": 0, "crashes": 0, "running": 0}
+        self._closed = False
+        self._slots = [_Slot(self, i) for i in range(self.workers)]
+        for slot in self._slots:
+            slot.start_process()
+            slot.thread.start()
+
+    def submit(self, func, *args, timeout=None, progress=None, cost=None, client=None):
+        """
+        Queues func(*args) for a worker process. Raises QueueFull when
+        saturated, or when `client` already holds its share of the queue.
+
+        With a progress callback, func is called with a progress= keyword
+        argument; values it reports are passed to the callback in the parent
+        (on the pool's slot thread) while the job runs. `cost` (estimated
+        seconds, see scheduler.estimate_cost) and `client` decide when the
+        job runs.
+        """
+        if self._closed:
+            raise RuntimeError("AnalysisPool is shut down")
+        future = Future()
+        try:
+            self._queue.put_nowait((future, func, args, timeout or self.timeout, progress), cost, client)
+        except queue.Full:
+            with self._lock:
+                self.counters["rejected"] += 1
+            raise QueueFull(self.retry_after())
+        with self._lock:
+            self.counters["submitted"] += 1
+        return future
+
+    def run(self, func, *args, timeout=None, cost=None, client=None):
+        """Submits a job and waits for its result."""
+        return self.submit(func, *args, timeout=timeout, cost=cost, client=client).result()
+
+    def retry_after(self):
+        """Seconds a rejected client should wait, from queue depth and average job time."""
+        average = self._avg_seconds or 1.0
+        return max(1, math.ceil(self._queue.qsize() * average / self.workers))
+
+    def stats(self):
+        """Returns queue depth, capacity and job counters."""
+        with self._lock:
+            stats = dict(self.counters)
+        stats.update({
+            "workers": self.workers,
+            "queueDepth": self._queue.qsize(),
+            "queueSize": self.queue_size,
+            **self._queue.stats(),
+            "timeoutSeconds": self.timeout,
+            "avgJobSeconds": round(self._avg_seconds, 4) if self._avg_seconds else None,
+        })
+        return stats
+
+    def shutdown(self):
+        """Stops all workers after the queued jobs have run."""
+        self._closed = True
+        self._queue.stop(len(self._slots))
+        for slot in self._slots:
+            slot.thread.join()
+
+    def _job_started(self):
+        with self._lock:
+            self.counters["running"] += 1
+
+    def _job_finished(self, seconds, timed_out=False, crashed=False):
+        with self._lock:
+            self.counters["running"] -= 1
+            if timed_out:
+                self.counters["timeouts"] += 1
+            elif crashed:
+                self.counters["crashes"] += 1
+            else:
+                self.counters["completed"] += 1
+                # Exponentially weighted average job time, for Retry-After
+                if self._avg_seconds is None:
+                    self._avg_seconds = seconds
+                else:
+                    self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * seconds
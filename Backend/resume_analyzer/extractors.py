@@ -0,0 +1,359 @@
+import logging
+import os
+import zipfile
+from xml.parsers import expat
+
+from docx import Document
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LAParams, LTContainer, LTImage, LTText, LTTextBox
+from pdfminer.pdfdevice import PDFDevice
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# Page-streaming PDF extraction
+# ----------------------------------------------------------
+# pdfminer's extract_text() lays out every page of the document before
+# returning anything, so a 200-page or pathologically complex upload costs
+# unbounded CPU and memory. iter_pdf_pages() lays out one page at a time
+# (each page's layout is dropped before the next is parsed) and
+# extract_pdf() stops as soon as a page or character limit is hit, or as
+# soon as the leading pages turn out to be scanned images with no text.
+# The text of each page is rendered exactly as extract_text() renders it,
+# so scores are unchanged for documents within the limits.
+
+PDF_MAX_PAGES = int(os.environ.get("RESUME_PDF_MAX_PAGES", 20))
+PDF_MAX_CHARS = int(os.environ.get("RESUME_PDF_MAX_CHARS", 100000))
+
+# Stop once this many leading pages are image-only: the document is a scan
+# and the remaining pages would only burn CPU to produce no text either.
+PDF_IMAGE_ONLY_CUTOFF = int(os.environ.get("RESUME_PDF_IMAGE_ONLY_CUTOFF", 2))
+
+# pdfminer's defaults (the same ones extract_text() uses), so text order and
+# spacing match what the analyzer has always scored.
+PDF_LAPARAMS = LAParams()
+
+
+class PdfExtraction:
+    """Text of the pages read so far, plus why reading stopped early (if it did)."""
+
+    __slots__ = ("text", "pages", "truncated", "image_only_pages")
+
+    def __init__(self, text, pages, truncated, image_only_pages):
+        self.text = text
+        self.pages = pages
+        self.truncated = truncated
+        self.image_only_pages = image_only_pages
+
+    def warnings(self):
+        """Formatting tips explaining pages that could not be (or were not) analyzed."""
+        tips = []
+        if self.image_only_pages:
+            pages = ", ".join(str(number) for number in self.image_only_pages)
+            tips.append(
+                f"Page(s) {pages} of your resume appear to be scanned images with no selectable text. "
+                "ATS systems cannot read text from images; export your resume as a text-based PDF."
+            )
+        if self.truncated:
+            tips.append(
+                f"Only the first {self.pages} page(s) of your resume were analyzed. "
+                "Keep your resume to 1-2 pages for best results."
+            )
+        return tips
+
+
+class _TextPageAggregator(PDFPageAggregator):
+    """Page aggregator that skips vector graphics, which text extraction never needs."""
+
+    def paint_path(self, gstate, stroke, fill, evenodd, path):
+        pass
+
+
+def _render_text(item, out):
+    """Appends an item's text the way pdfminer's TextConverter writes it."""
+    if isinstance(item, LTContainer):
+        for child in item:
+            _render_text(child, out)
+    elif isinstance(item, LTText):
+        out.append(item.get_text())
+    if isinstance(item, LTTextBox):
+        out.append("\n")
+
+
+def _has_image(item):
+    if isinstance(item, LTImage):
+        return True
+    if isinstance(item, LTContainer):
+        return any(_has_image(child) for child in item)
+    return False
+
+
+def _open_pdf(laparams):
+    resource_manager = PDFResourceManager(caching=True)
+    device = _TextPageAggregator(resource_manager, laparams=laparams or PDF_LAPARAMS)
+    return device, PDFPageInterpreter(resource_manager, device)
+
+
+def _layout_page(device, interpreter, page):
+    """Lays out one page and returns (text, image_only)."""
+    interpreter.process_page(page)
+    layout = device.get_result()
+    parts = []
+    _render_text(layout, parts)
+    parts.append("\f")
+    text = "".join(parts)
+    return text, not text.strip() and _has_image(layout)
+
+
+def iter_pdf_pages(source, laparams=None, max_pages=0):
+    """
+    Yields (page_text, image_only) for each page of a PDF, laying out one
+    page at a time. `source` is a path or binary stream.
+    """
+    owned = isinstance(source, (str, os.PathLike))
+    fp = open(source, "rb") if owned else source
+    try:
+        device, interpreter = _open_pdf(laparams)
+        for page in PDFPage.get_pages(fp, maxpages=max_pages, caching=True):
+            yield _layout_page(device, interpreter, page)
+    finally:
+        if owned:
+            fp.close()
+
+
+def extract_pdf(source, max_pages=None, max_chars=None, image_only_cutoff=None, laparams=None):
+    """
+    Extracts PDF text page by page, stopping early at the page or character
+    limit or when the leading pages are all images. Returns a PdfExtraction.
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    image_only_cutoff = PDF_IMAGE_ONLY_CUTOFF if image_only_cutoff is None else image_only_cutoff
+
+    owned = isinstance(source, (str, os.PathLike))
+    fp = open(source, "rb") if owned else source
+    parts = []
+    chars = 0
+    pages = 0
+    truncated = False
+    has_text = False
+    image_only_pages = []
+    try:
+        device, interpreter = _open_pdf(laparams)
+        # Page objects are cheap to enumerate; only pages we keep are laid out
+        for page in PDFPage.get_pages(fp, caching=True):
+            if (max_pages and pages >= max_pages) or (max_chars and chars >= max_chars):
+                truncated = True
+                break
+            text, image_only = _layout_page(device, interpreter, page)
+            pages += 1
+            if image_only:
+                image_only_pages.append(pages)
+                if image_only_cutoff and len(image_only_pages) >= image_only_cutoff and not has_text:
+                    break
+            has_text = has_text or bool(text.strip())
+            parts.append(text)
+            chars += len(text)
+    finally:
+        if owned:
+            fp.close()
+
+    text = "".join(parts)
+    if max_chars and len(text) > max_chars:
+        text = text[:max_chars]
+        truncated = True
+    return PdfExtraction(text, pages, truncated, image_only_pages)
+
+
+# ----------------------------------------------------------
+# Layout-free PDF strings
+# ----------------------------------------------------------
+# Near-duplicate fingerprints (dedupe.py) only need the words of a PDF, not
+# their reading order on the page. pdf_strings() runs the content streams
+# through a device that decodes each shown string and nothing else: no
+# glyph boxes, no layout analysis, about 15x cheaper than extract_pdf().
+# Strings come out in content-stream order, one per line.
+
+# A TJ adjustment below this (thousandths of an em) reads as a space
+PDF_SPACE_ADJUSTMENT = -200
+
+
+class _StringDevice(PDFDevice):
+    """Collects the text of every string shown on a page."""
+
+    def __init__(self, resource_manager):
+        super().__init__(resource_manager)
+        self.parts = []
+
+    def render_string(self, textstate, seq, ncs, graphicstate):
+        font = textstate.font
+        parts = self.parts
+        for item in seq:
+            if isinstance(item, bytes):
+                for cid in font.decode(item):
+                    try:
+                        parts.append(font.to_unichr(cid))
+                    except PDFUnicodeNotDefined:
+                        pass
+            elif item < PDF_SPACE_ADJUSTMENT:
+                parts.append(" ")
+        parts.append("\n")
+
+
+def pdf_strings(source, max_pages=None):
+    """Text shown on the first `max_pages` (PDF_MAX_PAGES) pages of a PDF, without layout."""
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    owned = isinstance(source, (str, os.PathLike))
+    fp = open(source, "rb") if owned else source
+    try:
+        resource_manager = PDFResourceManager(caching=True)
+        device = _StringDevice(resource_manager)
+        interpreter = PDFPageInterpreter(resource_manager, device)
+        for page in PDFPage.get_pages(fp, maxpages=max_pages, caching=True):
+            interpreter.process_page(page)
+            device.parts.append("\f")
+        return "".join(device.parts)
+    finally:
+        if owned:
+            fp.close()
+
+
+# ----------------------------------------------------------
+# Streaming DOCX extraction
+# ----------------------------------------------------------
+# python-docx builds a proxy object for every paragraph, run and cell, and
+# returns a horizontally merged cell once per grid column it spans, so its
+# text was counted several times. extract_docx() instead feeds
+# word/document.xml straight from the zip into expat and collects text from
+# the parser callbacks: paragraphs and table cells come out once each, in
+# document order (a table's cells where the table sits, one cell per line).
+#
+# Vertically merged continuation cells, which python-docx reports with the
+# text of the cell above, are skipped. Text boxes are read as paragraphs
+# where they are anchored; their legacy VML copy (mc:Fallback) is skipped.
+# If the XML cannot be parsed, python-docx is used as before.
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main "
+MC_FALLBACK = "http://schemas.openxmlformats.org/markup-compatibility/2006 Fallback"
+
+# Run content other than w:t, as python-docx renders it
+_RUN_CHARS = {W_NS + "tab": "\t", W_NS + "ptab": "\t", W_NS + "cr": "\n", W_NS + "noBreakHyphen": "-"}
+
+_P, _T, _R, _BR = W_NS + "p", W_NS + "t", W_NS + "r", W_NS + "br"
+_TC, _VMERGE, _HMERGE = W_NS + "tc", W_NS + "vMerge", W_NS + "hMerge"
+_VAL, _TYPE = W_NS + "val", W_NS + "type"
+
+DOCX_READ_SIZE = 64 * 1024
+
+
+class _DocxText:
+    """expat callbacks collecting paragraph and cell text."""
+
+    __slots__ = ("lines", "paragraphs", "cells", "runs", "in_text", "skip")
+
+    def __init__(self):
+        self.lines = []
+        self.paragraphs = []   # text pieces of each open paragraph (text boxes nest)
+        self.cells = []        # [paragraph texts, is merge continuation] per open cell
+        self.runs = 0
+        self.in_text = False
+        self.skip = 0          # depth inside mc:Fallback
+
+    def start(self, name, attrs):
+        if self.skip or name == MC_FALLBACK:
+            self.skip += 1
+        elif name == _T:
+            self.in_text = True
+        elif name == _R:
+            self.runs += 1
+        elif name == _P:
+            self.paragraphs.append([])
+        elif name == _TC:
+            self.cells.append([[], False])
+        elif self.runs and self.paragraphs:
+            if name == _BR:
+                if attrs.get(_TYPE, "textWrapping") == "textWrapping":
+                    self.paragraphs[-1].append("\n")
+            elif name in _RUN_CHARS:
+                self.paragraphs[-1].append(_RUN_CHARS[name])
+        elif (name == _VMERGE and attrs.get(_VAL, "continue") == "continue") or (
+                name == _HMERGE and attrs.get(_VAL, "continue") == "continue"):
+            if self.cells:
+                self.cells[-1][1] = True
+
+    def end(self, name):
+        if self.skip:
+            self.skip -= 1
+        elif name == _T:
+            self.in_text = False
+        elif name == _R:
+            self.runs -= 1
+        elif name == _P:
+            text = "".join(self.paragraphs.pop())
+            self._emit(text)
+        elif name == _TC:
+            paragraphs, continuation = self.cells.pop()
+            if not continuation:
+                self._emit("\n".join(paragraphs))
+
+    def text(self, data):
+        if self.in_text and not self.skip and self.paragraphs:
+            self.paragraphs[-1].append(data)
+
+    def _emit(self, text):
+        # Inside a cell, text belongs to the cell (nested tables included)
+        if self.cells and not self.paragraphs:
+            self.cells[-1][0].append(text)
+        else:
+            self.lines.append(text)
+
+
+def iter_docx_lines(source):
+    """
+    Yields the text of each paragraph and table cell of a DOCX, in document
+    order, parsing word/document.xml incrementally. `source` is a path or
+    binary stream. Raises zipfile.BadZipFile, KeyError or expat.ExpatError
+    on malformed files.
+    """
+    with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as xml:
+        collector = _DocxText()
+        parser = expat.ParserCreate(namespace_separator=" ")
+        parser.buffer_text = True
+        parser.StartElementHandler = collector.start
+        parser.EndElementHandler = collector.end
+        parser.CharacterDataHandler = collector.text
+        while True:
+            chunk = xml.read(DOCX_READ_SIZE)
+            parser.Parse(chunk, not chunk)
+            yield from collector.lines
+            collector.lines.clear()
+            if not chunk:
+                break
+
+
+def extract_docx(source):
+    """
+    Returns the text of a DOCX (paragraphs and table cells, one per line),
+    falling back to python-docx if the streaming parser fails.
+    """
+    try:
+        return "\n".join(iter_docx_lines(source))
+    except (zipfile.BadZipFile, KeyError, expat.ExpatError) as e:
+        logger.info("Streaming DOCX parse failed (%s), falling back to python-docx", e)
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return extract_docx_python_docx(source)
+
+
+def extract_docx_python_docx(source):
+    """Text through the python-docx object model: paragraphs, then every table cell."""
+    doc = Document(source)
+    text = [paragraph.text for paragraph in doc.paragraphs]
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                text.append(cell.text)
+    return "\n".join(text)
@@ -0,0 +1,113 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# Feature-gated NLP stage
+# ----------------------------------------------------------
+# Every analysis feature declares which spaCy capabilities it needs.
+# The analyzer only runs spaCy when at least one enabled feature asks
+# for it, and then only with the pipeline components those features
+# require (a full en_core_web_sm parse is by far the most expensive
+# step of an analysis, so it must never run for nothing).
+
+SPACY_MODEL = "en_core_web_sm"
+
+# Capability -> en_core_web_sm pipes that must be loaded to provide it.
+# "tokenizer" needs no pipes at all: the tokenizer is always present.
+NLP_CAPABILITIES = {
+    "tokenizer": (),
+    "tagger": ("tok2vec", "tagger", "attribute_ruler"),
+    "lemmatizer": ("tok2vec", "tagger", "attribute_ruler", "lemmatizer"),
+    "parser": ("tok2vec", "parser"),
+    "ner": ("ner",),
+}
+
+ALL_PIPES = ("tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter")
+
+# name -> {"needs": tuple of capabilities, "enabled": bool}
+ANALYSIS_FEATURES = {}
+
+
+def register_feature(name, needs=(), enabled=True):
+    """Registers an analysis feature and the NLP capabilities it needs."""
+    unknown = [cap for cap in needs if cap not in NLP_CAPABILITIES]
+    if unknown:
+        raise ValueError(f"Unknown NLP capabilities for feature '{name}': {unknown}")
+    ANALYSIS_FEATURES[name] = {"needs": tuple(needs), "enabled": enabled}
+
+
+def set_feature_enabled(name, enabled):
+    """Turns a registered feature on or off."""
+    ANALYSIS_FEATURES[name]["enabled"] = enabled
+
+
+# The rule-based scoring stages work on the raw text only.
+register_feature("keyword_optimization")
+register_feature("structural_completeness")
+register_feature("content_quality")
+register_feature("ats_compatibility")
+
+
+def required_capabilities(features=None):
+    """Returns the set of NLP capabilities needed by the given (or enabled) features."""
+    if features is None:
+        features = [name for name, spec in ANALYSIS_FEATURES.items() if spec["enabled"]]
+    needs = set()
+    for name in features:
+        needs.update(ANALYSIS_FEATURES[name]["needs"])
+    return needs
+
+
+def required_pipes(capabilities):
+    """Maps NLP capabilities to the pipeline components that provide them."""
+    pipes = set()
+    for cap in capabilities:
+        pipes.update(NLP_CAPABILITIES[cap])
+    return frozenset(pipes)
+
+
+# ----------------------------------------------------------
+# Trimmed pipeline cache
+# ----------------------------------------------------------
+
+_pipelines = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_pipeline(pipes):
+    """Loads (once) a spaCy pipeline containing only the given components."""
+    pipes = frozenset(pipes)
+    with _pipelines_lock:
+        if pipes not in _pipelines:
+            import spacy
+            exclude = [pipe for pipe in ALL_PIPES if pipe not in pipes]
+            _pipelines[pipes] = spacy.load(SPACY_MODEL, exclude=exclude)
+        return _pipelines[pipes]
+
+
+def run_nlp_stage(raw_text, features=None):
+    """
+    Runs spaCy over the text with only the components the features need.
+
+    Returns None without touching spaCy when no feature needs NLP, or
+    when the model is unavailable.
+    """
+    capabilities = required_capabilities(features)
+    if not capabilities:
+        return None
+
+    try:
+        pipeline = get_pipeline(required_pipes(capabilities))
+    except (ImportError, IOError, OSError) as e:
+        logger.warning("spaCy pipeline unavailable: %s", e)
+        return None
+
+    try:
+        if capabilities == {"tokenizer"}:
+            return pipeline.make_doc(raw_text)
+        return pipeline(raw_text)
+    except Exception as e:
+        logger.warning("spaCy processing error: %s", e)
+        return None
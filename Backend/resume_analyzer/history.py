@@ -0,0 +1,257 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from resume_analyzer.writer import BatchWriter
+
+# ----------------------------------------------------------
+# Analysis history (SQLite, precomputed aggregates)
+# ----------------------------------------------------------
+# Every analysis the API computes is queued with record() and written by a
+# background writer.BatchWriter, so a request only pays for a queue put.
+# Each batch is one transaction that:
+#   - inserts the raw rows into `analyses` (kept for RETENTION_DAYS, for
+#     ad-hoc queries and rebuilding),
+#   - adds the batch's counts into the aggregate tables with upserts:
+#       day_roles     per UTC day and role: the number of analyses and
+#                     the sum of their scores
+#       day_scores    per day, role and 10-point score bucket: the number
+#                     of analyses
+#       day_tips      per day, role and formatting tip: how often it was given
+#       role_keywords per role and keyword: how often it was missing (all time)
+#
+# stats() reads only the aggregates, a fixed number of rows per day in the
+# window and per role, so /api/stats takes the same time after a thousand
+# or ten million analyses. Tips containing numbers ("quite short (212
+# words)") are counted with the numbers replaced by N.
+#
+# The database is in WAL mode: every API worker writes its own batches
+# and readers never block them.
+
+BATCH_SIZE = 500
+FLUSH_SECONDS = 1.0
+
+# Raw rows older than this are deleted; the aggregates keep everything
+RETENTION_DAYS = int(os.environ.get("RESUME_HISTORY_RETENTION_DAYS", 90))
+
+# Longest window stats() summarizes, in days
+MAX_DAYS = 365
+
+SCORE_BUCKETS = 10
+MAX_TIP_CHARS = 200
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS analyses ("
+    " id INTEGER PRIMARY KEY, created REAL NOT NULL, day TEXT NOT NULL, role TEXT NOT NULL,"
+    " score INTEGER NOT NULL, file_type TEXT, missing_keywords TEXT NOT NULL, tips TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS analyses_created ON analyses (created)",
+    "CREATE TABLE IF NOT EXISTS day_roles ("
+    " day TEXT NOT NULL, role TEXT NOT NULL, analyses INTEGER NOT NULL, score_sum INTEGER NOT NULL,"
+    " PRIMARY KEY (day, role)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS day_scores ("
+    " day TEXT NOT NULL, role TEXT NOT NULL, bucket INTEGER NOT NULL, analyses INTEGER NOT NULL,"
+    " PRIMARY KEY (day, role, bucket)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS day_tips ("
+    " day TEXT NOT NULL, role TEXT NOT NULL, tip TEXT NOT NULL, count INTEGER NOT NULL,"
+    " PRIMARY KEY (day, role, tip)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS role_keywords ("
+    " role TEXT NOT NULL, keyword TEXT NOT NULL, missing INTEGER NOT NULL,"
+    " PRIMARY KEY (role, keyword)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS role_keywords_missing ON role_keywords (role, missing DESC)",
+)
+
+_NUMBER = re.compile(r"\d+")
+
+
+def day_of(timestamp):
+    """UTC date of a timestamp as YYYY-MM-DD."""
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+def score_bucket(score):
+    """10-point bucket of a 0-100 score; 100 falls in the last one."""
+    return min(int(score) // 10, SCORE_BUCKETS - 1)
+
+
+def bucket_label(bucket):
+    return f"{bucket * 10}-{bucket * 10 + 9 if bucket < SCORE_BUCKETS - 1 else 100}"
+
+
+def tip_key(tip):
+    """A formatting tip with its numbers replaced, so the same advice is counted together."""
+    return _NUMBER.sub("N", tip)[:MAX_TIP_CHARS]
+
+
+def make_entry(filename, result, created=None):
+    """The history entry of a normalized analysis result."""
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    return {
+        "created": time.time() if created is None else created,
+        "role": result.get("jobRole") or "",
+        "score": int(result.get("atsScore", 0)),
+        "fileType": extension or None,
+        "missingKeywords": list(result.get("keywordSuggestions", ())),
+        "tips": [tip_key(tip) for tip in result.get("formattingTips", ())],
+    }
+
+
+class AnalysisHistory:
+    """Analysis results stored in SQLite with incrementally updated aggregates."""
+
+    def __init__(self, db_path, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS, retention_days=RETENTION_DAYS):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.retention_days = retention_days
+        self._writer = BatchWriter(self._write, batch_size, flush_seconds, "analysis-history-writer",
+                                   "analyses to the history")
+        self._local = threading.local()
+        self.counters = {"written": 0, "batches": 0}
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A short-lived connection: this object may be created before a fork
+        with sqlite3.connect(db_path, timeout=5) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                db.execute(statement)
+        db.close()
+
+    # -------------------------
+    # Writes
+    # -------------------------
+
+    def record(self, filename, result):
+        """Queues an analysis result for the background writer."""
+        self._writer.put(make_entry(filename, result))
+
+    def add_many(self, entries):
+        """Writes entries (see make_entry) synchronously, batch_size per transaction."""
+        entries = list(entries)
+        for start in range(0, len(entries), self.batch_size):
+            self._write(entries[start:start + self.batch_size])
+
+    def flush(self, timeout=None):
+        """Waits until every result recorded so far is written. Returns False on timeout."""
+        return self._writer.flush(timeout)
+
+    def _write(self, batch):
+        counts, score_sums, buckets, tips, keywords = Counter(), Counter(), Counter(), Counter(), Counter()
+        rows = []
+        for entry in batch:
+            day = day_of(entry["created"])
+            role = entry["role"]
+            counts[day, role] += 1
+            score_sums[day, role] += entry["score"]
+            buckets[day, role, score_bucket(entry["score"])] += 1
+            tips.update((day, role, tip) for tip in set(entry["tips"]))
+            keywords.update((role, keyword) for keyword in set(entry["missingKeywords"]))
+            rows.append((entry["created"], day, role, entry["score"], entry["fileType"],
+                         json.dumps(entry["missingKeywords"]), json.dumps(entry["tips"])))
+
+        db = self._db()
+        with db:
+            db.executemany(
+                "INSERT INTO analyses (created, day, role, score, file_type, missing_keywords, tips)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            db.executemany(
+                "INSERT INTO day_roles (day, role, analyses, score_sum) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT DO UPDATE SET analyses = analyses + excluded.analyses,"
+                " score_sum = score_sum + excluded.score_sum",
+                [key + (count, score_sums[key]) for key, count in counts.items()])
+            db.executemany(
+                "INSERT INTO day_scores (day, role, bucket, analyses) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT DO UPDATE SET analyses = analyses + excluded.analyses",
+                [key + (count,) for key, count in buckets.items()])
+            db.executemany(
+                "INSERT INTO day_tips (day, role, tip, count) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT DO UPDATE SET count = count + excluded.count",
+                [key + (count,) for key, count in tips.items()])
+            db.executemany(
+                "INSERT INTO role_keywords (role, keyword, missing) VALUES (?, ?, ?)"
+                " ON CONFLICT DO UPDATE SET missing = missing + excluded.missing",
+                [key + (count,) for key, count in keywords.items()])
+            if self.retention_days:
+                db.execute("DELETE FROM analyses WHERE created < ?",
+                           (time.time() - self.retention_days * 86400,))
+        self.counters["written"] += len(batch)
+        self.counters["batches"] += 1
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def stats(self, days=30, role=None, top=10, now=None):
+        """
+        Aggregates over the last `days` UTC days (today included): analyses
+        and mean score overall, per day and per role, the score
+        distribution and the most frequent formatting tips; plus the `top`
+        most often missing keywords of each role (all time). Optionally
+        for one role only.
+        """
+        days = max(1, min(days, MAX_DAYS))
+        since = day_of((time.time() if now is None else now) - (days - 1) * 86400)
+        where, parameters = "day >= ?", [since]
+        if role:
+            where += " AND role = ?"
+            parameters.append(role)
+
+        db = self._db()
+        buckets = dict.fromkeys(range(SCORE_BUCKETS), 0)
+        for bucket, count in db.execute(
+                f"SELECT bucket, SUM(analyses) FROM day_scores WHERE {where} GROUP BY bucket", parameters):
+            buckets[bucket] = count
+        daily = []
+        analyses = score_sum = 0
+        for day, count, total in db.execute(
+                f"SELECT day, SUM(analyses), SUM(score_sum) FROM day_roles WHERE {where} GROUP BY day ORDER BY day",
+                parameters):
+            daily.append({"date": day, "analyses": count, "meanScore": round(total / count, 1)})
+            analyses += count
+            score_sum += total
+        roles = {}
+        for role_id, count, total in db.execute(
+                f"SELECT role, SUM(analyses), SUM(score_sum) FROM day_roles WHERE {where} GROUP BY role"
+                " ORDER BY 2 DESC", parameters):
+            missing = db.execute(
+                "SELECT keyword, missing FROM role_keywords WHERE role = ? ORDER BY missing DESC, keyword LIMIT ?",
+                (role_id, top))
+            roles[role_id] = {
+                "analyses": count,
+                "meanScore": round(total / count, 1),
+                "missingKeywords": [{"keyword": keyword, "count": n} for keyword, n in missing],
+            }
+        tips = [
+            {"tip": tip, "count": count} for tip, count in db.execute(
+                f"SELECT tip, SUM(count) FROM day_tips WHERE {where} GROUP BY tip ORDER BY 2 DESC, tip LIMIT ?",
+                parameters + [top])
+        ]
+        return {
+            "since": since,
+            "days": days,
+            "analyses": analyses,
+            "meanScore": round(score_sum / analyses, 1) if analyses else None,
+            "scoreDistribution": [{"range": bucket_label(bucket), "count": count}
+                                  for bucket, count in buckets.items()],
+            "daily": daily,
+            "roles": roles,
+            "formattingTips": tips,
+        }
+
+    def status(self):
+        status = dict(self.counters)
+        status["failed"] = self._writer.failed
+        status["pending"] = self._writer.pending()
+        return status
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
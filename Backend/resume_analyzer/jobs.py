@@ -0,0 +1,201 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# ----------------------------------------------------------
+# Asynchronous analysis jobs
+# ----------------------------------------------------------
+# A job is a JSON-serializable dict that moves through
+#   queued -> running (stage: extracting, scoring) -> done | failed
+# JobStore owns the lifecycle and wakes up watchers (the SSE endpoint) on
+# every change; where the dicts live is up to a backend object with
+#   get(job_id) / put(job) / delete(job_id) / expire(cutoff, max_jobs) / count()
+# MemoryJobBackend keeps them in this process, which is all a single server
+# needs. SQLiteJobBackend keeps them in a file shared by every worker on
+# the host, so a job created by one worker can be polled or streamed from
+# any other; watchers poll it, since updates made in another process wake
+# no one here.
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+FINISHED = (DONE, FAILED)
+
+
+class MemoryJobBackend:
+    """In-process job storage, oldest jobs first."""
+
+    def __init__(self):
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def put(self, job):
+        with self._lock:
+            self._jobs[job["jobId"]] = dict(job)
+
+    def delete(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def expire(self, cutoff, max_jobs):
+        """Drops jobs last updated before `cutoff`, and the oldest beyond max_jobs."""
+        with self._lock:
+            stale = [job_id for job_id, job in self._jobs.items() if job["updatedAt"] < cutoff]
+            for job_id in stale:
+                del self._jobs[job_id]
+            while len(self._jobs) > max_jobs:
+                self._jobs.popitem(last=False)
+            return len(stale)
+
+    def count(self):
+        with self._lock:
+            return len(self._jobs)
+
+
+class SQLiteJobBackend:
+    """Job storage in a SQLite file shared between worker processes."""
+
+    # Seconds between reads of a watched job that has not changed
+    poll_seconds = 0.25
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A short-lived connection: the store is created at import, before the server forks
+        db = sqlite3.connect(db_path, timeout=5)
+        try:
+            with db:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("CREATE TABLE IF NOT EXISTS jobs ("
+                           " job_id TEXT PRIMARY KEY, created REAL NOT NULL, updated REAL NOT NULL, job TEXT NOT NULL)")
+                db.execute("CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created)")
+                db.execute("CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (updated)")
+        finally:
+            db.close()
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.db_path, timeout=5)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def get(self, job_id):
+        row = self._db().execute("SELECT job FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, job):
+        with self._db() as db:
+            db.execute("INSERT OR REPLACE INTO jobs (job_id, created, updated, job) VALUES (?, ?, ?, ?)",
+                       (job["jobId"], job["createdAt"], job["updatedAt"], json.dumps(job)))
+
+    def delete(self, job_id):
+        with self._db() as db:
+            db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+    def expire(self, cutoff, max_jobs):
+        """Drops jobs last updated before `cutoff`, and the oldest beyond max_jobs."""
+        with self._db() as db:
+            stale = db.execute("DELETE FROM jobs WHERE updated < ?", (cutoff,)).rowcount
+            db.execute("DELETE FROM jobs WHERE job_id IN "
+                       "(SELECT job_id FROM jobs ORDER BY created DESC LIMIT -1 OFFSET ?)", (max_jobs,))
+        return stale
+
+    def count(self):
+        return self._db().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+class JobStore:
+    """Creates, updates and watches analysis jobs kept in a pluggable backend."""
+
+    def __init__(self, backend=None, ttl_seconds=3600, max_jobs=10000):
+        self.backend = backend if backend is not None else MemoryJobBackend()
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self._changed = threading.Condition()
+        self._last_expiry = time.time()
+
+    def create(self, filename=None):
+        """Registers a new queued job and returns it."""
+        now = time.time()
+        job = {
+            "jobId": uuid.uuid4().hex,
+            "status": QUEUED,
+            "stage": QUEUED,
+            "filename": filename,
+            "result": None,
+            "error": None,
+            "createdAt": now,
+            "updatedAt": now,
+            "version": 0,
+        }
+        self.backend.put(job)
+        if now - self._last_expiry > min(60, self.ttl_seconds):
+            self._last_expiry = now
+            self.backend.expire(now - self.ttl_seconds, self.max_jobs)
+        return job
+
+    def get(self, job_id):
+        return self.backend.get(job_id)
+
+    def delete(self, job_id):
+        self.backend.delete(job_id)
+
+    def update(self, job_id, **fields):
+        """Merges fields into a job and wakes its watchers. Returns the job (or None)."""
+        with self._changed:
+            job = self.backend.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            job["version"] += 1
+            job["updatedAt"] = time.time()
+            self.backend.put(job)
+            self._changed.notify_all()
+        return job
+
+    def watch(self, job_id, keepalive=15.0):
+        """
+        Yields a snapshot of the job each time it changes, ending after it
+        finishes. Yields None when `keepalive` seconds pass without a change
+        so callers can keep idle connections open.
+        """
+        seen = -1
+        poll = getattr(self.backend, "poll_seconds", None)
+        while True:
+            deadline = time.monotonic() + keepalive
+            with self._changed:
+                job = self.backend.get(job_id)
+                while job is not None and job["version"] == seen and job["status"] not in FINISHED:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._changed.wait(min(remaining, poll) if poll else remaining)
+                    job = self.backend.get(job_id)
+            if job is None:
+                return
+            if job["version"] == seen:
+                yield None
+                continue
+            seen = job["version"]
+            yield job
+            if job["status"] in FINISHED:
+                return
+
+    def stats(self):
+        return {"jobs": self.backend.count(), "ttlSeconds": self.ttl_seconds}
@@ -0,0 +1,459 @@
+import argparse
+import json
+import os
+import queue
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+
+from resume_analyzer.batch import iter_batch_inputs, percentile
+
+# ----------------------------------------------------------
+# HTTP load test with an SLO gate
+# ----------------------------------------------------------
+#     python -m resume_analyzer.loadtest [--url URL | --workers N] [--concurrency 8] [--rate R]
+#                                        [--seconds 30] [--corpus DIR|ZIP] [--pdf-ratio 0.5]
+#                                        [--slo slo.json] [--output report.json]
+#
+# Posts resumes to /api/analyze-resume end to end and reports requests/sec,
+# p50/p95/p99 latency, errors by status and the server's RSS over time
+# (summed over its process tree, so pdfminer growth in forked workers
+# shows up). Without --url it starts `python -m resume_analyzer.serve` on
+# a free local port with the result cache off (every upload is analyzed)
+# and stops it afterwards; with --url, pass --pid to sample RSS of a
+# server you started yourself (Linux only).
+#
+# Load models:
+#   - closed loop (default): --concurrency clients, each posting its next
+#     upload as soon as the previous one is answered,
+#   - open loop (--rate R): uploads arrive R times a second (Poisson, or
+#     evenly spaced with --arrivals uniform) whatever the server does, and
+#     are sent by up to --concurrency clients. Latency is measured from
+#     the scheduled arrival, so a server falling behind shows as tail
+#     latency instead of silently lowering the offered load.
+#
+# The corpus is every PDF/DOCX under --corpus (directory or zip), or
+# synthetic resumes from benchmarks/corpus.py (source checkout only), mixed
+# by --pdf-ratio.
+#
+# An SLO file is a JSON object with any of these limits; a run breaking
+# one exits with status 1:
+#   {"minRps": 5, "maxP50Ms": 500, "maxP95Ms": 1500, "maxP99Ms": 3000,
+#    "maxErrorRate": 0.01, "maxRssMb": 1500, "maxRssGrowthMb": 200}
+
+SLO_LIMITS = {
+    "minRps": ("rps", min),
+    "maxP50Ms": ("p50Ms", max),
+    "maxP95Ms": ("p95Ms", max),
+    "maxP99Ms": ("p99Ms", max),
+    "maxErrorRate": ("errorRate", max),
+    "maxRssMb": ("rssMaxMb", max),
+    "maxRssGrowthMb": ("rssGrowthMb", max),
+}
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ----------------------------------------------------------
+# Corpus and requests
+# ----------------------------------------------------------
+
+def load_corpus(path=None, docs=20, pdf_ratio=0.5, seed=0):
+    """
+    [(filename, bytes)] to post, PDFs making up about `pdf_ratio` of them:
+    the files under `path` (directory or zip), or `docs` synthetic resumes.
+    """
+    if path:
+        files = [(name, load()) for name, load in iter_batch_inputs(path)]
+        pdfs = [item for item in files if item[0].lower().endswith(".pdf")]
+        docx = [item for item in files if not item[0].lower().endswith(".pdf")]
+        if not files:
+            raise ValueError(f"No PDF or DOCX files in {path}")
+        if not pdfs or not docx:
+            return files
+        rng = random.Random(seed)
+        size = max(docs, len(files))
+        return [rng.choice(pdfs) if rng.random() < pdf_ratio else rng.choice(docx) for _ in range(size)]
+    try:
+        from benchmarks.corpus import make_resume_file
+    except ImportError:
+        raise ValueError("Synthetic resumes need the benchmarks package of a source checkout; pass --corpus")
+    pdf_count = int(round(docs * pdf_ratio))
+    kinds = ["pdf"] * pdf_count + ["docx"] * (docs - pdf_count)
+    random.Random(seed).shuffle(kinds)
+    return [(f"resume-{i}.{kind}", make_resume_file(seed + i, kind, pages=1 + i % 3)) for i, kind in enumerate(kinds)]
+
+
+def encode_upload(filename, data):
+    """(multipart/form-data body, content type) posting one resume as 'resumeFile'."""
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="resumeFile"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n".encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    )
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def post_upload(url, body, content_type, timeout):
+    """Posts one upload; returns its outcome: the HTTP status, or the exception name."""
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError) as e:
+        reason = getattr(e, "reason", e)
+        return reason.__class__.__name__
+
+
+# ----------------------------------------------------------
+# Load generation
+# ----------------------------------------------------------
+
+def run_load(url, uploads, seconds, concurrency=8, rate=None, arrivals="poisson", timeout=60, seed=0):
+    """
+    Drives the endpoint for `seconds` and returns the requests sent, as
+    (finished at, seconds since start; latency ms; outcome) tuples.
+    Closed loop without a `rate`, open loop with one (see above).
+    """
+    bodies = [encode_upload(name, data) for name, data in uploads]
+    records = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + seconds
+
+    def send(index, scheduled):
+        body, content_type = bodies[index % len(bodies)]
+        outcome = post_upload(url, body, content_type, timeout)
+        done = time.perf_counter()
+        with lock:
+            records.append((done - started, (done - scheduled) * 1000, outcome))
+
+    if rate is None:
+        def client(offset):
+            index = offset
+            while time.perf_counter() < deadline:
+                send(index, time.perf_counter())
+                index += concurrency
+
+        threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    else:
+        pending = queue.SimpleQueue()
+
+        def client():
+            while True:
+                item = pending.get()
+                if item is None:
+                    return
+                send(*item)
+
+        def dispatch():
+            rng = random.Random(seed)
+            scheduled = started
+            index = 0
+            while True:
+                scheduled += rng.expovariate(rate) if arrivals == "poisson" else 1.0 / rate
+                if scheduled >= deadline:
+                    break
+                time.sleep(max(0.0, scheduled - time.perf_counter()))
+                pending.put((index, scheduled))
+                index += 1
+            for _ in range(concurrency):
+                pending.put(None)
+
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+        threads.append(threading.Thread(target=dispatch, daemon=True))
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(records)
+
+
+# ----------------------------------------------------------
+# Server memory
+# ----------------------------------------------------------
+
+def process_tree(pid):
+    """The pid and all its descendants (Linux /proc)."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as fh:
+                    parent = int(fh.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(parent, []).append(int(entry))
+    tree = [pid]
+    for member in tree:
+        tree.extend(children.get(member, ()))
+    return tree
+
+
+def tree_rss_mb(pid):
+    """Resident memory of a process and its descendants, in MB."""
+    total_kb = 0
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/status") as fh:
+                for line in fh:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+class RssSampler:
+    """Samples tree_rss_mb(pid) every `interval` seconds in a background thread."""
+
+    def __init__(self, pid, interval=1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._started = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self.samples.append((0.0, tree_rss_mb(self.pid)))
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.samples.append((time.perf_counter() - self._started, tree_rss_mb(self.pid)))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.samples.append((time.perf_counter() - self._started, tree_rss_mb(self.pid)))
+
+
+# ----------------------------------------------------------
+# Report and SLO
+# ----------------------------------------------------------
+
+def summarize(records, seconds, rss_samples=()):
+    """Totals of a run: throughput, latency percentiles, errors and RSS."""
+    ok = [latency for _, latency, outcome in records if outcome == 200]
+    errors = Counter(str(outcome) for _, _, outcome in records if outcome != 200)
+    # Requests in flight at the deadline still finish and count
+    seconds = max(seconds, records[-1][0]) if records else seconds
+    summary = {
+        "requests": len(records),
+        "ok": len(ok),
+        "errors": sum(errors.values()),
+        "errorRate": round(sum(errors.values()) / len(records), 4) if records else 0.0,
+        "errorsByOutcome": dict(errors),
+        "rps": round(len(ok) / seconds, 2) if seconds > 0 else 0.0,
+    }
+    for pct in (50, 95, 99):
+        summary[f"p{pct}Ms"] = round(percentile(ok, pct), 1)
+    summary["maxMs"] = round(max(ok), 1) if ok else 0.0
+    if rss_samples:
+        rss = [mb for _, mb in rss_samples]
+        summary.update(rssStartMb=round(rss[0], 1), rssEndMb=round(rss[-1], 1), rssMaxMb=round(max(rss), 1),
+                       rssGrowthMb=round(rss[-1] - rss[0], 1))
+    return summary
+
+
+def timeline(records, seconds, rss_samples=(), interval=5.0):
+    """Per-interval throughput, p95 latency, errors and last RSS sample."""
+    rows = []
+    start = 0.0
+    while start < seconds:
+        end = min(seconds, start + interval)
+        window = [record for record in records if start <= record[0] < end]
+        ok = [latency for _, latency, outcome in window if outcome == 200]
+        row = {
+            "t": round(end, 1),
+            "rps": round(len(ok) / (end - start), 2),
+            "p95Ms": round(percentile(ok, 95), 1),
+            "errors": len(window) - len(ok),
+        }
+        rss = [mb for at, mb in rss_samples if at <= end]
+        if rss:
+            row["rssMb"] = round(rss[-1], 1)
+        rows.append(row)
+        start = end
+    return rows
+
+
+def load_slo(path):
+    """Reads an SLO file; raises ValueError for unknown limits."""
+    with open(path, encoding="utf-8") as fh:
+        slo = json.load(fh)
+    if not isinstance(slo, dict):
+        raise ValueError(f"SLO file {path} must hold a JSON object")
+    unknown = sorted(set(slo) - set(SLO_LIMITS))
+    if unknown:
+        raise ValueError(f"Unknown SLO limits {', '.join(unknown)}. Known: {', '.join(SLO_LIMITS)}")
+    return slo
+
+
+def check_slo(summary, slo):
+    """Violated limits, as readable strings (empty if the run meets the SLO)."""
+    violations = []
+    for limit, threshold in slo.items():
+        field, bound = SLO_LIMITS[limit]
+        value = summary.get(field)
+        if value is None:
+            violations.append(f"{limit}: {field} was not measured")
+        elif bound is min and value < threshold:
+            violations.append(f"{limit}: {field} {value} < {threshold}")
+        elif bound is max and value > threshold:
+            violations.append(f"{limit}: {field} {value} > {threshold}")
+    return violations
+
+
+# ----------------------------------------------------------
+# Local server
+# ----------------------------------------------------------
+
+def free_port():
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(base_url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + "/api/health/ready", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"{base_url} did not become ready within {timeout}s")
+
+
+def start_server(port, workers=None):
+    """Starts `python -m resume_analyzer.serve` on 127.0.0.1:port with the result cache off."""
+    command = [sys.executable, "-m", "resume_analyzer.serve", "--bind", f"127.0.0.1:{port}"]
+    if workers:
+        command += ["--workers", str(workers)]
+    env = dict(os.environ, RESUME_CACHE_SIZE="0", RESUME_LOG_LEVEL=os.environ.get("RESUME_LOG_LEVEL", "WARNING"))
+    env.pop("RESUME_CACHE_DB", None)
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+
+# ----------------------------------------------------------
+# Command line
+# ----------------------------------------------------------
+
+def print_report(report):
+    summary = report["summary"]
+    config = report["config"]
+    load = f"{config['rate']}/s arrivals" if config["rate"] else f"{config['concurrency']} clients"
+    print(f"{load} for {config['seconds']:g}s, {config['uploads']} uploads ({config['pdfRatio']:.0%} PDF)")
+    print(f"{'t s':>6} {'req/s':>7} {'p95 ms':>8} {'errors':>6} {'RSS MB':>8}")
+    for row in report["timeline"]:
+        rss = f"{row['rssMb']:>8.0f}" if "rssMb" in row else f"{'-':>8}"
+        print(f"{row['t']:>6.1f} {row['rps']:>7.1f} {row['p95Ms']:>8.0f} {row['errors']:>6} {rss}")
+    print(f"total: {summary['requests']} requests, {summary['rps']} ok/s, p50 {summary['p50Ms']} ms, "
+          f"p95 {summary['p95Ms']} ms, p99 {summary['p99Ms']} ms, errors {summary['errors']} "
+          f"{summary['errorsByOutcome'] or ''}".rstrip())
+    if "rssStartMb" in summary:
+        print(f"RSS: {summary['rssStartMb']} -> {summary['rssEndMb']} MB (max {summary['rssMaxMb']} MB)")
+    if "slo" in report:
+        violations = report["slo"]["violations"]
+        print("SLO: met" if not violations else "SLO violated:\n  " + "\n  ".join(violations))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m resume_analyzer.loadtest",
+                                     description="Load test /api/analyze-resume end to end.")
+    parser.add_argument("--url", help="base URL of a running server (default: start one locally)")
+    parser.add_argument("--pid", type=int, help="server process whose RSS to sample when using --url")
+    parser.add_argument("--workers", type=int, help="workers of the locally started server (default: one per CPU)")
+    parser.add_argument("--concurrency", type=int, default=8, help="clients sending requests (default: 8)")
+    parser.add_argument("--rate", type=float, help="open loop: uploads per second (default: closed loop)")
+    parser.add_argument("--arrivals", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3, help="seconds of unrecorded load first (default: 3)")
+    parser.add_argument("--corpus", help="directory or zip of PDF/DOCX resumes (default: synthetic)")
+    parser.add_argument("--docs", type=int, default=20, help="distinct uploads (default: 20)")
+    parser.add_argument("--pdf-ratio", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument("--interval", type=float, default=5, help="timeline interval in seconds (default: 5)")
+    parser.add_argument("--slo", help="SLO file; exit with status 1 if a limit is broken")
+    parser.add_argument("--output", help="write the full report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        slo = load_slo(args.slo) if args.slo else None
+        uploads = load_corpus(args.corpus, args.docs, args.pdf_ratio)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    server = None
+    base_url = args.url.rstrip("/") if args.url else None
+    pid = args.pid
+    if base_url is None:
+        port = free_port()
+        server = start_server(port, args.workers)
+        base_url, pid = f"http://127.0.0.1:{port}", server.pid
+    try:
+        wait_ready(base_url)
+        url = base_url + "/api/analyze-resume"
+        if args.warmup > 0:
+            run_load(url, uploads, args.warmup, args.concurrency, args.rate, args.arrivals, args.timeout)
+        if pid is not None and sys.platform.startswith("linux"):
+            with RssSampler(pid, interval=min(1.0, args.interval)) as sampler:
+                records = run_load(url, uploads, args.seconds, args.concurrency, args.rate, args.arrivals,
+                                   args.timeout)
+            rss_samples = sampler.samples
+        else:
+            records = run_load(url, uploads, args.seconds, args.concurrency, args.rate, args.arrivals, args.timeout)
+            rss_samples = []
+    finally:
+        if server is not None:
+            stop_server(server)
+
+    report = {
+        "config": {"url": base_url, "concurrency": args.concurrency, "rate": args.rate, "arrivals": args.arrivals,
+                   "seconds": args.seconds, "uploads": len(uploads), "pdfRatio": args.pdf_ratio},
+        "summary": summarize(records, args.seconds, rss_samples),
+        "timeline": timeline(records, args.seconds, rss_samples, args.interval),
+    }
+    if slo is not None:
+        report["slo"] = {"limits": slo, "violations": check_slo(report["summary"], slo)}
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    return 1 if slo is not None and report["slo"]["violations"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
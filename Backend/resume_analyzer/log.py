@@ -0,0 +1,70 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+# ----------------------------------------------------------
+# Logging setup
+# ----------------------------------------------------------
+# Modules log through logging.getLogger(__name__). configure_logging()
+# routes those records through a QueueHandler, so a request thread only
+# enqueues a record; a background QueueListener formats and writes them.
+# RESUME_LOG_LEVEL picks the level (DEBUG, INFO, WARNING, ...) and "off"
+# drops all application logging.
+
+LOG_LEVEL = os.environ.get("RESUME_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s %(levelname)s %(processName)s %(name)s: %(message)s"
+
+# Loggers configured here: the analyzer package and the Flask app module.
+LOGGER_NAMES = ("resume_analyzer", "app", "__main__")
+
+_listener = None
+_handler = None
+
+
+def configure_logging(level=None):
+    """Installs the non-blocking handler once per process; returns the level used."""
+    global _listener, _handler
+    level = (level or LOG_LEVEL).upper()
+    if level == "OFF":
+        numeric = logging.CRITICAL + 1
+    else:
+        numeric = logging.getLevelName(level)
+        if not isinstance(numeric, int):
+            numeric = logging.INFO
+
+    if _listener is None:
+        records = queue.SimpleQueue()
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(LOG_FORMAT))
+        _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=False)
+        _listener.start()
+        atexit.register(_listener.stop)
+        _handler = logging.handlers.QueueHandler(records)
+        for name in LOGGER_NAMES:
+            logger = logging.getLogger(name)
+            logger.addHandler(_handler)
+            logger.propagate = False
+
+    for name in LOGGER_NAMES:
+        logging.getLogger(name).setLevel(numeric)
+    return level
+
+
+def restart_after_fork():
+    """
+    Call in a process forked from one that configured logging: the
+    listener thread is not inherited, so records would pile up unread.
+    Starts a new listener on a fresh queue (the inherited one may have been
+    locked mid-operation at fork time).
+    """
+    global _listener
+    if _listener is None:
+        return
+    atexit.unregister(_listener.stop)
+    records = queue.SimpleQueue()
+    _handler.queue = records
+    _listener = logging.handlers.QueueListener(records, *_listener.handlers, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
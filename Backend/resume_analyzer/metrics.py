@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+from collections import deque
+
+# ----------------------------------------------------------
+# In-process metrics
+# ----------------------------------------------------------
+# Counters, gauges and latency summaries rendered in the Prometheus text
+# format by render_prometheus() (served on /api/metrics).
+#
+# Summaries keep cumulative _sum/_count plus a sliding window of recent
+# observations from which p50/p95/p99 are computed at scrape time, so
+# recording an observation is an append under a lock.
+#
+# span(stage) times a pipeline stage. Spans nest, and each records its
+# *self* time (nested spans subtracted), so stage latencies add up to the
+# request time instead of double counting.
+#
+# Analyses run in worker processes, whose registries nobody scrapes: there
+# forward_to_parent() makes observations queue up instead, and the
+# executor ships them back with each job result to be replay()ed in the
+# parent.
+
+METRICS_ENABLED = os.environ.get("RESUME_METRICS", "1").lower() not in ("0", "false", "off")
+
+# Observations per label set used for quantiles
+SUMMARY_WINDOW = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+_registry = {}
+_forwarding = False
+_pending = []
+_local = threading.local()
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    def _record(self, value, labels):
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        if _forwarding:
+            _pending.append((self.name, key, value))
+        else:
+            self._apply(key, value)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count, per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        self._record(amount, labels)
+
+    def _apply(self, key, value):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """
+    Current value. Either set() explicitly or computed at scrape time by
+    `collect`, a function returning {label values tuple: value}.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), collect=None):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+        self.collect = collect
+
+    def set(self, value, **labels):
+        self._apply(_label_key(self.labelnames, labels), value)
+
+    def _apply(self, key, value):
+        with self._lock:
+            self._values[key] = value
+
+    def render(self):
+        if self.collect is not None:
+            try:
+                values = self.collect()
+            except Exception:
+                values = {}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in sorted(values.items())]
+
+
+class Summary(_Metric):
+    """Latency distribution: sum, count and windowed p50/p95/p99, per label set."""
+
+    kind = "summary"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._series = {}
+
+    def observe(self, value, **labels):
+        self._record(value, labels)
+
+    def _apply(self, key, value):
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0, 0, deque(maxlen=SUMMARY_WINDOW)]
+            series[0] += value
+            series[1] += 1
+            series[2].append(value)
+
+    def count(self, **labels):
+        """Number of observations recorded for a label set."""
+        with self._lock:
+            series = self._series.get(_label_key(self.labelnames, labels))
+            return series[1] if series else 0
+
+    def quantiles(self, **labels):
+        """{0.5: ..., 0.95: ..., 0.99: ...} over the recent window (empty if no data)."""
+        with self._lock:
+            series = self._series.get(_label_key(self.labelnames, labels))
+            window = sorted(series[2]) if series else []
+        return _quantiles(window)
+
+    def render(self):
+        with self._lock:
+            items = [(key, total, count, sorted(window)) for key, (total, count, window) in sorted(self._series.items())]
+        lines = []
+        for key, total, count, window in items:
+            for q, value in _quantiles(window).items():
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key, ('quantile', str(q)))} {value:.6f}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def _quantiles(ordered):
+    if not ordered:
+        return {}
+    last = len(ordered) - 1
+    return {q: ordered[min(last, int(q * len(ordered)))] for q in QUANTILES}
+
+
+# ----------------------------------------------------------
+# Stage spans
+# ----------------------------------------------------------
+
+STAGE_SECONDS = Summary(
+    "resume_stage_seconds",
+    "Self time of each analysis stage in seconds",
+    ("stage",),
+)
+
+
+class span:
+    """Context manager timing a stage into STAGE_SECONDS (self time)."""
+
+    __slots__ = ("stage", "start", "children", "seconds")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.children = 0.0
+        self.seconds = 0.0
+
+    def __enter__(self):
+        stack = getattr(_local, "spans", None)
+        if stack is None:
+            stack = _local.spans = []
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.seconds = time.perf_counter() - self.start
+        stack = _local.spans
+        stack.pop()
+        if stack:
+            stack[-1].children += self.seconds
+        STAGE_SECONDS.observe(max(0.0, self.seconds - self.children), stage=self.stage)
+        return False
+
+
+# ----------------------------------------------------------
+# Worker process forwarding and exposition
+# ----------------------------------------------------------
+
+def forward_to_parent():
+    """Called in worker processes: queue observations for drain() instead of recording."""
+    global _forwarding
+    _forwarding = True
+
+
+def drain():
+    """Returns and clears the observations queued since the last drain()."""
+    global _pending
+    pending, _pending = _pending, []
+    return pending
+
+
+def replay(observations):
+    """Records observations drained in a worker process."""
+    for name, key, value in observations or ():
+        metric = _registry.get(name)
+        if metric is not None:
+            metric._apply(key, value)
+
+
+def get_metric(name):
+    return _registry.get(name)
+
+
+def render_prometheus():
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in list(_registry.values()):
+        samples = metric.render()
+        if samples:
+            lines.extend(metric.header())
+            lines.extend(samples)
+    return "\n".join(lines) + "\n"
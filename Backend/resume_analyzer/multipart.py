@@ -0,0 +1,197 @@
+import hashlib
+import re
+
+# ----------------------------------------------------------
+# Streaming multipart/form-data parser
+# ----------------------------------------------------------
+# Used by the ASGI server (asgi.py), which receives request bodies in
+# chunks as they arrive on the socket. Each chunk is fed to the parser
+# as soon as it arrives, so nothing waits for the whole body: file parts
+# go straight into a buffer and a SHA-256 updated with every chunk, and
+# once the last chunk is in, the upload's cache key is already known
+# without another pass over its bytes.
+#
+# Between chunks the parser keeps at most one boundary's length of
+# unparsed bytes (a delimiter may be split across chunks), and part
+# headers and text fields are capped, so memory is bounded by the file
+# data the caller accepts (the caller enforces the upload size cap).
+
+# Largest header block of one part
+MAX_HEADER_BYTES = 16 * 1024
+# Largest text (non-file) field
+MAX_FIELD_BYTES = 1024 * 1024
+
+_PREAMBLE = "preamble"
+_DELIMITER = "delimiter"
+_HEADERS = "headers"
+_BODY = "body"
+_DONE = "done"
+
+_BOUNDARY = re.compile(r'boundary=(?:"([^"]{1,200})"|([^\s;,"]{1,200}))', re.IGNORECASE)
+_PARAMETER = re.compile(r';\s*([\w*-]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)')
+
+
+class MultipartError(ValueError):
+    """Raised for a body that is not valid multipart/form-data."""
+
+
+class FilePart:
+    """An uploaded file: its bytes and their SHA-256, computed as they arrived."""
+
+    def __init__(self, name, filename, content_type):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self.data = bytearray()
+        self.sha256 = hashlib.sha256()
+
+    def write(self, chunk):
+        self.data += chunk
+        self.sha256.update(chunk)
+
+    @property
+    def digest(self):
+        return self.sha256.hexdigest()
+
+
+def parse_boundary(content_type):
+    """The boundary of a multipart/form-data Content-Type; raises MultipartError for any other type."""
+    if not content_type or not content_type.lower().startswith("multipart/form-data"):
+        raise MultipartError("Expected a multipart/form-data body.")
+    match = _BOUNDARY.search(content_type)
+    if match is None:
+        raise MultipartError("The multipart/form-data Content-Type has no boundary.")
+    return (match.group(1) or match.group(2)).encode("latin-1")
+
+
+def _parameters(header_value):
+    """Parameters of a header value such as 'form-data; name="a"; filename="b.pdf"'."""
+    parameters = {}
+    for key, value in _PARAMETER.findall(header_value):
+        value = value.strip()
+        if value.startswith('"'):
+            value = re.sub(r'\\(.)', r'\1', value[1:-1])
+        parameters[key.lower()] = value
+    return parameters
+
+
+class MultipartParser:
+    """
+    Incremental multipart/form-data parser: feed() the body in chunks of
+    any size, then close(). Text fields end up in `fields` (name -> str)
+    and file parts in `files` (name -> FilePart, the first of each name).
+    """
+
+    def __init__(self, boundary, max_header_bytes=MAX_HEADER_BYTES, max_field_bytes=MAX_FIELD_BYTES):
+        # A leading CRLF makes the first boundary look like all the others
+        self._buffer = bytearray(b"\r\n")
+        self._delimiter = b"\r\n--" + boundary
+        self._state = _PREAMBLE
+        self._part = None
+        self.max_header_bytes = max_header_bytes
+        self.max_field_bytes = max_field_bytes
+        self.fields = {}
+        self.files = {}
+
+    def feed(self, chunk):
+        """Parses as much of the body as the bytes received so far allow."""
+        if self._state == _DONE:
+            return
+        self._buffer += chunk
+        while self._step():
+            pass
+
+    def close(self):
+        """Checks the body ended with its closing boundary; raises MultipartError if not."""
+        if self._state != _DONE:
+            raise MultipartError("The multipart body ended early.")
+
+    def _step(self):
+        """Parses one state's worth of the buffer; False when more bytes are needed."""
+        buffer = self._buffer
+        if self._state == _PREAMBLE:
+            index = buffer.find(self._delimiter)
+            if index < 0:
+                # Only a delimiter split across chunks needs to be kept
+                del buffer[:max(0, len(buffer) - len(self._delimiter) + 1)]
+                return False
+            del buffer[:index + len(self._delimiter)]
+            self._state = _DELIMITER
+            return True
+
+        if self._state == _DELIMITER:
+            if len(buffer) < 2:
+                return False
+            if buffer[:2] == b"--":
+                self._state = _DONE
+                buffer.clear()
+                return False
+            end = buffer.find(b"\r\n")
+            if end < 0 or buffer[:end].strip(b" \t"):
+                if end < 0 and len(buffer) < 256:
+                    return False
+                raise MultipartError("Malformed multipart boundary line.")
+            del buffer[:end + 2]
+            self._state = _HEADERS
+            return True
+
+        if self._state == _HEADERS:
+            if buffer.startswith(b"\r\n"):
+                raise MultipartError("Multipart part without headers.")
+            end = buffer.find(b"\r\n\r\n")
+            if end < 0 and len(buffer) <= self.max_header_bytes:
+                return False
+            if end < 0 or end > self.max_header_bytes:
+                raise MultipartError("Multipart part headers are too large.")
+            self._start_part(bytes(buffer[:end]))
+            del buffer[:end + 4]
+            self._state = _BODY
+            return True
+
+        if self._state == _BODY:
+            index = buffer.find(self._delimiter)
+            if index < 0:
+                keep = len(self._delimiter) - 1
+                if len(buffer) > keep:
+                    self._write(buffer[:len(buffer) - keep])
+                    del buffer[:len(buffer) - keep]
+                return False
+            self._write(buffer[:index])
+            del buffer[:index + len(self._delimiter)]
+            self._end_part()
+            self._state = _DELIMITER
+            return True
+        return False
+
+    def _start_part(self, header_block):
+        headers = {}
+        for line in header_block.decode("utf-8", "replace").split("\r\n"):
+            name, separator, value = line.partition(":")
+            if separator:
+                headers[name.strip().lower()] = value.strip()
+        disposition = headers.get("content-disposition", "")
+        parameters = _parameters(disposition)
+        name = parameters.get("name")
+        if name is None:
+            raise MultipartError("Multipart part without a form field name.")
+        if "filename" in parameters:
+            self._part = FilePart(name, parameters["filename"], headers.get("content-type"))
+        else:
+            self._part = (name, bytearray())
+
+    def _write(self, chunk):
+        if isinstance(self._part, FilePart):
+            self._part.write(chunk)
+            return
+        name, value = self._part
+        if len(value) + len(chunk) > self.max_field_bytes:
+            raise MultipartError(f"Form field '{name}' is too large.")
+        value += chunk
+
+    def _end_part(self):
+        if isinstance(self._part, FilePart):
+            self.files.setdefault(self._part.name, self._part)
+        else:
+            name, value = self._part
+            self.fields.setdefault(name, value.decode("utf-8", "replace"))
+        self._part = None
@@ -1,96 +1,118 @@
+import logging
 import os
 import io
-import re
-import nltk
-import spacy
-from docx import Document
-from pdfminer.high_level import extract_text
-from nltk.corpus import stopwords
-import traceback
+
+from resume_analyzer.resources import get_stopwords
+from resume_analyzer.features import run_nlp_stage
+from resume_analyzer.extractors import extract_docx, extract_pdf
+from resume_analyzer.catalog import get_catalog
+from resume_analyzer.metrics import span
+from resume_analyzer.similarity import job_match
+from resume_analyzer.rules import ACTION_VERBS, keyword_rule, matcher_for_keywords, scan_document
+from resume_analyzer.sections import ResumeDocument, parse_resume
+
+logger = logging.getLogger(__name__)
 
 # ----------------------------------------------------------
 # 1. File Text Extraction (PDF / DOCX)
 # ----------------------------------------------------------
 
-def extract_text_from_file(filepath):
-    """Extracts raw text content from PDF or DOCX file."""
-    extension = os.path.splitext(filepath)[1].lower()
+def _open_source(source):
+    """Returns a binary file-like object for a path, bytes or stream."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        return source
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+def extract_text_from_file(source, filename=None):
+    """
+    Extracts raw text content from PDF or DOCX file.
+
+    `source` is a file path, the file's bytes, or a binary file-like object
+    (io.BytesIO, a spooled temp file, ...). For bytes and streams the type
+    is taken from `filename`.
+    """
+    return extract_resume(source, filename)[0]
+
+
+def extract_resume(source, filename=None):
+    """
+    Like extract_text_from_file, but returns (text, warnings) where warnings
+    are formatting tips about pages that were skipped or unreadable.
+    """
+    name = filename if filename is not None else source
+    if not isinstance(name, (str, os.PathLike)):
+        return None, []
+    extension = os.path.splitext(name)[1].lower()
+    source = _open_source(source)
 
     if extension == ".pdf":
         try:
-            # Try using extract_text with file path directly
-            try:
-                text = extract_text(filepath)
-            except TypeError:
-                # If that doesn't work, use file handle
-                with open(filepath, "rb") as fh:
-                    text = extract_text(fh)
-            
+            # Page by page, stopping at the page/character limits
+            extraction = extract_pdf(source)
+            text = extraction.text
+
             if text and text.strip():
-                print(f"PDF extraction successful. Extracted {len(text)} characters.")
-                return text
+                logger.debug("PDF extraction successful. Extracted %d characters from %d page(s).", len(text), extraction.pages)
+                return text, extraction.warnings()
             else:
-                print("PDF extraction returned empty text")
-                return None
+                logger.info("PDF extraction returned empty text")
+                return None, extraction.warnings()
         except Exception as e:
-            print(f"PDF extraction error: {e}")
-            print(traceback.format_exc())
-            return None
+            logger.warning("PDF extraction error: %s", e, exc_info=True)
+            return None, []
 
     elif extension == ".docx":
         try:
-            doc = Document(filepath)
-            # Extract text from paragraphs
-            text = [paragraph.text for paragraph in doc.paragraphs]
-            # Also extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text.append(cell.text)
-            result = "\n".join(text)
-            return result if result.strip() else None
+            # Streamed from word/document.xml, in document order
+            result = extract_docx(source)
+            return (result if result.strip() else None), []
         except Exception as e:
-            print(f"DOCX extraction error: {e}")
-            print(traceback.format_exc())
-            return None
+            logger.warning("DOCX extraction error: %s", e, exc_info=True)
+            return None, []
 
-    return None
+    return None, []
 
 
 # ----------------------------------------------------------
 # 2. NLP RESOURCE SETUP
 # ----------------------------------------------------------
 
-# Fix: Correct NLTK resource handling
-try:
-    nltk.data.find("corpora/stopwords")
-except LookupError:
-    nltk.download("stopwords")
-
-# Fix: spaCy safe load
-nlp = None
-try:
-    nlp = spacy.load("en_core_web_sm")
-except (IOError, OSError):
-    # If missing, download automatically
-    try:
-        import subprocess
-        import sys
-        subprocess.run([sys.executable, "-m", "spacy", "download", "en_core_web_sm"], check=True)
-        nlp = spacy.load("en_core_web_sm")
-    except Exception as e:
-        print(f"Warning: Could not load spaCy model: {e}")
-        print("Continuing without spaCy NLP features...")
-        nlp = None
+# NLTK stopwords and spaCy pipelines are loaded lazily (on first use or by
+# resources.warm_up()), so importing this module never loads or downloads
+# models. STOPWORDS is resolved on first attribute access.
+
+def __getattr__(name):
+    if name == "STOPWORDS":
+        return get_stopwords()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Target job roles and their keywords live in the job role catalog
+# (resume_analyzer/catalog.py, data/job_roles.json); the role is chosen
+# per request.
+
+# Bump whenever scores or tips can change for the same input; cached
+# results from older scoring versions are then ignored.
+SCORING_VERSION = "5"
 
-STOPWORDS = set(stopwords.words("english"))
 
-TARGET_JOB_KEYWORDS = {
-    "developer": ["Python", "Flask", "React", "TypeScript", "SQL", "Git"],
-    "data_science": ["Python", "Pandas", "NumPy", "TensorFlow", "PyTorch", "Stats"]
-}
+# Roles listed when ranking a resume against every role of the catalog
+ROLE_MATCHES = 5
 
-JOB_ROLE = "developer"  # Hardcoded for now
+
+def keyword_points(matched, total):
+    """Keyword optimization points for `matched` of `total` job keywords (8 each, 40 at most)."""
+    return min(40, total * 8) * matched // total if total else 0
+
+
+def final_score(points):
+    """The 0-100 ATS score for a resume's points (see FINAL SCORE CALCULATION)."""
+    max_possible_score = 100  # 40 + 30 + 20 + 10
+    return min(100, max(0, int((points / max_possible_score) * 100)))
 
 
 # ----------------------------------------------------------
@@ -102,6 +124,7 @@ JOB_ROLE = "developer"  # Hardcoded for now
 #    - Missing keywords are suggested for improvement
 #
 # 2. STRUCTURAL COMPLETENESS (30 points): Ensures essential sections exist
+#    (a recognized heading with content under it, see sections.py)
 #    - Skills section (10 points)
 #    - Experience/Work History section (10 points)
 #    - Education section (5 points)
@@ -117,7 +140,7 @@ JOB_ROLE = "developer"  # Hardcoded for now
 #    - Standard section headers
 #    - Proper formatting
 
-def analyze_resume_text(raw_text, job_keywords):
+def analyze_resume_text(resume, job_keywords, keyword_hits=None):
     """
     Analyzes resume text based on ATS (Applicant Tracking System) criteria.
     
@@ -126,29 +149,45 @@ def analyze_resume_text(raw_text, job_keywords):
     - Structural Completeness: Checks for essential resume sections
     - Content Quality: Evaluates depth, clarity, and impact
     - ATS Compatibility: Ensures resume can be parsed by ATS systems
+
+    `resume` is extracted text or its sections.ResumeDocument; each rule
+    reads only the sections it is about. `keyword_hits`, if given, is the
+    collection of job_keywords already found in the text (e.g. by the role
+    catalog index, which also knows synonyms); otherwise keywords are
+    matched as substrings of the whole text here.
     
     Returns:
         dict with atsScore, keywordSuggestions, and formattingTips
     """
-    if not raw_text:
+    return score_resume(resume, job_keywords, keyword_hits)[0]
+
+
+def score_resume(resume, job_keywords, keyword_hits=None):
+    """
+    analyze_resume_text's result and the points the resume scored outside
+    keyword optimization, before normalization: the same for every role,
+    so rank_roles adds each role's keyword points to them.
+    """
+    if not resume:
         return {
             "atsScore": 0,
             "keywordSuggestions": job_keywords.copy() if job_keywords else [],
             "formattingTips": ["Could not read file text. Please ensure the file is not corrupted and is a valid PDF or DOCX format."]
-        }
+        }, 0
+
+    document = resume if isinstance(resume, ResumeDocument) else parse_resume(resume)
+    word_count = len(document.text.split())
 
-    text_lower = raw_text.lower()
-    text_words = raw_text.split()
-    word_count = len(text_words)
+    # Each group of rules scans only its sections, once
+    hits = scan_document(document)
+    if keyword_hits is not None:
+        hits.update((keyword_rule(kw), 1) for kw in keyword_hits)
+    else:
+        hits.update(matcher_for_keywords(tuple(job_keywords)).scan(document.lower))
     
-    # Use spaCy if available, otherwise skip NLP features
-    doc = None
-    if nlp:
-        try:
-            doc = nlp(raw_text)
-        except Exception as e:
-            print(f"spaCy processing error: {e}")
-            doc = None
+    # Run spaCy only with the components enabled features need (none by default)
+    with span("nlp"):
+        doc = run_nlp_stage(document.text)
 
     score = 0
     matched_keywords = []
@@ -157,21 +196,15 @@ def analyze_resume_text(raw_text, job_keywords):
     # ============================================
     # 1. KEYWORD OPTIMIZATION (40 points max)
     # ============================================
-    keyword_score = 0
-    max_keyword_points = min(40, len(job_keywords) * 8)
-    points_per_keyword = max_keyword_points / len(job_keywords) if job_keywords else 0
-    
     for kw in job_keywords:
-        # Check for exact keyword match (case-insensitive)
-        if kw.lower() in text_lower:
-            keyword_score += points_per_keyword
-            matched_keywords.append(kw)
-        # Also check for partial matches (e.g., "Python" matches "Python3", "Pythonic")
-        elif any(kw.lower() in word.lower() for word in text_words if len(word) > 3):
-            keyword_score += points_per_keyword * 0.5  # Partial credit
+        # Case-insensitive substring match, so "Python" also matches "Python3", "Pythonic".
+        # (A separate per-word partial-match pass could never succeed after this
+        # check fails: every lowercased word is a substring of the lowercased text.)
+        if hits.get(keyword_rule(kw)):
             matched_keywords.append(kw)
     
-    score += int(keyword_score)
+    keyword_score = keyword_points(len(matched_keywords), len(job_keywords))
+    score += keyword_score
     
     # ============================================
     # 2. STRUCTURAL COMPLETENESS (30 points max)
@@ -179,33 +212,25 @@ def analyze_resume_text(raw_text, job_keywords):
     structural_score = 0
     
     # Skills section check (10 points)
-    skills_patterns = [r"\bskills\b", r"\btechnical\s+skills\b", r"\bcompetencies\b", r"\bproficiencies\b"]
-    has_skills = any(re.search(pattern, text_lower) for pattern in skills_patterns)
-    if has_skills:
+    if document.has("skills"):
         structural_score += 10
     else:
         tips.append("Add a dedicated 'Skills' or 'Technical Skills' section to highlight your competencies.")
     
     # Experience section check (10 points)
-    experience_patterns = [r"\bexperience\b", r"\bwork\s+history\b", r"\bemployment\b", r"\bprofessional\s+experience\b", r"\bwork\s+experience\b"]
-    has_experience = any(re.search(pattern, text_lower) for pattern in experience_patterns)
-    if has_experience:
+    if document.has("experience"):
         structural_score += 10
     else:
         tips.append("Add an 'Experience', 'Work History', or 'Professional Experience' section.")
     
     # Education section check (5 points)
-    education_patterns = [r"\beducation\b", r"\bacademic\b", r"\bqualifications\b"]
-    has_education = any(re.search(pattern, text_lower) for pattern in education_patterns)
-    if has_education:
+    if document.has("education"):
         structural_score += 5
     else:
         tips.append("Include an 'Education' section with your academic qualifications.")
     
     # Contact information check (5 points)
-    contact_patterns = [r"@", r"\bemail\b", r"\bphone\b", r"\bmobile\b", r"\bcontact\b"]
-    has_contact = any(re.search(pattern, text_lower) for pattern in contact_patterns)
-    if has_contact:
+    if hits["contact"]:
         structural_score += 5
     else:
         tips.append("Ensure your contact information (email, phone) is clearly visible.")
@@ -230,9 +255,7 @@ def analyze_resume_text(raw_text, job_keywords):
         content_score += 3
     
     # Action verbs check (5 points) - Strong action verbs indicate impact
-    action_verbs = ["developed", "created", "implemented", "designed", "managed", "led", "improved", 
-                    "achieved", "optimized", "built", "delivered", "executed", "launched", "established"]
-    action_verb_count = sum(1 for verb in action_verbs if verb in text_lower)
+    action_verb_count = sum(1 for verb in ACTION_VERBS if hits[f"verb:{verb}"])
     if action_verb_count >= 5:
         content_score += 5
     elif action_verb_count >= 3:
@@ -242,9 +265,7 @@ def analyze_resume_text(raw_text, job_keywords):
         tips.append("Include more action verbs to describe your accomplishments and responsibilities.")
     
     # Quantifiable achievements check (5 points)
-    number_patterns = [r"\d+%", r"\d+\+", r"\$\d+", r"\d+\s+(years?|months?)", r"\d+\s+(people|users|customers)"]
-    has_numbers = any(re.search(pattern, text_lower) for pattern in number_patterns)
-    if has_numbers:
+    if hits["numbers"]:
         content_score += 5
     else:
         tips.append("Add quantifiable metrics (percentages, numbers, timeframes) to demonstrate your impact.")
@@ -258,12 +279,11 @@ def analyze_resume_text(raw_text, job_keywords):
     ats_tips = []
     
     # Check for common ATS-unfriendly elements
-    if re.search(r"\.(jpg|jpeg|png|gif)", text_lower):
+    if hits["images"]:
         ats_tips.append("Avoid embedding images in your resume. ATS systems cannot read text from images.")
     
     # Check for proper section headers
-    section_headers = ["summary", "objective", "skills", "experience", "education", "projects"]
-    found_headers = sum(1 for header in section_headers if re.search(rf"\b{header}\b", text_lower))
+    found_headers = len(document.headed_kinds() - {"contact"})
     if found_headers < 3:
         ats_tips.append("Use clear, standard section headers (e.g., 'Experience', 'Education', 'Skills') for better ATS parsing.")
     
@@ -276,8 +296,7 @@ def analyze_resume_text(raw_text, job_keywords):
     # FINAL SCORE CALCULATION
     # ============================================
     # Normalize to 0-100 scale
-    max_possible_score = 100  # 40 + 30 + 20 + 10
-    ats_final_score = min(100, max(0, int((score / max_possible_score) * 100)))
+    ats_final_score = final_score(score)
     
     # Ensure we always return lists
     keyword_suggestions = [kw for kw in job_keywords if kw not in matched_keywords]
@@ -297,32 +316,108 @@ def analyze_resume_text(raw_text, job_keywords):
         "atsScore": ats_final_score,
         "keywordSuggestions": keyword_suggestions,
         "formattingTips": tips
-    }
+    }, score - keyword_score
+
+
+def rank_roles(catalog, found_terms, base_points, top=ROLE_MATCHES):
+    """
+    The `top` catalog roles a resume fits best, best first.
+
+    `found_terms` are the resume's catalog terms (catalog.match()) and
+    `base_points` its points without keyword points (see score_resume),
+    which are the same for every role; each role's score is normalized
+    like an analysis with that role. All roles are matched at once through the catalog's
+    RoleMatrix; only the listed roles have their keywords spelled out.
+    """
+    import numpy as np
+
+    matrix = catalog.role_matrix()
+    counts = matrix.matched_counts(found_terms)
+    totals = matrix.keyword_totals
+    points = np.minimum(40, totals * 8) * counts // np.maximum(totals, 1)
+    # Highest score, then most keywords matched, then catalog order
+    order = np.lexsort((-counts, -points))[:top]
+    matches = []
+    for i in order:
+        role = matrix.roles[i]
+        matched = role.matched_keywords(found_terms)
+        matches.append({
+            "role": role.id,
+            "title": role.title,
+            "atsScore": final_score(base_points + int(points[i])),
+            "matchedKeywords": matched,
+            "missingKeywords": [kw for kw in role.keywords if kw not in matched],
+        })
+    return matches
 
 
 # ----------------------------------------------------------
 # 4. Entry Function
 # ----------------------------------------------------------
 
-def process_resume_file(filepath):
-    """Main entry for resume analysis."""
+def process_resume_file(source, filename=None, progress=None, role=None, job_description=None,
+                        include_document=False, top_roles=None):
+    """
+    Main entry for resume analysis.
+
+    Accepts the same sources as extract_text_from_file, so uploads can be
+    analyzed straight from memory without a temp file. `source` may also be
+    a parsed resume from an earlier analysis (a ResumeDocument or its
+    as_dict()), which skips extraction. `role` is a job role id or alias
+    from the catalog (default role if None); an unknown role raises
+    catalog.UnknownRole. `progress`, if given, is called with each stage
+    name ("extracting", "scoring") as the analysis reaches it. With a
+    `job_description`, the result also has a "jobMatch" similarity; with
+    `include_document`, a "parsedResume" (ResumeDocument.as_dict(), for the
+    parse cache and the search index, which pop it before the result goes
+    anywhere else). With `top_roles`, "roleMatches" lists that many catalog
+    roles the resume fits best (see rank_roles).
+    """
+    catalog = get_catalog()
+    job_role = catalog.resolve(role)
     try:
-        raw_text = extract_text_from_file(filepath)
-        if raw_text is None:
-            return {
-                "atsScore": 0,
-                "keywordSuggestions": TARGET_JOB_KEYWORDS.get(JOB_ROLE, TARGET_JOB_KEYWORDS["developer"]).copy(),
-                "formattingTips": ["Failed to extract text from the file. Please ensure the file is not corrupted and is a valid PDF or DOCX format."]
-            }
-        
-        keywords = TARGET_JOB_KEYWORDS.get(JOB_ROLE, TARGET_JOB_KEYWORDS["developer"])
-        result = analyze_resume_text(raw_text, keywords)
+        if isinstance(source, ResumeDocument):
+            document = source
+        elif isinstance(source, dict):
+            document = ResumeDocument.from_dict(source)
+        else:
+            if progress is not None:
+                progress("extracting")
+            extension = os.path.splitext(str(filename if filename is not None else source))[1].lower()
+            with span("extract_pdf" if extension == ".pdf" else "extract_docx" if extension == ".docx" else "extract_other"):
+                raw_text, warnings = extract_resume(source, filename)
+            if raw_text is None:
+                return {
+                    "atsScore": 0,
+                    "keywordSuggestions": job_role.keywords.copy(),
+                    "formattingTips": warnings or ["Failed to extract text from the file. Please ensure the file is not corrupted and is a valid PDF or DOCX format."],
+                    "jobRole": job_role.id
+                }
+            with span("parse"):
+                document = parse_resume(raw_text, warnings)
+
+        if progress is not None:
+            progress("scoring")
+        with span("scoring"):
+            found_terms = catalog.match(document.lower)
+            keyword_hits = job_role.matched_keywords(found_terms)
+            result, base_points = score_resume(document, job_role.keywords, keyword_hits=keyword_hits)
+        if top_roles:
+            with span("role_ranking"):
+                result["roleMatches"] = rank_roles(catalog, found_terms, base_points, top_roles)
+        if job_description:
+            with span("job_match"):
+                result["jobMatch"] = job_match(document.text, job_description)
+        result["formattingTips"].extend(document.warnings)
+        result["jobRole"] = job_role.id
+        if include_document:
+            result["parsedResume"] = document.as_dict()
         return result
     except Exception as e:
-        print(f"Error in process_resume_file: {e}")
-        print(traceback.format_exc())
+        logger.exception("Error in process_resume_file: %s", e)
         return {
             "atsScore": 0,
-            "keywordSuggestions": TARGET_JOB_KEYWORDS.get(JOB_ROLE, TARGET_JOB_KEYWORDS["developer"]).copy(),
-            "formattingTips": [f"An error occurred during analysis: {str(e)}"]
+            "keywordSuggestions": job_role.keywords.copy(),
+            "formattingTips": [f"An error occurred during analysis: {str(e)}"],
+            "jobRole": job_role.id
         }
@@ -0,0 +1,165 @@
+import cProfile
+import heapq
+import hmac
+import marshal
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+# ----------------------------------------------------------
+# Request profiling
+# ----------------------------------------------------------
+# An analysis can run under one of two profilers, inside whichever process
+# runs it (a pool worker or the request thread), so the profile covers
+# text extraction (pdfminer, the DOCX reader), spaCy and the scoring rules:
+#   - "pstats": cProfile, deterministic; the artifact is the marshalled
+#     stats that pstats.Stats, snakeviz or gprof2dot read,
+#   - "collapsed": a stack sampler that records the analysis thread's
+#     stack every SAMPLE_INTERVAL seconds; the artifact is one
+#     "outer;...;inner count" line per stack, the input of flamegraph.pl
+#     and speedscope. Cheap enough to leave on for a fraction of requests.
+# ProfileStore keeps the profiles a client asked for (most recent first)
+# and the slowest of the sampled ones, both bounded.
+
+PSTATS = "pstats"
+COLLAPSED = "collapsed"
+FORMATS = (PSTATS, COLLAPSED)
+
+SAMPLE_INTERVAL = float(os.environ.get("RESUME_PROFILE_INTERVAL_MS", 5)) / 1000
+
+
+def token_matches(secret, token):
+    """True if profiling is enabled (a secret is set) and the token is that secret."""
+    return bool(secret and token) and hmac.compare_digest(secret.encode(), token.encode())
+
+
+def _frame_label(code):
+    # "extract_pdf (resume_analyzer/extractors.py:120)": the package and file are enough to tell frames apart
+    path = code.co_filename.replace("\\", "/").split("/")
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples the calling thread's stack from a background thread while the
+    `with` block runs; collapsed() returns the stacks in collapsed format.
+    """
+
+    def __init__(self, interval=None):
+        self.interval = interval or SAMPLE_INTERVAL
+        self.stacks = Counter()
+        self._target = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        labels = {}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def run_profiled(profile_format, func, *args):
+    """
+    Runs func(*args) under the profiler for `profile_format`. Returns
+    (result, seconds, artifact bytes). Module level, so it can be submitted
+    to an AnalysisPool like the function it wraps.
+    """
+    start = time.perf_counter()
+    if profile_format == PSTATS:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func, *args)
+        seconds = time.perf_counter() - start
+        profiler.create_stats()
+        artifact = marshal.dumps(profiler.stats)
+    elif profile_format == COLLAPSED:
+        with StackSampler() as sampler:
+            result = func(*args)
+        seconds = time.perf_counter() - start
+        artifact = sampler.collapsed().encode("utf-8")
+    else:
+        raise ValueError(f"Unknown profile format '{profile_format}'. Use one of: {', '.join(FORMATS)}")
+    return result, seconds, artifact
+
+
+class ProfileStore:
+    """
+    Profiles kept in memory: the `keep` most recent requested ones and the
+    `keep` slowest sampled ones.
+    """
+
+    def __init__(self, keep=20):
+        self.keep = keep
+        self._requested = OrderedDict()
+        self._slowest = []  # min-heap of (seconds, profileId)
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def add(self, profile_format, artifact, seconds, filename=None, sampled=False):
+        """
+        Stores a profile and returns its metadata, or None if it is a sampled
+        profile faster than every one kept.
+        """
+        profile = {
+            "profileId": uuid.uuid4().hex,
+            "format": profile_format,
+            "filename": filename,
+            "seconds": round(seconds, 6),
+            "sampled": sampled,
+            "createdAt": time.time(),
+            "bytes": len(artifact),
+        }
+        with self._lock:
+            if sampled:
+                entry = (seconds, profile["profileId"])
+                if len(self._slowest) < self.keep:
+                    heapq.heappush(self._slowest, entry)
+                elif entry > self._slowest[0]:
+                    _, evicted = heapq.heapreplace(self._slowest, entry)
+                    del self._profiles[evicted]
+                else:
+                    return None
+            else:
+                self._requested[profile["profileId"]] = True
+                while len(self._requested) > self.keep:
+                    evicted, _ = self._requested.popitem(last=False)
+                    del self._profiles[evicted]
+            self._profiles[profile["profileId"]] = (profile, artifact)
+        return dict(profile)
+
+    def get(self, profile_id):
+        """(metadata, artifact bytes) of a kept profile, or None."""
+        with self._lock:
+            entry = self._profiles.get(profile_id)
+        return (dict(entry[0]), entry[1]) if entry is not None else None
+
+    def list(self):
+        """Metadata of the kept profiles, slowest first."""
+        with self._lock:
+            profiles = [dict(profile) for profile, _ in self._profiles.values()]
+        return sorted(profiles, key=lambda profile: profile["seconds"], reverse=True)
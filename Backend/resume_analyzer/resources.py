@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+
+from resume_analyzer.features import (
+    SPACY_MODEL, get_pipeline, required_capabilities, required_pipes,
+)
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# Lazy NLP resource manager
+# ----------------------------------------------------------
+# Importing the analyzer must stay cheap: nltk and spaCy together take
+# seconds to import and load, and every worker process would pay that
+# before it can answer /api/health. Resources are therefore loaded on
+# first use, or ahead of time by warm_up() (optionally in a background
+# thread). Nothing here ever downloads data; run
+#     python -m resume_analyzer download
+# once at deploy time instead.
+
+COLD = "cold"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+# NLTK's English stopword list, used when the corpus is not installed.
+FALLBACK_STOPWORDS = frozenset("""
+i me my myself we our ours ourselves you you're you've you'll you'd your yours yourself
+yourselves he him his himself she she's her hers herself it it's its itself they them their
+theirs themselves what which who whom this that that'll these those am is are was were be
+been being have has had having do does did doing a an the and but if or because as until
+while of at by for with about against between into through during before after above below
+to from up down in out on off over under again further then once here there when where why
+how all any both each few more most other some such no nor not only own same so than too
+very s t can will just don don't should should've now d ll m o re ve y ain aren aren't
+couldn couldn't didn didn't doesn doesn't hadn hadn't hasn hasn't haven haven't isn isn't ma
+mightn mightn't mustn mustn't needn needn't shan shan't shouldn shouldn't wasn wasn't weren
+weren't won won't wouldn wouldn't
+""".split())
+
+_lock = threading.RLock()
+_state = {
+    "status": COLD,
+    "error": None,
+    "warmupSeconds": None,
+    "resources": {},
+}
+_stopwords = None
+_warmup_thread = None
+
+
+def _set_resource(name, value):
+    with _lock:
+        _state["resources"][name] = value
+
+
+def get_stopwords():
+    """Returns the English stopword set, loading it on first use."""
+    global _stopwords
+    if _stopwords is None:
+        with _lock:
+            if _stopwords is None:
+                try:
+                    from nltk.corpus import stopwords
+                    words = set(stopwords.words("english"))
+                    _set_resource("stopwords", "nltk")
+                except (ImportError, LookupError) as e:
+                    logger.info("NLTK stopwords unavailable (%s), using bundled list", e.__class__.__name__)
+                    words = set(FALLBACK_STOPWORDS)
+                    _set_resource("stopwords", "fallback")
+                _stopwords = words
+    return _stopwords
+
+
+def _load_spacy_pipeline():
+    capabilities = required_capabilities()
+    if not capabilities:
+        _set_resource("spacy", "not needed")
+        return
+    try:
+        get_pipeline(required_pipes(capabilities))
+        _set_resource("spacy", SPACY_MODEL)
+    except (ImportError, IOError, OSError) as e:
+        logger.warning("spaCy model unavailable: %s. Run 'python -m resume_analyzer download' to install '%s'.",
+                       e, SPACY_MODEL)
+        _set_resource("spacy", "unavailable")
+
+
+def _warm_up():
+    start = time.perf_counter()
+    with _lock:
+        _state["status"] = LOADING
+    try:
+        get_stopwords()
+        _load_spacy_pipeline()
+        # Text extractors are imported by nlp_processor; touching them here
+        # keeps the first request from paying for their lazy submodules.
+        import pdfminer.high_level  # noqa: F401
+        import docx  # noqa: F401
+        with _lock:
+            _state["status"] = READY
+    except Exception as e:
+        logger.exception("Resource warm-up failed: %s", e)
+        with _lock:
+            _state["status"] = FAILED
+            _state["error"] = str(e)
+    finally:
+        with _lock:
+            _state["warmupSeconds"] = round(time.perf_counter() - start, 3)
+
+
+def warm_up(background=True):
+    """Loads all NLP resources now, or in a daemon thread if background is True."""
+    global _warmup_thread
+    with _lock:
+        already_started = _state["status"] in (LOADING, READY)
+        if not already_started:
+            _state["status"] = LOADING
+            if background:
+                _warmup_thread = threading.Thread(target=_warm_up, name="nlp-warmup", daemon=True)
+                _warmup_thread.start()
+        thread = _warmup_thread
+
+    if already_started:
+        # Wait outside the lock: the warm-up thread needs it to finish.
+        if thread is not None and not background:
+            thread.join()
+        return thread
+    if not background:
+        _warm_up()
+        return None
+    return thread
+
+
+def is_ready():
+    """True once warm_up() has finished loading every resource."""
+    return _state["status"] == READY
+
+
+def status():
+    """Returns a snapshot of the loading state for health checks."""
+    with _lock:
+        return {
+            "status": _state["status"],
+            "error": _state["error"],
+            "warmupSeconds": _state["warmupSeconds"],
+            "resources": dict(_state["resources"]),
+        }
+
+
+# ----------------------------------------------------------
+# Explicit downloads (deploy time only)
+# ----------------------------------------------------------
+
+def download_resources():
+    """Downloads the NLTK stopwords and the spaCy model. Returns True on success."""
+    import subprocess
+    import sys
+
+    ok = True
+    try:
+        import nltk
+        ok = bool(nltk.download("stopwords")) and ok
+    except Exception as e:
+        logger.error("Could not download NLTK stopwords: %s", e)
+        ok = False
+
+    try:
+        import spacy
+        if not spacy.util.is_package(SPACY_MODEL):
+            subprocess.run([sys.executable, "-m", "spacy", "download", SPACY_MODEL], check=True)
+    except Exception as e:
+        logger.error("Could not download spaCy model: %s", e)
+        ok = False
+    return ok
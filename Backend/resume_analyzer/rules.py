@@ -0,0 +1,163 @@
+import re
+from functools import lru_cache
+
+# ----------------------------------------------------------
+# Compiled rule engine
+# ----------------------------------------------------------
+# Every scoring rule (section headers, action verbs, metrics, contact
+# details, job keywords, ...) is a list of terms, compiled once at import
+# time (or once per keyword list) into a RuleMatcher.
+#
+# Each term carries a literal prefilter checked with str.find, which runs
+# at C speed, and only terms whose literal is present pay for their
+# precompiled regex, started at the first occurrence of the literal.
+# Terms shared by several rules (e.g. "skills" is both a section check
+# and a standard header) are evaluated once per scan.
+#
+# CPython's re has no multi-pattern automaton: a single combined
+# alternation (or a pure-Python Aho-Corasick) is tried at every text
+# position and benchmarked several times slower than this layout.
+
+
+class Term:
+    """One pattern with its literal prefilter; immutable and shareable."""
+
+    __slots__ = ("pattern", "anchor", "requires", "regex")
+
+    def __init__(self, pattern, anchor=None, requires=(), plain=False):
+        self.pattern = pattern
+        # Literal every match starts with; the regex is run from its first occurrence.
+        self.anchor = anchor
+        # Literals of which at least one must occur somewhere for a match.
+        self.requires = requires
+        # Plain substrings need no regex once the anchor is found.
+        self.regex = None if plain else re.compile(pattern)
+
+    def search(self, text):
+        """Returns True if the term occurs in the text."""
+        start = 0
+        if self.anchor is not None:
+            start = text.find(self.anchor)
+            if start < 0:
+                return False
+            if self.regex is None:
+                return True
+        if self.requires and not any(literal_ in text for literal_ in self.requires):
+            return False
+        return self.regex.search(text, start) is not None
+
+
+def literal(text):
+    """Plain substring pattern (`text in haystack`)."""
+    return Term(re.escape(text), anchor=text, plain=True)
+
+
+def word(phrase):
+    """Whole-word phrase; words may be separated by any whitespace."""
+    words = phrase.split()
+    first = re.escape(words[0])
+    # `\bword` written as `word(?<!\wword)` keeps a literal prefix, which re
+    # searches for far faster than a pattern that starts with an assertion.
+    pattern = first + rf"(?<!\w{first})" + "".join(r"\s+" + re.escape(w) for w in words[1:]) + r"\b"
+    return Term(pattern, anchor=words[0])
+
+
+def regex(pattern, anchor=None, requires=()):
+    """Arbitrary regex with an optional anchor literal or required literals."""
+    return Term(pattern, anchor=anchor, requires=tuple(requires))
+
+
+class RuleMatcher:
+    """Compiles a list of (rule, [terms]) once and scores texts against it."""
+
+    def __init__(self, rules):
+        terms = {}
+        self.rules = []
+        for rule, rule_terms in rules:
+            self.rules.append((rule, [terms.setdefault(term.pattern, term) for term in rule_terms]))
+
+    def scan(self, text_lower):
+        """Returns {rule: number of the rule's terms found in the text}."""
+        found = {}
+        hits = {}
+        for rule, terms in self.rules:
+            count = 0
+            for term in terms:
+                hit = found.get(term.pattern)
+                if hit is None:
+                    hit = found[term.pattern] = term.search(text_lower)
+                count += hit
+            hits[rule] = count
+        return hits
+
+
+# ----------------------------------------------------------
+# Scoring rules
+# ----------------------------------------------------------
+# Section presence and headers come from the segmented resume model
+# (sections.py). The text rules below are grouped by the sections they
+# read, so each scans only its part of the resume; None means the whole
+# text.
+
+ACTION_VERBS = ["developed", "created", "implemented", "designed", "managed", "led", "improved",
+                "achieved", "optimized", "built", "delivered", "executed", "launched", "established"]
+
+# Where accomplishments are described
+CONTENT_SECTIONS = ("summary", "experience", "projects")
+
+SCOPED_RULES = [
+    (("contact",), [
+        ("contact", [literal("@"), word("email"), word("phone"), word("mobile"), word("contact")]),
+    ]),
+    (CONTENT_SECTIONS, [
+        # Presence-equivalent forms of \d+%, \d+\+, \$\d+, \d+\s+(years?|months?)
+        # and \d+\s+(people|users|customers) that can start at a literal.
+        ("numbers", [regex(r"(?<=\d)%", anchor="%"),
+                     regex(r"(?<=\d)\+", anchor="+"),
+                     regex(r"\$\d", anchor="$"),
+                     regex(r"\d\s+(?:years?|months?)", requires=["year", "month"]),
+                     regex(r"\d\s+(?:people|users|customers)", requires=["people", "users", "customers"])]),
+    ] + [(f"verb:{verb}", [literal(verb)]) for verb in ACTION_VERBS]),
+    (None, [
+        ("images", [regex(r"\.(?:jpg|jpeg|png|gif)", anchor=".")]),
+    ]),
+]
+
+# [(section kinds or None, matcher)], compiled once
+SCOPED_MATCHERS = [(kinds, RuleMatcher(rules)) for kinds, rules in SCOPED_RULES]
+
+
+def scan_document(document):
+    """
+    {rule: hit count} of every scoped rule over a sections.ResumeDocument.
+    Content rules fall back to the whole text when no section heading was
+    recognized, so an unstructured resume is not scored as empty.
+    """
+    hits = {}
+    for kinds, matcher in SCOPED_MATCHERS:
+        if kinds is None:
+            text = document.lower
+        elif kinds == CONTENT_SECTIONS:
+            text = document.section_text(kinds, fallback=True)
+        else:
+            text = document.section_text(kinds)
+        hits.update(matcher.scan(text))
+    return hits
+
+
+def keyword_rule(keyword):
+    """Rule name used for a job keyword."""
+    return f"keyword:{keyword.lower()}"
+
+
+@lru_cache(maxsize=256)
+def matcher_for_keywords(job_keywords):
+    """Returns the (cached) matcher for the given job keywords (matched against the whole text)."""
+    rules = []
+    seen = set()
+    for kw in job_keywords:
+        rule = keyword_rule(kw)
+        if rule not in seen:
+            seen.add(rule)
+            rules.append((rule, [literal(kw.lower())]))
+    return RuleMatcher(rules)
@@ -0,0 +1,238 @@
+import heapq
+import itertools
+import os
+import queue
+import re
+import threading
+import time
+
+# ----------------------------------------------------------
+# Size-aware fair scheduling of analyses
+# ----------------------------------------------------------
+# The pool's job queue is not first-come, first-served. Each job carries
+# an estimated cost in seconds (estimate_cost: file type, size and, for a
+# PDF, its page count read from the page tree without parsing it) and the
+# client that submitted it. When a worker frees up, FairQueue hands it
+# the queued job with the lowest
+#
+#     estimated cost + outstanding work of its client - AGING * seconds waited
+#
+# so short jobs go first (shortest expected job first), a client with many
+# or large jobs queued or running yields to the others, and every job
+# eventually runs: a job that has waited long enough beats any newcomer.
+#
+# Jobs estimated above FAST_LANE_SECONDS are in the slow lane, which may
+# only occupy all but a quarter of the workers (at least one is kept for
+# the fast lane when there are two or more), so a burst of large PDFs can
+# not hold every worker while one-page resumes wait. A single client may
+# also hold at most CLIENT_QUEUE_SHARE of the queue; beyond that its
+# submissions are rejected like a full queue.
+
+FAST_LANE_SECONDS = float(os.environ.get("RESUME_FAST_LANE_SECONDS", 0.25))
+# Estimated seconds of cost forgiven per second a job has waited
+AGING = float(os.environ.get("RESUME_SCHEDULER_AGING", 0.5))
+CLIENT_QUEUE_SHARE = float(os.environ.get("RESUME_CLIENT_QUEUE_SHARE", 0.5))
+
+# Cost model, fitted on the synthetic benchmark corpus (one CPU): a DOCX
+# costs little beyond its size; a PDF about 40 ms per analyzed page.
+BASE_SECONDS = 0.01
+DOCX_SECONDS_PER_MB = 0.3
+PDF_SECONDS_PER_PAGE = 0.04
+PDF_SECONDS_PER_MB = 0.1
+# Cost of a job whose input is unknown (not an upload)
+DEFAULT_COST = 0.1
+# Page count guess for a PDF whose page tree is compressed
+PDF_BYTES_PER_PAGE = 50 * 1024
+
+FAST = "fast"
+SLOW = "slow"
+
+# The page count is read only from the first and last PDF_SCAN_BYTES of a
+# larger file (where writers put the page tree root and the trailer), in
+# the `<< ... >>` dictionary around each of at most PDF_MAX_ROOTS
+# "/Type /Pages" markers, no further than PDF_DICT_BYTES from it: the
+# estimate runs on the request thread, so its cost must not grow with
+# crafted input beyond a linear scan of a bounded window.
+PDF_SCAN_BYTES = 512 * 1024
+PDF_MAX_ROOTS = 64
+PDF_DICT_BYTES = 1024
+
+_PAGES = re.compile(rb"/Type\s*/Pages\b")
+_COUNT = re.compile(rb"/Count\s+(\d{1,9})")
+_PAGE = re.compile(rb"/Type\s*/Page\b")
+
+
+def pdf_page_count(data):
+    """
+    Page count of a PDF from its page tree root (/Type /Pages ... /Count N),
+    else the number of page objects; None if both are in compressed object
+    streams (or, for a large file, outside the scanned head and tail).
+    """
+    whole = len(data) <= 2 * PDF_SCAN_BYTES
+    windows = (data,) if whole else (data[:PDF_SCAN_BYTES], data[-PDF_SCAN_BYTES:])
+    counts = []
+    for window in windows:
+        for match in itertools.islice(_PAGES.finditer(window), PDF_MAX_ROOTS):
+            start = window.rfind(b"<<", max(0, match.start() - PDF_DICT_BYTES), match.start())
+            end = window.find(b">>", match.end(), match.end() + PDF_DICT_BYTES)
+            if start < 0 or end < 0:
+                continue
+            count = _COUNT.search(window, start, end)
+            if count is not None:
+                counts.append(int(count.group(1)))
+    if counts:
+        return max(counts)
+    # Counting page objects is only meaningful over the whole file
+    return (len(_PAGE.findall(data)) or None) if whole else None
+
+
+def estimate_cost(source, filename):
+    """
+    Expected seconds to analyze `source`: upload bytes, or anything else
+    (e.g. an already parsed resume) which only needs scoring.
+    """
+    # Imported here: workers import this module (via the executor) and need not load pdfminer to start
+    from resume_analyzer.extractors import PDF_MAX_PAGES
+
+    if not isinstance(source, (bytes, bytearray)):
+        return BASE_SECONDS
+    megabytes = len(source) / (1024 * 1024)
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".pdf":
+        pages = pdf_page_count(source) or max(1, len(source) // PDF_BYTES_PER_PAGE)
+        return BASE_SECONDS + PDF_SECONDS_PER_PAGE * min(pages, PDF_MAX_PAGES) + PDF_SECONDS_PER_MB * megabytes
+    if extension == ".docx":
+        return BASE_SECONDS + DOCX_SECONDS_PER_MB * megabytes
+    return DEFAULT_COST
+
+
+class _Entry:
+    __slots__ = ("key", "sequence", "item", "cost", "client", "lane")
+
+    def __init__(self, key, sequence, item, cost, client, lane):
+        self.key = key
+        self.sequence = sequence
+        self.item = item
+        self.cost = cost
+        self.client = client
+        self.lane = lane
+
+    def __lt__(self, other):
+        return (self.key, self.sequence) < (other.key, other.sequence)
+
+
+class FairQueue:
+    """
+    Bounded job queue for `workers` consumers, ordered by estimated cost,
+    client fairness and waiting time (see above) instead of arrival.
+    """
+
+    def __init__(self, maxsize, workers, fast_lane_seconds=None, aging=None, client_share=None):
+        self.maxsize = maxsize
+        self.fast_lane_seconds = FAST_LANE_SECONDS if fast_lane_seconds is None else fast_lane_seconds
+        self.aging = AGING if aging is None else aging
+        share = CLIENT_QUEUE_SHARE if client_share is None else client_share
+        self.client_limit = max(1, int(maxsize * share))
+        self.slow_slots = workers - max(1, workers // 4) if workers > 1 else 1
+        self._lanes = {}  # client -> {lane: heap of _Entry}
+        self._queued = {}  # client -> queued job count
+        self._outstanding = {}  # client -> estimated seconds queued or running
+        self._size = 0
+        self._slow_running = 0
+        self._stops = 0
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def put_nowait(self, item, cost=None, client=None):
+        """Queues an item; raises queue.Full if the queue, or the client's share of it, is full."""
+        cost = DEFAULT_COST if cost is None else cost
+        lane = FAST if cost <= self.fast_lane_seconds else SLOW
+        with self._cond:
+            if self._size >= self.maxsize:
+                raise queue.Full
+            if client is not None and self._queued.get(client, 0) >= self.client_limit:
+                raise queue.Full
+            # cost - aging * (now - enqueued) orders jobs the same at any
+            # `now` as cost + aging * enqueued, which never changes
+            key = cost + self.aging * time.monotonic()
+            entry = _Entry(key, next(self._sequence), item, cost, client, lane)
+            heapq.heappush(self._lanes.setdefault(client, {}).setdefault(lane, []), entry)
+            self._queued[client] = self._queued.get(client, 0) + 1
+            self._outstanding[client] = self._outstanding.get(client, 0.0) + cost
+            self._size += 1
+            self._cond.notify()
+
+    def get(self):
+        """
+        Blocks until a job may run and returns its entry (.item is what was
+        queued), or None once stop() was called and the queue is empty.
+        Pass the entry to done() when the job has finished.
+        """
+        with self._cond:
+            while True:
+                entry = self._pick()
+                if entry is not None:
+                    return entry
+                if self._stops and not self._size:
+                    self._stops -= 1
+                    return None
+                self._cond.wait()
+
+    def done(self, entry):
+        """Releases the capacity held by a finished job."""
+        with self._cond:
+            outstanding = self._outstanding[entry.client] - entry.cost
+            if outstanding > 1e-9 or self._queued.get(entry.client):
+                self._outstanding[entry.client] = outstanding
+            else:
+                del self._outstanding[entry.client]
+            if entry.lane == SLOW:
+                self._slow_running -= 1
+            self._cond.notify_all()
+
+    def stop(self, consumers):
+        """Makes `consumers` get() calls return None once the queued jobs have been handed out."""
+        with self._cond:
+            self._stops += consumers
+            self._cond.notify_all()
+
+    def qsize(self):
+        return self._size
+
+    def stats(self):
+        with self._cond:
+            lanes = {FAST: 0, SLOW: 0}
+            for client_lanes in self._lanes.values():
+                for lane, heap in client_lanes.items():
+                    lanes[lane] += len(heap)
+            return {"fastQueued": lanes[FAST], "slowQueued": lanes[SLOW], "slowRunning": self._slow_running,
+                    "clients": len(self._outstanding)}
+
+    def _pick(self):
+        lanes = (FAST, SLOW) if self._slow_running < self.slow_slots else (FAST,)
+        best, best_priority = None, None
+        for client, client_lanes in self._lanes.items():
+            outstanding = self._outstanding[client]
+            for lane in lanes:
+                heap = client_lanes.get(lane)
+                if not heap:
+                    continue
+                # The client's other work, queued or running, counts against it
+                priority = heap[0].key + outstanding - heap[0].cost
+                if best is None or priority < best_priority:
+                    best, best_priority = heap[0], priority
+        if best is None:
+            return None
+        client_lanes = self._lanes[best.client]
+        heapq.heappop(client_lanes[best.lane])
+        if not client_lanes[best.lane]:
+            del client_lanes[best.lane]
+            if not client_lanes:
+                del self._lanes[best.client]
+        self._queued[best.client] -= 1
+        if not self._queued[best.client]:
+            del self._queued[best.client]
+        if best.lane == SLOW:
+            self._slow_running += 1
+        self._size -= 1
+        return best
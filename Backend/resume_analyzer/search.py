@@ -0,0 +1,386 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+
+from resume_analyzer.catalog import UnknownRole, get_catalog
+from resume_analyzer.dedupe import DEDUPE_THRESHOLD, band_keys, minhash, similarity
+from resume_analyzer.sections import SECTION_KINDS, ResumeDocument
+from resume_analyzer.writer import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# Search index of analyzed resumes (SQLite FTS5)
+# ----------------------------------------------------------
+# Every analyzed resume is stored once per file content (SHA-256 of the
+# bytes; re-analyzing a file replaces its entry) as:
+#   - a row in `resumes`: file name, job role, ATS score (indexed, for
+#     score ranges), matched role keywords and a bitmask of the sections
+#     found by the parser (sections.py),
+#   - a row in the FTS5 table `resume_text` with the extracted text and the
+#     matched keywords, i.e. an inverted index over both.
+#
+# Writes go through one background thread (writer.BatchWriter) that commits
+# up to BATCH_SIZE documents per transaction, so analyses never wait on
+# the disk and bulk indexing is not bounded by one fsync per resume. Entries become
+# searchable within FLUSH_SECONDS. The database is in WAL mode, so
+# searches (any thread or worker process) are never blocked by the writer.
+#
+# Near duplicates (dedupe.py) are grouped as they are written: each
+# resume's MinHash signature is stored with its LSH band keys in
+# `resume_bands`, so the writer finds the earlier resumes it may duplicate
+# with BANDS indexed lookups, and `resumes.cluster` is the id of the first
+# resume of its group (its own id if it has no near duplicate). Searches
+# can then collapse the matches of each group to its best-ranked one.
+
+BATCH_SIZE = 500
+FLUSH_SECONDS = 1.0
+
+# Per connection: memory-mapped bytes of the database file, page cache size
+MMAP_BYTES = 256 * 1024 * 1024
+CACHE_KIB = 32 * 1024
+
+# Sections recorded per resume, as bits of resumes.sections
+SECTIONS = SECTION_KINDS
+
+SORT_ORDERS = ("relevance", "score")
+
+# Like the role catalog tokenizer: "c++" and "c#" are terms of their own
+FTS_TOKENIZER = "unicode61 tokenchars '+#'"
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS resumes ("
+    " id INTEGER PRIMARY KEY, digest TEXT NOT NULL UNIQUE, filename TEXT, role TEXT,"
+    " score INTEGER NOT NULL, keywords TEXT NOT NULL, sections INTEGER NOT NULL, indexed REAL NOT NULL,"
+    " cluster INTEGER, signature BLOB)",
+    "CREATE INDEX IF NOT EXISTS resumes_score ON resumes (score)",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS resume_text USING fts5(text, keywords, tokenize=\"{FTS_TOKENIZER}\")",
+)
+
+# Columns added to `resumes` since the first schema, for older databases
+MIGRATIONS = (("cluster", "INTEGER"), ("signature", "BLOB"))
+
+CLUSTER_SCHEMA = (
+    "CREATE INDEX IF NOT EXISTS resumes_cluster ON resumes (cluster)",
+    "CREATE TABLE IF NOT EXISTS resume_bands (bucket INTEGER NOT NULL, resume INTEGER NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS resume_bands_bucket ON resume_bands (bucket)",
+    "CREATE INDEX IF NOT EXISTS resume_bands_resume ON resume_bands (resume)",
+)
+
+
+# Number of rows in `resumes`, kept by triggers so stats() (/api/health)
+# reads one row instead of counting the table
+COUNT_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS resume_count (entries INTEGER NOT NULL)",
+    "INSERT INTO resume_count SELECT (SELECT COUNT(*) FROM resumes)"
+    " WHERE NOT EXISTS (SELECT 1 FROM resume_count)",
+    "CREATE TRIGGER IF NOT EXISTS resumes_added AFTER INSERT ON resumes"
+    " BEGIN UPDATE resume_count SET entries = entries + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS resumes_removed AFTER DELETE ON resumes"
+    " BEGIN UPDATE resume_count SET entries = entries - 1; END",
+)
+
+
+class InvalidQuery(ValueError):
+    """A search query or filter that cannot be run."""
+
+
+def section_mask(names):
+    """Bitmask of section names; raises InvalidQuery for unknown ones."""
+    mask = 0
+    for name in names:
+        if name not in SECTIONS:
+            raise InvalidQuery(f"Unknown section '{name}'. Sections: {', '.join(SECTIONS)}")
+        mask |= 1 << SECTIONS.index(name)
+    return mask
+
+
+def make_document(digest, filename, result, resume):
+    """The index entry of an analysis result and the ResumeDocument (or its dict) it was computed from."""
+    if not isinstance(resume, ResumeDocument):
+        resume = ResumeDocument.from_dict(resume)
+    try:
+        role_keywords = get_catalog().resolve(result.get("jobRole")).keywords
+    except UnknownRole:
+        role_keywords = []
+    missing = set(result.get("keywordSuggestions", ()))
+    return {
+        "digest": digest,
+        "filename": filename,
+        "role": result.get("jobRole"),
+        "score": int(result.get("atsScore", 0)),
+        "keywords": [keyword for keyword in role_keywords if keyword not in missing],
+        "sections": section_mask(name for name in SECTIONS if resume.has(name)),
+        "text": resume.text,
+        "signature": minhash(resume.text),
+    }
+
+
+def _pack_signature(signature):
+    return struct.pack(f"<{len(signature)}Q", *signature) if signature else None
+
+
+def _unpack_signature(blob):
+    return struct.unpack(f"<{len(blob) // 8}Q", blob)
+
+
+_QUERY_TOKEN = re.compile(r'"[^"]*"|[()]|[^\s()]+')
+_OPERATORS = {"AND", "OR", "NOT"}
+_COLUMNS = ("text", "keywords")
+
+
+def _phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def fts_query(query):
+    """
+    Translates a user query into an FTS5 query.
+
+    Terms are implicitly ANDed; AND, OR, NOT (upper case) and parentheses
+    combine them, "quoted phrases" match in order, a trailing * matches a
+    prefix and keywords:term (or text:term) searches one field. Anything
+    else is matched literally, so "c++" or "node.js" need no escaping.
+    """
+    parts = []
+    for token in _QUERY_TOKEN.findall(query):
+        if token in _OPERATORS or token in "()":
+            parts.append(token)
+            continue
+        column = None
+        name, colon, rest = token.partition(":")
+        if colon and name in _COLUMNS and rest:
+            column, token = name, rest
+        if token.startswith('"'):
+            term = _phrase(token.strip('"'))
+        elif token.endswith("*") and len(token) > 1:
+            term = _phrase(token[:-1]) + "*"
+        else:
+            term = _phrase(token)
+        parts.append(f"{column}:{term}" if column else term)
+    return " ".join(parts)
+
+
+class ResumeIndex:
+    """On-disk inverted index of analyzed resumes with batched background writes."""
+
+    def __init__(self, db_path, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS, dedupe_threshold=None):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.dedupe_threshold = DEDUPE_THRESHOLD if dedupe_threshold is None else dedupe_threshold
+        self._writer = BatchWriter(self._write, batch_size, flush_seconds, "resume-index-writer",
+                                   "resumes to the search index")
+        self._local = threading.local()
+        self.counters = {"written": 0, "batches": 0}
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A short-lived connection: this object may be created before a fork
+        with sqlite3.connect(db_path, timeout=5) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                db.execute(statement)
+            columns = {row[1] for row in db.execute("PRAGMA table_info(resumes)")}
+            for column, column_type in MIGRATIONS:
+                if column not in columns:
+                    db.execute(f"ALTER TABLE resumes ADD COLUMN {column} {column_type}")
+            for statement in CLUSTER_SCHEMA + COUNT_SCHEMA:
+                db.execute(statement)
+        db.close()
+
+    # -------------------------
+    # Writes
+    # -------------------------
+
+    def add(self, document):
+        """Queues a document (see make_document) for the background writer."""
+        self._writer.put(document)
+
+    def add_many(self, documents):
+        """Writes documents synchronously, BATCH_SIZE per transaction."""
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def flush(self, timeout=None):
+        """Waits until every document queued so far is written. Returns False on timeout."""
+        return self._writer.flush(timeout)
+
+    def _write(self, batch):
+        now = time.time()
+        db = self._db()
+        with db:
+            for document in batch:
+                # A re-analyzed file keeps its id, so the clusters pointing at it stay valid
+                previous = db.execute("SELECT id, cluster FROM resumes WHERE digest = ?",
+                                      (document["digest"],)).fetchone()
+                resume_id, cluster = previous if previous is not None else (None, None)
+                if previous is not None:
+                    db.execute("DELETE FROM resume_text WHERE rowid = ?", (resume_id,))
+                    db.execute("DELETE FROM resume_bands WHERE resume = ?", (resume_id,))
+                    db.execute("DELETE FROM resumes WHERE id = ?", (resume_id,))
+                signature = document.get("signature")
+                keys = band_keys(signature) if signature else ()
+                if cluster is None and keys:
+                    cluster = self._find_cluster(db, signature, keys)
+                cursor = db.execute(
+                    "INSERT INTO resumes (id, digest, filename, role, score, keywords, sections, indexed, cluster,"
+                    " signature) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (resume_id, document["digest"], document["filename"], document["role"], document["score"],
+                     json.dumps(document["keywords"]), document["sections"], now, cluster,
+                     _pack_signature(signature)),
+                )
+                resume_id = cursor.lastrowid
+                if cluster is None:
+                    db.execute("UPDATE resumes SET cluster = id WHERE id = ?", (resume_id,))
+                db.executemany("INSERT INTO resume_bands (bucket, resume) VALUES (?, ?)",
+                               [(key, resume_id) for key in keys])
+                db.execute(
+                    "INSERT INTO resume_text (rowid, text, keywords) VALUES (?, ?, ?)",
+                    (resume_id, document["text"], "; ".join(document["keywords"])),
+                )
+        self.counters["written"] += len(batch)
+        self.counters["batches"] += 1
+
+    def _find_cluster(self, db, signature, keys):
+        """Cluster of the most similar indexed resume at or above the threshold (None if there is none)."""
+        placeholders = ",".join("?" * len(keys))
+        candidates = db.execute(
+            "SELECT id, cluster, signature FROM resumes WHERE id IN"
+            f" (SELECT resume FROM resume_bands WHERE bucket IN ({placeholders}))", keys)
+        best, best_similarity = None, self.dedupe_threshold
+        for resume_id, cluster, blob in candidates:
+            score = similarity(signature, _unpack_signature(blob))
+            if score >= best_similarity:
+                best, best_similarity = cluster or resume_id, score
+        return best
+
+    # -------------------------
+    # Queries
+    # -------------------------
+
+    def search(self, query=None, min_score=None, max_score=None, role=None, sections=(), sort="relevance",
+               limit=10, collapse=False):
+        """
+        Top `limit` resumes matching a query (see fts_query) and filters.
+
+        Results are ranked by BM25 relevance (matched keywords weigh double)
+        or, with sort="score", by ATS score. Without a query every resume
+        within the filters matches, best score first. With `collapse`, only
+        the best-ranked match of each group of near duplicates is returned,
+        with the number of other resumes in its group. Raises InvalidQuery.
+        """
+        if sort not in SORT_ORDERS:
+            raise InvalidQuery(f"Unknown sort '{sort}'. Use one of: {', '.join(SORT_ORDERS)}")
+        conditions, parameters = [], []
+        if min_score is not None:
+            conditions.append("r.score >= ?")
+            parameters.append(min_score)
+        if max_score is not None:
+            conditions.append("r.score <= ?")
+            parameters.append(max_score)
+        if role:
+            conditions.append("r.role = ?")
+            parameters.append(role)
+        mask = section_mask(sections)
+        if mask:
+            conditions.append("r.sections & ? = ?")
+            parameters.extend((mask, mask))
+
+        # Ranking touches every match, so it only carries ids; the columns
+        # and snippets are read for the top `limit` rows afterwards.
+        # Resumes indexed before clustering have no cluster: each is its own.
+        group = ", r.score, COALESCE(r.cluster, r.id) AS grp" if collapse else ""
+        expression = fts_query(query) if query else ""
+        db = self._db()
+        try:
+            if expression:
+                # Sorted by score, relevance is not needed to pick the top rows
+                rank = "bm25(resume_text, 1.0, 2.0)" if sort == "relevance" else "NULL"
+                if conditions or sort == "score" or collapse:
+                    sql = (f"SELECT r.id, {rank} AS rank{group} FROM resume_text"
+                           " JOIN resumes r ON r.id = resume_text.rowid WHERE resume_text MATCH ?")
+                else:
+                    sql = f"SELECT rowid, {rank} AS rank FROM resume_text WHERE resume_text MATCH ?"
+                order = "rank" if sort == "relevance" else "r.score DESC, r.id"
+                parameters.insert(0, expression)
+            else:
+                sql = f"SELECT r.id, NULL AS rank{group} FROM resumes r WHERE 1"
+                order = "r.score DESC, r.id"
+            sql += "".join(f" AND {condition}" for condition in conditions)
+            if collapse:
+                # Collapsed after matching, so a group is found by whichever of
+                # its resumes match, and is shown as the best-ranked of them
+                order = "rank, id" if sort == "relevance" else "score DESC, id"
+                sql = ("SELECT id, rank, grp FROM (SELECT id, rank, score, grp, ROW_NUMBER() OVER"
+                       f" (PARTITION BY grp ORDER BY {order}) AS nth FROM ({sql})) WHERE nth = 1")
+            top = db.execute(f"{sql} ORDER BY {order} LIMIT ?", parameters + [limit]).fetchall()
+            if not top:
+                return []
+            ids = [row[0] for row in top]
+            placeholders = ",".join("?" * len(ids))
+            rows = {
+                row[0]: row[1:] for row in db.execute(
+                    "SELECT id, digest, filename, role, score, keywords, sections FROM resumes"
+                    f" WHERE id IN ({placeholders})", ids)
+            }
+            snippets = dict(db.execute(
+                "SELECT rowid, snippet(resume_text, 0, '[', ']', '...', 12) FROM resume_text"
+                f" WHERE resume_text MATCH ? AND rowid IN ({placeholders})", [expression] + ids)) if expression else {}
+            if collapse:
+                groups = {row_id: grp for row_id, _, grp in top}
+                members = dict(db.execute(
+                    "SELECT COALESCE(cluster, id), COUNT(*) FROM resumes"
+                    f" WHERE cluster IN ({placeholders}) OR id IN ({placeholders}) GROUP BY 1",
+                    [*groups.values(), *groups.values()]))
+        except sqlite3.OperationalError as e:
+            if "fts5" in str(e) or "syntax" in str(e):
+                raise InvalidQuery(f"Invalid search query: {query}") from None
+            raise
+
+        results = []
+        for row_id, rank, *_ in top:
+            digest, filename, role, score, keywords, sections_bits = rows[row_id]
+            results.append({
+                "digest": digest,
+                "file": filename,
+                "jobRole": role,
+                "atsScore": score,
+                "keywords": json.loads(keywords),
+                "sections": [name for bit, name in enumerate(SECTIONS) if sections_bits >> bit & 1],
+                "relevance": round(-rank, 4) if rank is not None else None,
+                "snippet": snippets.get(row_id),
+            })
+            if collapse:
+                results[-1]["duplicates"] = members[groups[row_id]] - 1
+        return results
+
+    def stats(self):
+        stats = dict(self.counters)
+        stats["documents"] = self._db().execute("SELECT entries FROM resume_count").fetchone()[0]
+        stats["failed"] = self._writer.failed
+        stats["pending"] = self._writer.pending()
+        return stats
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, timeout=5)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            # Postings are read straight from the mapped file and stay cached
+            db.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+            db.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+            self._local.db = db
+        return db
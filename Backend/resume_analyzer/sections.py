@@ -0,0 +1,161 @@
+import string
+
+# ----------------------------------------------------------
+# Section-segmented resume model
+# ----------------------------------------------------------
+# parse_resume() splits extracted text once into typed sections with
+# character spans: a line that is a known heading ("Work History",
+# "TECHNICAL SKILLS:", "Skills: Python, SQL") starts a section that runs
+# to the next heading, and everything before the first heading (name,
+# email, phone) is the contact section. Headings that are not scored
+# (certifications, hobbies, ...) still end the previous section.
+#
+# Scoring rules read only the sections they are about (see rules.py), and
+# "has a skills section" means a skills heading with content under it
+# rather than the word "skills" appearing anywhere.
+#
+# A ResumeDocument is serializable (as_dict / from_dict), so the parse of
+# an upload can be cached independently of the scoring version and role.
+# Bump PARSER_VERSION when segmentation changes; documents serialized by
+# another version are re-segmented from their text.
+
+PARSER_VERSION = "1"
+
+SECTION_KINDS = ("contact", "summary", "skills", "experience", "education", "projects")
+OTHER = "other"
+
+HEADINGS = {
+    "summary": ["summary", "professional summary", "career summary", "profile", "professional profile",
+                "objective", "career objective", "about", "about me"],
+    "skills": ["skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+               "proficiencies", "technologies", "tech stack", "skills and tools"],
+    "experience": ["experience", "professional experience", "work experience", "work history", "employment",
+                   "employment history", "career history", "relevant experience"],
+    "education": ["education", "academic background", "academic qualifications", "qualifications",
+                  "education and training"],
+    "projects": ["projects", "personal projects", "key projects", "selected projects", "academic projects"],
+    "contact": ["contact", "contact information", "contact details", "personal details"],
+    OTHER: ["certifications", "certificates", "awards", "honors", "achievements", "publications", "languages",
+            "interests", "hobbies", "volunteering", "volunteer experience", "references", "activities",
+            "courses", "training"],
+}
+HEADING_KINDS = {alias: kind for kind, aliases in HEADINGS.items() for alias in aliases}
+HEADING_KINDS.update({alias.replace(" and ", " & "): kind for alias, kind in list(HEADING_KINDS.items())})
+
+
+# Longest heading, bullets and punctuation included (a line of its own,
+# or the part of a line before ':')
+MAX_HEADING_CHARS = 32
+
+# Bullets, dashes and punctuation around a heading ("- Education -", "■ SKILLS", "Skills:")
+_DECORATION = string.punctuation + " \t\r\n\u2022\u25a0\u25cf\u25aa\u2013\u2014\u00b7"
+
+
+def heading_kind(line):
+    """Section kind of a heading line ("Work History", "SKILLS", "- Education -"), or None."""
+    if len(line) > MAX_HEADING_CHARS:
+        return None
+    return HEADING_KINDS.get(" ".join(line.lower().split()).strip(_DECORATION))
+
+
+class Section:
+    """One section: its kind, heading as written (None for the contact header) and body span."""
+
+    __slots__ = ("kind", "heading", "start", "end")
+
+    def __init__(self, kind, heading, start, end):
+        self.kind = kind
+        self.heading = heading
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"Section({self.kind!r}, {self.heading!r}, {self.start}, {self.end})"
+
+
+class ResumeDocument:
+    """Extracted resume text with its sections; built by parse_resume()."""
+
+    __slots__ = ("text", "lower", "sections", "warnings", "_texts")
+
+    def __init__(self, text, sections, warnings=()):
+        self.text = text
+        self.lower = text.lower()
+        self.sections = tuple(sections)
+        self.warnings = tuple(warnings)
+        self._texts = {}
+
+    @property
+    def segmented(self):
+        """True if at least one section heading was recognized."""
+        return any(section.heading is not None for section in self.sections)
+
+    def has(self, kind):
+        """True if the resume has a section of this kind with content."""
+        return any(section.kind == kind and self.text[section.start:section.end].strip()
+                   for section in self.sections)
+
+    def headed_kinds(self):
+        """Kinds that have a recognized heading (scored kinds only)."""
+        return {section.kind for section in self.sections if section.heading is not None and section.kind != OTHER}
+
+    def section_text(self, kinds, fallback=False):
+        """
+        Lowercased text of every section of the given kinds, in document
+        order. With `fallback`, a resume without any recognized heading
+        returns its whole text instead.
+        """
+        if fallback and not self.segmented:
+            return self.lower
+        text = self._texts.get(kinds)
+        if text is None:
+            # Spans index `text`: lowercasing can change the length (İ is two code points lowered)
+            text = self._texts[kinds] = "\n".join(
+                self.text[section.start:section.end].lower() for section in self.sections if section.kind in kinds
+            )
+        return text
+
+    def as_dict(self):
+        """JSON-serializable form, restored with from_dict()."""
+        return {
+            "parserVersion": PARSER_VERSION,
+            "text": self.text,
+            "sections": [[s.kind, s.heading, s.start, s.end] for s in self.sections],
+            "warnings": list(self.warnings),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("parserVersion") != PARSER_VERSION:
+            return parse_resume(data["text"], data.get("warnings", ()))
+        return cls(data["text"], [Section(*section) for section in data["sections"]], data.get("warnings", ()))
+
+
+def parse_resume(text, warnings=()):
+    """Segments extracted resume text into a ResumeDocument (one pass over its lines)."""
+    sections = []
+    kind, heading, start = "contact", None, 0
+    position = 0
+    for line in text.splitlines(keepends=True):
+        line_start = position
+        position += len(line)
+        # A "Heading: first line" prefix must start within MAX_HEADING_CHARS
+        colon = line.find(":", 0, MAX_HEADING_CHARS)
+        if colon >= 0:
+            found = heading_kind(line[:colon])
+            if found is None:
+                continue
+            # "Skills: Python, SQL": the body starts on the heading line
+            body_start = line_start + colon + 1 if line[colon + 1:].strip() else position
+            title = line[:colon]
+        else:
+            found = heading_kind(line)
+            if found is None:
+                continue
+            body_start = position
+            title = line
+        if line_start > start or heading is not None:
+            sections.append(Section(kind, heading, start, line_start))
+        kind, heading, start = found, title.strip(_DECORATION), body_start
+    sections.append(Section(kind, heading, start, len(text)))
+    return ResumeDocument(text, sections, warnings)
@@ -0,0 +1,196 @@
+import argparse
+import gc
+import importlib
+import os
+import sys
+import tempfile
+
+from resume_analyzer import log
+
+# ----------------------------------------------------------
+# Production server (preload and fork)
+# ----------------------------------------------------------
+#     python -m resume_analyzer.serve [--bind 0.0.0.0:5000] [--workers N] [--threads T]
+#
+# Runs the Flask app under gunicorn (pip install gunicorn; Linux/macOS).
+# `python app.py` is Flask's single-process development server with the
+# reloader on, and running app.py under a prefork server as-is makes every
+# worker import and load its own copy of the NLP resources.
+#
+# Here the master process imports the app, loads the NLP resources and
+# the job role catalog, collects garbage and gc.freeze()s everything it
+# holds, and only then forks the workers. Workers share those pages with
+# the master copy-on-write: frozen objects are never touched by the cyclic
+# GC, so their refcount/GC headers do not get written and the pages stay
+# shared.
+#
+# Analyses do not run in the worker threads, though: each worker starts
+# one analysis process of its own (RESUME_ANALYSIS_WORKERS defaults to 1
+# here) right after the fork. A thread cannot be stopped, and gunicorn's
+# heartbeat timeout does not catch a wedged analysis thread in a gthread
+# worker (its main thread keeps beating), so inline analyses would lose
+# the pool's per-job kill timeout (RESUME_ANALYSIS_TIMEOUT), its 503
+# backpressure when the queue is full and its fair scheduling, and a few
+# pathological PDFs could hold every thread of a worker for good. The
+# price is memory: the analysis processes load the NLP resources
+# themselves instead of sharing the master's copy. RESUME_ANALYSIS_WORKERS=0
+# analyzes inline in the worker threads to save it, without those limits.
+#
+# Defaults (environment variable, or the matching command-line flag):
+#   RESUME_SERVER_WORKERS   one worker process per CPU (analyses are CPU-bound)
+#   RESUME_SERVER_THREADS   4 threads per worker, so health checks, polls and
+#                           SSE streams are served while an analysis runs
+#   RESUME_SERVER_MAX_REQUESTS (1000) and _JITTER (100): a worker is
+#                           replaced after that many requests, bounding
+#                           memory growth; 0 disables recycling
+#
+# Each worker keeps its own in-memory result cache and metrics: set
+# RESUME_CACHE_DB to share cached results. Async jobs must be shared, as a
+# client's poll may reach any worker: with more than one worker they are
+# kept in RESUME_JOB_DB (else RESUME_CACHE_DB), or, if neither is set, in
+# a temporary file created here and removed when the server exits.
+
+SERVER_BIND = os.environ.get("RESUME_SERVER_BIND", "0.0.0.0:5000")
+SERVER_WORKERS = int(os.environ.get("RESUME_SERVER_WORKERS", 0))
+SERVER_THREADS = int(os.environ.get("RESUME_SERVER_THREADS", 4))
+SERVER_MAX_REQUESTS = int(os.environ.get("RESUME_SERVER_MAX_REQUESTS", 1000))
+SERVER_MAX_REQUESTS_JITTER = int(os.environ.get("RESUME_SERVER_MAX_REQUESTS_JITTER", 100))
+# Seconds a worker may go without a heartbeat before the master replaces it
+SERVER_TIMEOUT = int(os.environ.get("RESUME_SERVER_TIMEOUT", 60))
+
+# The app module is imported in the master; these make it load resources
+# up front and give each worker one analysis process.
+APP_ENVIRONMENT = {
+    "RESUME_NLP_WARMUP": "eager",
+    "RESUME_ANALYSIS_WORKERS": "1",
+}
+
+# The module load_app() imported, for the post_fork hook
+_app_module = None
+
+
+def default_workers(cpus=None):
+    """One worker per CPU."""
+    return max(1, cpus or os.cpu_count() or 1)
+
+
+def preload():
+    """Loads everything workers share into this process, then freezes it for fork."""
+    from resume_analyzer import resources
+    from resume_analyzer.catalog import get_catalog
+
+    resources.warm_up(background=False)
+    get_catalog()
+    gc.collect()
+    gc.freeze()
+
+
+def load_app(spec):
+    """Imports 'module:attribute' (default attribute 'app') with the server defaults applied."""
+    for name, value in APP_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+    module_name, _, attribute = spec.partition(":")
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    module = importlib.import_module(module_name)
+    application = getattr(module, attribute or "app")
+    global _app_module
+    _app_module = module
+    preload()
+    return application
+
+
+def post_fork(server, worker):
+    """gunicorn hook, in each new worker."""
+    log.restart_after_fork()
+    # Start this worker's analysis pool now rather than on its first analysis
+    get_analysis_pool = getattr(_app_module, "get_analysis_pool", None)
+    if get_analysis_pool is not None:
+        get_analysis_pool()
+
+
+def server_options(bind=None, workers=None, threads=None, max_requests=None, max_requests_jitter=None,
+                   timeout=None):
+    """gunicorn settings, falling back to the RESUME_SERVER_* defaults."""
+    return {
+        "bind": bind or SERVER_BIND,
+        "workers": workers or SERVER_WORKERS or default_workers(),
+        "threads": threads or SERVER_THREADS,
+        "worker_class": "gthread" if (threads or SERVER_THREADS) > 1 else "sync",
+        "preload_app": True,
+        "max_requests": SERVER_MAX_REQUESTS if max_requests is None else max_requests,
+        "max_requests_jitter": SERVER_MAX_REQUESTS_JITTER if max_requests_jitter is None else max_requests_jitter,
+        "timeout": timeout or SERVER_TIMEOUT,
+        "post_fork": post_fork,
+    }
+
+
+def shared_job_db(workers):
+    """
+    Path of a new temporary job database when `workers` processes need one
+    and the environment names none (RESUME_JOB_DB, RESUME_CACHE_DB), else None.
+    """
+    if workers <= 1 or os.environ.get("RESUME_JOB_DB") or os.environ.get("RESUME_CACHE_DB"):
+        return None
+    fd, path = tempfile.mkstemp(prefix="resume-jobs-", suffix=".sqlite")
+    os.close(fd)
+    return path
+
+
+def _remove_db(path):
+    for name in (path, path + "-wal", path + "-shm"):
+        try:
+            os.remove(name)
+        except OSError:
+            pass
+
+
+def run(app_spec="app:app", **options):
+    """Serves the app with gunicorn until stopped (SIGTERM/SIGINT)."""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise SystemExit("The production server needs gunicorn: pip install gunicorn")
+
+    class Server(BaseApplication):
+        def __init__(self, settings):
+            self.settings = settings
+            super().__init__()
+
+        def load_config(self):
+            for name, value in self.settings.items():
+                self.cfg.set(name, value)
+
+        def load(self):
+            return load_app(app_spec)
+
+    settings = server_options(**options)
+    job_db = shared_job_db(settings["workers"])
+    if job_db is not None:
+        # Set before the master imports the app
+        os.environ["RESUME_JOB_DB"] = job_db
+        settings["on_exit"] = lambda server: _remove_db(job_db)
+    print(f"Serving {app_spec} on {settings['bind']}: {settings['workers']} worker(s) x "
+          f"{settings['threads']} thread(s), recycled every ~{settings['max_requests'] or 'inf'} requests")
+    Server(settings).run()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m resume_analyzer.serve",
+                                     description="Run the resume analyzer API with preloaded, shared NLP resources.")
+    parser.add_argument("--app", default="app:app", help="WSGI app as module:attribute (default: app:app)")
+    parser.add_argument("--bind", help=f"address to listen on (default: {SERVER_BIND})")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--threads", type=int, help=f"threads per worker (default: {SERVER_THREADS})")
+    parser.add_argument("--max-requests", type=int,
+                        help=f"recycle a worker after this many requests, 0 = never (default: {SERVER_MAX_REQUESTS})")
+    parser.add_argument("--max-requests-jitter", type=int,
+                        help=f"random extra requests before recycling (default: {SERVER_MAX_REQUESTS_JITTER})")
+    parser.add_argument("--timeout", type=int, help=f"worker heartbeat timeout in seconds (default: {SERVER_TIMEOUT})")
+    args = parser.parse_args(argv)
+    run(args.app, bind=args.bind, workers=args.workers, threads=args.threads, max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter, timeout=args.timeout)
+
+
+if __name__ == "__main__":
+    main()
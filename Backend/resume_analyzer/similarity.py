@@ -0,0 +1,208 @@
+import json
+import logging
+import math
+import os
+import threading
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+from resume_analyzer.catalog import tokenize
+from resume_analyzer.resources import get_stopwords
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# Resume vs job description similarity (TF-IDF)
+# ----------------------------------------------------------
+# Text is tokenized like the role catalog (so "c++", "node.js" survive),
+# minus STOPWORDS, numbers and one-letter tokens. Each term is weighted by
+# sublinear term frequency (1 + ln tf) times its IDF, vectors are
+# L2-normalized, and similarity is their dot product (cosine, 0..1).
+#
+# The IDF table is built once from a local corpus of resumes
+# (python -m resume_analyzer idf <dir|zip>) and persisted as JSON at
+# RESUME_IDF_PATH. Without one, every term weighs the same.
+#
+# ResumeMatrix holds many vectorized resumes as the rows of one sparse CSR
+# matrix, so ranking them against a job description is a single sparse
+# matrix-vector product.
+
+DEFAULT_IDF_PATH = os.path.join(os.path.dirname(__file__), "data", "idf.json")
+IDF_PATH = os.environ.get("RESUME_IDF_PATH", DEFAULT_IDF_PATH)
+
+# Terms listed as matched / missing in a job match result
+MATCH_TERMS = 10
+
+
+def term_counts(text):
+    """Counter of the indexable terms of a text."""
+    stopwords = get_stopwords()
+    return Counter(
+        token for token in tokenize(text.lower())
+        if len(token) > 1 and token not in stopwords and not token.isdigit()
+    )
+
+
+class IdfTable:
+    """Inverse document frequencies; terms never seen get the maximum IDF."""
+
+    __slots__ = ("idf", "documents", "unseen")
+
+    def __init__(self, idf=None, documents=0):
+        self.idf = idf or {}
+        self.documents = documents
+        # Smoothed like scikit-learn: ln((1 + N) / (1 + df)) + 1, with df = 0
+        self.unseen = math.log(1 + documents) + 1 if documents else 1.0
+
+    def weight(self, term):
+        return self.idf.get(term, self.unseen)
+
+    @classmethod
+    def build(cls, texts):
+        """IDF table of an iterable of document texts."""
+        frequencies = Counter()
+        documents = 0
+        for text in texts:
+            frequencies.update(term_counts(text).keys())
+            documents += 1
+        idf = {term: math.log((1 + documents) / (1 + df)) + 1 for term, df in frequencies.items()}
+        return cls(idf, documents)
+
+    def save(self, path):
+        """Writes the table as JSON (atomically, so readers never see half a file)."""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as fh:
+            json.dump({"documents": self.documents, "idf": {t: round(v, 6) for t, v in sorted(self.idf.items())}}, fh)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        return cls(data["idf"], data["documents"])
+
+
+_idf_table = None
+_idf_lock = threading.Lock()
+
+
+def get_idf_table():
+    """The persisted IDF table, loaded on first use (uniform weights if there is none)."""
+    global _idf_table
+    if _idf_table is None:
+        with _idf_lock:
+            if _idf_table is None:
+                try:
+                    _idf_table = IdfTable.load(IDF_PATH)
+                except FileNotFoundError:
+                    logger.info("No IDF table at %s, weighting all terms equally. "
+                                "Build one with: python -m resume_analyzer idf <resumes>", IDF_PATH)
+                    _idf_table = IdfTable()
+                except (OSError, ValueError, KeyError) as e:
+                    logger.error("Could not load IDF table %s: %s", IDF_PATH, e)
+                    _idf_table = IdfTable()
+    return _idf_table
+
+
+def tfidf_vector(text, idf=None):
+    """{term: weight} of a text, L2-normalized."""
+    idf = idf or get_idf_table()
+    weights = {term: (1 + math.log(count)) * idf.weight(term) for term, count in term_counts(text).items()}
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    if norm:
+        for term in weights:
+            weights[term] /= norm
+    return weights
+
+
+@lru_cache(maxsize=32)
+def _job_vector(job_description):
+    # A batch scores every resume against the same description
+    vector = tfidf_vector(job_description)
+    return vector, sorted(vector, key=vector.get, reverse=True)
+
+
+def job_match(resume_text, job_description):
+    """
+    Similarity of a resume to a job description: a 0-100 score plus the
+    description's most important terms found in and missing from the resume.
+    """
+    job, ranked_terms = _job_vector(job_description)
+    resume = tfidf_vector(resume_text)
+    score = sum(weight * resume[term] for term, weight in job.items() if term in resume)
+    return {
+        "score": round(min(1.0, score) * 100),
+        "matchedTerms": [term for term in ranked_terms if term in resume][:MATCH_TERMS],
+        "missingTerms": [term for term in ranked_terms if term not in resume][:MATCH_TERMS],
+    }
+
+
+class ResumeMatrix:
+    """
+    Vectorized resumes as the rows of one sparse matrix.
+
+    add() appends rows; rank() scores every row against a job description
+    with one CSR matrix-vector product. Needs numpy and scipy.
+    """
+
+    def __init__(self, idf=None):
+        self.idf = idf or get_idf_table()
+        self.vocabulary = {}
+        self.names = []
+        self._indptr = array("q", [0])
+        self._indices = array("i")
+        self._data = array("d")
+        self._matrix = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, text):
+        vocabulary = self.vocabulary
+        for term, weight in tfidf_vector(text, self.idf).items():
+            column = vocabulary.get(term)
+            if column is None:
+                column = vocabulary[term] = len(vocabulary)
+            self._indices.append(column)
+            self._data.append(weight)
+        self._indptr.append(len(self._indices))
+        self.names.append(name)
+        self._matrix = None
+
+    def matrix(self):
+        """The rows as a scipy CSR matrix (built once per batch of additions)."""
+        if self._matrix is None:
+            import numpy as np
+            from scipy.sparse import csr_matrix
+
+            # Copies: arrays exporting their buffer could no longer grow
+            self._matrix = csr_matrix(
+                (np.array(self._data, dtype=np.float64), np.array(self._indices, dtype=np.int32),
+                 np.array(self._indptr, dtype=np.int64)),
+                shape=(len(self.names), len(self.vocabulary)),
+            )
+        return self._matrix
+
+    def scores(self, job_description):
+        """Cosine similarity of every row to the description, as a numpy array."""
+        import numpy as np
+
+        query = np.zeros(len(self.vocabulary))
+        for term, weight in tfidf_vector(job_description, self.idf).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                query[column] = weight
+        return self.matrix() @ query
+
+    def rank(self, job_description, top_k=10):
+        """[(name, score 0-1)] of the top_k most similar resumes, best first."""
+        import numpy as np
+
+        scores = self.scores(job_description)
+        if top_k and top_k < len(scores):
+            top = np.argpartition(-scores, top_k)[:top_k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.names[i], float(scores[i])) for i in top]
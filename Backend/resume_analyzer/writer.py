@@ -0,0 +1,93 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------
+# Batched background writes
+# ----------------------------------------------------------
+# The search index and the analysis history both store what a request
+# produced without making the request wait on the disk: items are queued
+# and one background thread hands them to a write function up to
+# `batch_size` at a time, so a busy server does one transaction (and one
+# fsync) per batch instead of per analysis. A partial batch is written
+# after `flush_seconds`; flush() writes everything queued so far.
+
+
+class BatchWriter:
+    """Queue drained by a background thread that calls write(batch) with up to batch_size items."""
+
+    def __init__(self, write, batch_size, flush_seconds, name, description):
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.name = name
+        self.description = description
+        self.failed = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+        # Items still queued at interpreter exit are written, not dropped
+        atexit.register(self.flush, self.flush_seconds + 5)
+
+    def put(self, item):
+        """Queues an item for the background thread."""
+        self._ensure_thread()
+        self._queue.put(item)
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=None):
+        """Waits until every item queued so far is written. Returns False on timeout."""
+        if self._thread is None:
+            return True
+        # A thread that did not survive a fork must be replaced, or nothing would set the event
+        self._ensure_thread()
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _ensure_thread(self):
+        # Started on first use, so a server that forks after creating the
+        # writer gets a thread in each worker.
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch, waiters = [], []
+            deadline = time.monotonic() + self.flush_seconds
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                # Flush requests and full batches are written right away
+                if waiters or len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            try:
+                if batch:
+                    self.write(batch)
+            except Exception as e:
+                # Any failure (a locked database, a row that cannot be stored)
+                # drops this batch only: the thread keeps draining the queue
+                self.failed += len(batch)
+                logger.exception("Could not write %d %s: %s", len(batch), self.description, e)
+            finally:
+                for waiter in waiters:
+                    waiter.set()
@@ -0,0 +1,509 @@
+"""
+Tests for the Flask API endpoints.
+Run with: python -m pytest test_api.py
+"""
+
+import io
+import json
+import os
+
+os.environ.setdefault("RESUME_NLP_WARMUP", "lazy")
+os.environ.setdefault("RESUME_ANALYSIS_WORKERS", "0")
+
+import app as backend
+from benchmarks.corpus import make_docx_bytes, make_resume_text
+
+
+def post_resume(client, data, filename="resume.docx"):
+    return client.post(
+        "/api/analyze-resume",
+        data={"resumeFile": (io.BytesIO(data), filename)},
+        content_type="multipart/form-data",
+    )
+
+
+def test_health_reports_liveness_and_readiness():
+    """/api/health is always 200; readiness is reported separately."""
+    client = backend.app.test_client()
+    health = client.get("/api/health")
+    assert health.status_code == 200
+    assert "ready" in health.get_json()
+    ready = client.get("/api/health/ready")
+    assert ready.status_code in (200, 503)
+
+
+def test_repeated_upload_is_served_from_cache():
+    """The same bytes analyzed twice hit the result cache the second time."""
+    backend.result_cache.clear()
+    client = backend.app.test_client()
+    data = make_docx_bytes(make_resume_text(7))
+
+    first = post_resume(client, data)
+    second = post_resume(client, data, filename="renamed.docx")
+    assert first.status_code == second.status_code == 200
+    assert first.get_json()["cached"] is False
+    assert second.get_json()["cached"] is True
+    assert second.get_json()["atsScore"] == first.get_json()["atsScore"]
+    assert backend.result_cache.stats()["hits"] >= 1
+
+
+def test_result_cache_lru_ttl_and_disk_tier(tmp_path):
+    """Entries are evicted by size and age, and shared through SQLite."""
+    from resume_analyzer.cache import ResultCache
+
+    cache = ResultCache(max_entries=2, ttl_seconds=60)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"atsScore": 1})
+    assert cache.get("a") is None
+    assert cache.get("c") == {"atsScore": 1}
+    assert cache.stats()["evictions"] == 1
+
+    expired = ResultCache(ttl_seconds=0)
+    expired.set("a", {"atsScore": 1})
+    assert expired.get("a") is None
+
+    db_path = str(tmp_path / "cache.sqlite")
+    ResultCache(db_path=db_path).set("k", {"atsScore": 5})
+    other_worker = ResultCache(db_path=db_path)
+    assert other_worker.get("k") == {"atsScore": 5}
+    assert other_worker.stats()["diskHits"] == 1
+
+
+def test_result_cache_disk_size_is_kept_without_counting(tmp_path):
+    """The SQLite tier's size follows overwrites and evictions from every worker; older files are counted once."""
+    import sqlite3
+
+    from resume_analyzer.cache import ResultCache
+
+    db_path = str(tmp_path / "cache.sqlite")
+    first, second = ResultCache(db_path=db_path, db_max_entries=3), ResultCache(db_path=db_path, db_max_entries=3)
+    for key in "abab":
+        first.set(key, {"atsScore": 1})
+    assert first.stats()["diskSize"] == 2
+    for key in "cd":
+        second.set(key, {"atsScore": 1})
+    assert first.stats()["diskSize"] == 3 and second.stats()["evictions"] == 1
+
+    db = sqlite3.connect(db_path)
+    with db:
+        db.execute("DROP TABLE result_count")
+        db.execute("DROP TRIGGER results_added")
+        db.execute("DROP TRIGGER results_removed")
+    db.close()
+    assert ResultCache(db_path=db_path).stats()["diskSize"] == 3
+
+
+def test_result_cache_opens_its_own_connection_after_fork(tmp_path):
+    """A forked worker does not reuse the SQLite connection of the process it was forked from."""
+    from resume_analyzer.cache import ResultCache
+
+    cache = ResultCache(db_path=str(tmp_path / "cache.sqlite"))
+    cache.set("parent", {"atsScore": 1})
+    parent_db = cache._db()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            cache.set("child", {"atsScore": 2})
+            os._exit(0 if cache._db() is not parent_db and cache.get("parent") else 1)
+        finally:
+            os._exit(1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert cache._db() is parent_db
+    assert ResultCache(db_path=str(tmp_path / "cache.sqlite")).get("child") == {"atsScore": 2}
+
+
+def test_concurrent_same_name_uploads_get_their_own_results():
+    """Uploads are analyzed in memory, so identical filenames cannot collide."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from resume_analyzer.nlp_processor import process_resume_file
+
+    documents = [make_docx_bytes(make_resume_text(seed, keyword_coverage=seed / 10)) for seed in range(1, 9)]
+    expected = [process_resume_file(data, filename="resume.docx")["atsScore"] for data in documents]
+
+    def upload(data):
+        return post_resume(backend.app.test_client(), data).get_json()["atsScore"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(upload, documents)) == expected
+
+
+def test_batch_endpoint_streams_json_lines():
+    """/api/analyze-batch returns one JSON line per file plus a summary."""
+    import zipfile
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.docx", make_docx_bytes(make_resume_text(1)))
+        zf.writestr("b.docx", make_docx_bytes(make_resume_text(2)))
+    client = backend.app.test_client()
+    response = client.post(
+        "/api/analyze-batch",
+        data={"resumeFiles": [
+            (io.BytesIO(make_docx_bytes(make_resume_text(3))), "c.docx"),
+            (io.BytesIO(archive.getvalue()), "more.zip"),
+        ]},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert sorted(line["file"] for line in lines[:-1]) == ["a.docx", "b.docx", "c.docx"]
+    assert lines[-1]["summary"]["processed"] == 3
+
+
+def test_scheduler_client_is_configurable(monkeypatch):
+    """Clients are told apart by a trusted proxy's X-Forwarded-For or an API key header; batches apart from single analyses."""
+    monkeypatch.setattr(backend, "PROXY_HOPS", 1)
+    monkeypatch.setattr(backend, "CLIENT_HEADER", "X-API-Key")
+    assert backend.forwarded_address("10.0.0.1", "6.6.6.6, 203.0.113.7") == "203.0.113.7"
+    assert backend.forwarded_address("10.0.0.1", None) == "10.0.0.1"
+    monkeypatch.setattr(backend, "PROXY_HOPS", 2)
+    assert backend.forwarded_address("10.0.0.1", "6.6.6.6, 203.0.113.7") == "6.6.6.6"
+    assert backend.forwarded_address("10.0.0.1", "203.0.113.7") == "10.0.0.1"
+
+    with backend.app.test_request_context(headers={"X-API-Key": "team-a"}):
+        assert backend.client_id() == "key:team-a"
+    with backend.app.test_request_context(environ_base={"REMOTE_ADDR": "10.0.0.2"}):
+        assert backend.client_id() == "10.0.0.2"
+
+    clients = []
+
+    def fake_batch(inputs, client=None, **kwargs):
+        clients.append(client)
+        return iter(())
+
+    monkeypatch.setattr(backend, "iter_batch_results", fake_batch)
+    response = backend.app.test_client().post(
+        "/api/analyze-batch", data={"resumeFiles": (io.BytesIO(b"%PDF"), "a.pdf")},
+        headers={"X-API-Key": "team-a"}, content_type="multipart/form-data")
+    assert response.status_code == 200 and response.get_data()
+    assert clients == ["key:team-a/batch"]
+
+
+def test_async_analysis_reports_progress_and_result(monkeypatch):
+    """?async=1 returns a job id; the SSE stream ends with the same result the job holds."""
+    import threading
+
+    # Hold the inline job back briefly so the event stream sees it in progress
+    release = threading.Event()
+    threading.Timer(0.3, release.set).start()
+    analyze = backend.process_resume_file
+
+    def delayed_analysis(*args, **kwargs):
+        release.wait(5)
+        return analyze(*args, **kwargs)
+
+    monkeypatch.setattr(backend, "process_resume_file", delayed_analysis)
+    backend.result_cache.clear()
+    client = backend.app.test_client()
+    response = client.post(
+        "/api/analyze-resume?async=1",
+        data={"resumeFile": (io.BytesIO(make_docx_bytes(make_resume_text(11))), "resume.docx")},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 202
+    job_id = response.get_json()["jobId"]
+    assert response.headers["Location"] == f"/api/jobs/{job_id}"
+
+    events = client.get(f"/api/jobs/{job_id}/events").get_data(as_text=True)
+    names = [line.split(": ", 1)[1] for line in events.splitlines() if line.startswith("event: ")]
+    assert names[-1] == "done"
+    assert "progress" in names
+
+    job = client.get(f"/api/jobs/{job_id}").get_json()
+    assert job["status"] == "done"
+    assert job["result"]["atsScore"] > 0
+    final = json.loads(events.strip().splitlines()[-1][len("data: "):])
+    assert final["result"] == job["result"]
+    assert client.get("/api/jobs/unknown").status_code == 404
+
+
+def test_async_analysis_in_a_pool_worker(monkeypatch):
+    """With a process pool, an async job runs in a worker with the requested role."""
+    from resume_analyzer.executor import AnalysisPool
+
+    pool = AnalysisPool(workers=1, queue_size=2, initializer=None)
+    monkeypatch.setattr(backend, "get_analysis_pool", lambda: pool)
+    backend.result_cache.clear()
+    client = backend.app.test_client()
+    try:
+        response = client.post(
+            "/api/analyze-resume?async=1&role=frontend",
+            data={"resumeFile": (io.BytesIO(make_docx_bytes(make_resume_text(12))), "resume.docx")},
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 202
+        events = client.get(f"/api/jobs/{response.get_json()['jobId']}/events").get_data(as_text=True)
+    finally:
+        pool.shutdown()
+    final = json.loads(events.strip().splitlines()[-1][len("data: "):])
+    assert final["status"] == "done", final.get("error")
+    assert final["result"]["jobRole"] == "frontend" and final["result"]["atsScore"] > 0
+
+
+def test_inline_async_jobs_are_bounded(monkeypatch):
+    """Without a pool, async analyses beyond the limit get 503 + Retry-After instead of a thread each."""
+    import threading
+
+    release = threading.Event()
+    analyze = backend.process_resume_file
+
+    def held_analysis(*args, **kwargs):
+        release.wait(5)
+        return analyze(*args, **kwargs)
+
+    monkeypatch.setattr(backend, "process_resume_file", held_analysis)
+    monkeypatch.setattr(backend, "_inline_jobs", threading.BoundedSemaphore(1))
+    backend.result_cache.clear()
+    client = backend.app.test_client()
+
+    def post_async(seed):
+        return client.post(
+            "/api/analyze-resume?async=1",
+            data={"resumeFile": (io.BytesIO(make_docx_bytes(make_resume_text(seed))), "resume.docx")},
+            content_type="multipart/form-data",
+        )
+
+    try:
+        first = post_async(21)
+        rejected = post_async(22)
+    finally:
+        release.set()
+    assert first.status_code == 202
+    assert rejected.status_code == 503 and int(rejected.headers["Retry-After"]) >= 1
+    # Let the job's thread release its slot before the patches are undone
+    for thread in threading.enumerate():
+        if thread.name == f"analysis-job-{first.get_json()['jobId']}":
+            thread.join(10)
+    assert client.get(first.get_json()["statusUrl"]).get_json()["status"] == "done"
+
+
+def test_jobs_in_a_shared_file_are_seen_by_every_worker(tmp_path):
+    """With SQLiteJobBackend, a job created by one store is read and watched through another."""
+    import threading
+    from resume_analyzer.jobs import DONE, JobStore, SQLiteJobBackend
+
+    db_path = str(tmp_path / "jobs.sqlite")
+    creator = JobStore(backend=SQLiteJobBackend(db_path))
+    poller = JobStore(backend=SQLiteJobBackend(db_path))
+    job_id = creator.create("resume.pdf")["jobId"]
+    assert poller.get(job_id)["status"] == "queued"
+
+    threading.Timer(0.3, creator.update, (job_id,), {"status": DONE, "stage": DONE, "result": {"atsScore": 7}}).start()
+    snapshots = [job for job in poller.watch(job_id, keepalive=5) if job is not None]
+    assert snapshots[-1]["status"] == DONE and snapshots[-1]["result"] == {"atsScore": 7}
+    assert poller.stats()["jobs"] == 1
+
+
+def test_oversized_upload_is_rejected():
+    """A resume over the per-file limit gets a JSON 413; in a batch, an error record."""
+    client = backend.app.test_client()
+    too_large = b"0" * (backend.MAX_UPLOAD_BYTES + 1)
+    response = post_resume(client, too_large, filename="big.pdf")
+    assert response.status_code == 413
+    assert response.get_json()["error"] == backend.UPLOAD_TOO_LARGE_ERROR
+
+    data = make_docx_bytes(make_resume_text(3))
+    response = client.post(
+        "/api/analyze-batch",
+        data={"resumeFiles": [(io.BytesIO(too_large), "big.pdf"), (io.BytesIO(data), "ok.docx")]},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200
+    records = {record["file"]: record for record in map(json.loads, response.data.decode().splitlines())
+               if "file" in record}
+    assert backend.UPLOAD_TOO_LARGE_ERROR in records["big.pdf"]["error"]
+    assert records["ok.docx"]["status"] == "ok"
+
+
+def test_role_is_selected_per_request():
+    """'role' picks a catalog role by id or alias; unknown roles are a 400."""
+    client = backend.app.test_client()
+    roles = client.get("/api/roles").get_json()
+    assert {"developer", "data_science"} <= {role["id"] for role in roles["roles"]}
+
+    data = make_docx_bytes(make_resume_text(5))
+    default = post_resume(client, data).get_json()
+    response = client.post(
+        "/api/analyze-resume",
+        data={"resumeFile": (io.BytesIO(data), "resume.docx"), "role": "Data Scientist"},
+        content_type="multipart/form-data",
+    )
+    assert default["jobRole"] == "developer"
+    assert response.get_json()["jobRole"] == "data_science"
+    assert "parsedResume" not in default
+
+    # Scoring for another role reuses the cached parse instead of extracting again
+    extractions = backend.metrics.STAGE_SECONDS.count(stage="extract_docx")
+    other_role = client.post(
+        "/api/analyze-resume",
+        data={"resumeFile": (io.BytesIO(data), "resume.docx"), "role": "frontend"},
+        content_type="multipart/form-data",
+    ).get_json()
+    assert other_role["jobRole"] == "frontend" and other_role["cached"] is False
+    assert backend.metrics.STAGE_SECONDS.count(stage="extract_docx") == extractions
+
+    unknown = client.post(
+        "/api/analyze-resume?role=astronaut",
+        data={"resumeFile": (io.BytesIO(data), "resume.docx")},
+        content_type="multipart/form-data",
+    )
+    assert unknown.status_code == 400
+    assert "developer" in unknown.get_json()["availableRoles"]
+
+
+def test_top_roles_ranks_every_catalog_role():
+    """'topRoles' lists the best fitting roles, consistent with scoring each role alone."""
+    client = backend.app.test_client()
+    data = make_docx_bytes(make_resume_text(9))
+
+    def post(**fields):
+        return client.post(
+            "/api/analyze-resume",
+            data={"resumeFile": (io.BytesIO(data), "resume.docx"), **fields},
+            content_type="multipart/form-data",
+        )
+
+    ranked = post(topRoles="3").get_json()
+    matches = ranked["roleMatches"]
+    assert len(matches) == 3
+    assert [match["atsScore"] for match in matches] == sorted((match["atsScore"] for match in matches), reverse=True)
+    for match in matches:
+        alone = post(role=match["role"]).get_json()
+        assert alone["atsScore"] == match["atsScore"]
+        assert alone["keywordSuggestions"] == match["missingKeywords"]
+    assert "roleMatches" not in post().get_json()
+    assert post(topRoles="0").status_code == 400
+    assert post(topRoles="many").status_code == 400
+
+
+def test_job_description_adds_job_match():
+    """A 'jobDescription' adds a jobMatch and gets its own cache entry; overlong ones are a 400."""
+    client = backend.app.test_client()
+    data = make_docx_bytes(make_resume_text(7))
+
+    def post(job_description):
+        return client.post(
+            "/api/analyze-resume",
+            data={"resumeFile": (io.BytesIO(data), "resume.docx"), "jobDescription": job_description},
+            content_type="multipart/form-data",
+        )
+
+    plain = post_resume(client, data).get_json()
+    assert "jobMatch" not in plain
+    python_job = post("Python developer with Flask, Docker and SQL").get_json()
+    assert python_job["cached"] is False
+    assert set(python_job["jobMatch"]) == {"score", "matchedTerms", "missingTerms"}
+    other_job = post("Pastry chef, croissants and sourdough").get_json()
+    assert other_job["cached"] is False
+    assert other_job["jobMatch"]["score"] < python_job["jobMatch"]["score"]
+    assert post("Python developer with Flask, Docker and SQL").get_json()["cached"] is True
+
+    assert post("x" * (backend.JD_MAX_CHARS + 1)).status_code == 400
+
+
+def test_analyzed_resumes_are_searchable(tmp_path, monkeypatch):
+    """With a search index, analyses are indexed and /api/search queries them; results omit the text."""
+    client = backend.app.test_client()
+    assert client.get("/api/search?q=python").status_code == 404
+
+    monkeypatch.setattr(backend, "resume_index", backend.ResumeIndex(str(tmp_path / "index.db")))
+    backend.result_cache.clear()
+    result = post_resume(client, make_docx_bytes(make_resume_text(11))).get_json()
+    assert "parsedResume" not in result
+    assert backend.resume_index.flush(timeout=10)
+
+    found = client.get("/api/search?q=experience&minScore=1&section=skills").get_json()
+    assert found["count"] == 1 and found["results"][0]["atsScore"] == result["atsScore"]
+    assert client.get(f"/api/search?q=experience&minScore={result['atsScore'] + 1}").get_json()["count"] == 0
+    assert client.get("/api/search?limit=0").status_code == 400
+    assert client.get("/api/search?minScore=high").status_code == 400
+
+
+def test_analyses_are_recorded_in_history_and_summarized(tmp_path, monkeypatch):
+    """Computed analyses reach the history in the background; cache hits are not counted twice."""
+    client = backend.app.test_client()
+    assert client.get("/api/stats").status_code == 404
+
+    monkeypatch.setattr(backend, "analysis_history", backend.AnalysisHistory(str(tmp_path / "history.db")))
+    backend.result_cache.clear()
+    data = make_docx_bytes(make_resume_text(12))
+    result = post_resume(client, data).get_json()
+    assert post_resume(client, data).get_json()["cached"] is True
+    assert backend.analysis_history.flush(timeout=10)
+
+    stats = client.get("/api/stats?days=7").get_json()
+    assert stats["analyses"] == 1 and stats["meanScore"] == result["atsScore"]
+    role = stats["roles"][result["jobRole"]]
+    assert [k["keyword"] for k in role["missingKeywords"]] == sorted(result["keywordSuggestions"])[:10]
+    assert sum(bucket["count"] for bucket in stats["scoreDistribution"]) == 1
+    assert client.get("/api/stats?days=0").status_code == 400
+
+
+def test_profiling_is_gated_and_keeps_slowest_samples(tmp_path, monkeypatch):
+    """Profiles need the secret, cover the analyzer, and sampling keeps only the slowest."""
+    import pstats
+
+    monkeypatch.setattr(backend, "PROFILE_SECRET", "s3cret")
+    monkeypatch.setattr(backend, "PROFILE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(backend, "profile_store", backend.ProfileStore(keep=2))
+    backend.result_cache.clear()
+    client = backend.app.test_client()
+    data = make_docx_bytes(make_resume_text(13))
+
+    def post(query="", headers=None, payload=data):
+        return client.post(
+            "/api/analyze-resume" + query,
+            data={"resumeFile": (io.BytesIO(payload), "resume.docx")},
+            content_type="multipart/form-data",
+            headers=headers or {},
+        )
+
+    assert post().get_json()["cached"] is False
+    assert post("?profile=wrong").status_code == 403
+    assert post("?profile=s3cret&profileFormat=svg").status_code == 400
+    assert client.get("/api/profiles").status_code == 403
+
+    # Profiled requests bypass the cache and link a downloadable profile
+    profiled = post(headers={"X-Profile": "s3cret"}).get_json()
+    assert profiled["cached"] is False and profiled["profile"]["format"] == "pstats"
+    artifact = client.get(profiled["profile"]["url"], headers={"X-Profile": "s3cret"})
+    assert artifact.status_code == 200
+    (tmp_path / "run.pstats").write_bytes(artifact.data)
+    functions = {name for _, _, name in pstats.Stats(str(tmp_path / "run.pstats")).stats}
+    assert {"process_resume_file", "extract_docx", "parse_resume", "scan_document"} <= functions
+
+    collapsed = post("?profile=s3cret&profileFormat=collapsed").get_json()["profile"]
+    assert collapsed["format"] == "collapsed"
+
+    # Sampled analyses are not linked in the result; only the 2 slowest are kept
+    monkeypatch.setattr(backend, "PROFILE_SAMPLE_RATE", 1.0)
+    for i in range(4):
+        result = post(payload=make_docx_bytes(make_resume_text(20 + i))).get_json()
+        assert "profile" not in result
+    listing = client.get("/api/profiles?profile=s3cret").get_json()
+    sampled = [profile for profile in listing["profiles"] if profile["sampled"]]
+    assert len(sampled) == 2 and all(profile["format"] == "collapsed" for profile in sampled)
+    assert len(listing["profiles"]) == 4
+    assert client.get("/api/profiles/nope?profile=s3cret").status_code == 404
+
+
+def test_metrics_endpoint_reports_stages_and_outcomes():
+    """/api/metrics exposes per-stage latency quantiles and outcome counters."""
+    backend.result_cache.clear()
+    client = backend.app.test_client()
+    data = make_docx_bytes(make_resume_text(23))
+    assert post_resume(client, data).status_code == 200
+    assert post_resume(client, data).get_json()["cached"] is True
+
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    for stage in ("upload_read", "extract_docx", "nlp", "scoring", "serialization"):
+        assert f'resume_stage_seconds{{stage="{stage}",quantile="0.95"}}' in body
+    assert 'resume_analyses_total{file_type="docx",outcome="cached"}' in body
+    assert 'resume_request_seconds_count{endpoint="analyze_resume_endpoint",status="200"}' in body
+    assert "resume_analysis_queue_depth" not in body  # inline mode, no pool
+    assert 'resume_nlp_state{state="ready"}' in body
@@ -0,0 +1,150 @@
+"""
+Tests for the ASGI server and its streaming multipart parser.
+Run with: python -m pytest test_asgi.py
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import random
+import threading
+
+os.environ.setdefault("RESUME_NLP_WARMUP", "lazy")
+os.environ.setdefault("RESUME_ANALYSIS_WORKERS", "0")
+
+import app as backend
+import asgi
+from benchmarks.common import encode_multipart
+from benchmarks.corpus import make_docx_bytes, make_resume_text
+from resume_analyzer.multipart import MultipartError, MultipartParser, parse_boundary
+
+
+def call(method, path, body=b"", content_type=None, chunk_size=1024, headers=()):
+    """Runs one request through asgi.app with the body in chunks; returns (status, headers, JSON body)."""
+    request_headers = [(b"content-length", str(len(body)).encode()), *headers]
+    if content_type:
+        request_headers.append((b"content-type", content_type.encode()))
+    path, _, query = path.partition("?")
+    scope = {"type": "http", "method": method, "path": path, "query_string": query.encode(),
+             "headers": request_headers, "client": ("127.0.0.1", 50000)}
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    messages = [{"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi.app(scope, receive, send))
+    start, response_body = sent
+    return start["status"], dict(start["headers"]), json.loads(response_body["body"])
+
+
+def post_resume(data, filename="resume.docx", fields=None, **kwargs):
+    body, content_type = encode_multipart({"resumeFile": (filename, data)}, fields)
+    return call("POST", "/api/analyze-resume", body, content_type, **kwargs)
+
+
+def test_parser_handles_any_chunking_and_hashes_the_file():
+    """Chunks of any size, split anywhere (even inside a boundary), give the same fields, file and digest."""
+    rng = random.Random(3)
+    data = bytes(rng.randrange(256) for _ in range(50000))
+    body, content_type = encode_multipart({"resumeFile": ("cv.pdf", data)}, {"role": "data_scientist"})
+    boundary = parse_boundary(content_type)
+    for _ in range(10):
+        parser = MultipartParser(boundary)
+        offset = 0
+        while offset < len(body):
+            size = rng.choice([1, 3, 61, 1024, 8192])
+            parser.feed(body[offset:offset + size])
+            offset += size
+        parser.close()
+        part = parser.files["resumeFile"]
+        assert part.filename == "cv.pdf" and bytes(part.data) == data
+        assert part.digest == hashlib.sha256(data).hexdigest()
+        assert parser.fields == {"role": "data_scientist"}
+
+    truncated = MultipartParser(boundary)
+    truncated.feed(body[:-10])
+    try:
+        truncated.close()
+        raise AssertionError("a truncated body must be rejected")
+    except MultipartError:
+        pass
+
+
+def test_health_matches_flask_contract():
+    """/api/health has the Flask app's fields; unknown paths are JSON 404s."""
+    status, headers, body = call("GET", "/api/health")
+    flask_body = backend.app.test_client().get("/api/health").get_json()
+    assert status == 200 and set(body) == set(flask_body)
+    assert headers[b"access-control-allow-origin"] == b"*"
+    assert call("GET", "/api/nope")[0] == 404
+
+
+def test_client_is_found_like_the_flask_app(monkeypatch):
+    """The ASGI server resolves the scheduler's client with the Flask app's settings."""
+    scope = {"client": ("10.0.0.1", 50000),
+             "headers": [(b"x-forwarded-for", b"203.0.113.7"), (b"x-api-key", b"team-a")]}
+    assert asgi.client_id(scope) == "10.0.0.1"
+    monkeypatch.setattr(backend, "PROXY_HOPS", 1)
+    assert asgi.client_id(scope) == "203.0.113.7"
+    monkeypatch.setattr(backend, "CLIENT_HEADER", "X-API-Key")
+    assert asgi.client_id(scope) == "key:team-a"
+
+
+def test_analysis_matches_flask_and_uses_the_cache():
+    """The same upload gets the Flask app's result, and a cache hit the second time."""
+    backend.result_cache.clear()
+    data = make_docx_bytes(make_resume_text(11))
+    status, _, first = post_resume(data, chunk_size=257)
+    assert status == 200 and first["cached"] is False
+    status, _, second = post_resume(data)
+    assert status == 200 and second["cached"] is True
+
+    backend.result_cache.clear()
+    flask_result = backend.app.test_client().post(
+        "/api/analyze-resume", data={"resumeFile": (io.BytesIO(data), "resume.docx")},
+        content_type="multipart/form-data").get_json()
+    assert first["atsScore"] == flask_result["atsScore"]
+    assert first["keywordSuggestions"] == flask_result["keywordSuggestions"]
+
+
+def test_upload_errors():
+    """Missing file, wrong type, unknown role and oversized uploads get the Flask app's errors."""
+    status, _, body = call("POST", "/api/analyze-resume", b"x=1", "application/x-www-form-urlencoded")
+    assert status == 400 and body["error"] == backend.NO_FILE_ERROR
+    status, _, body = post_resume(b"hello", filename="resume.txt")
+    assert status == 400 and body["error"] == backend.INVALID_FILE_ERROR
+    status, _, body = post_resume(b"hello", fields={"role": "astronaut"})
+    assert status == 400 and "availableRoles" in body
+
+    too_large = b"x" * (asgi.MAX_CONTENT_LENGTH + 1)
+    status, _, body = post_resume(too_large, chunk_size=1024 * 1024)
+    assert status == 413 and body["error"] == backend.UPLOAD_TOO_LARGE_ERROR
+
+
+def test_blocking_calls_run_off_the_event_loop(monkeypatch):
+    """Cache lookups and stores and the cost estimate run on executor threads, not the loop's."""
+    backend.result_cache.clear()
+    loop_thread = threading.get_ident()
+    threads = {}
+
+    def recorded(name, function):
+        def wrapper(*args, **kwargs):
+            threads[name] = threading.get_ident()
+            return function(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(backend.result_cache, "get", recorded("get", backend.result_cache.get))
+    monkeypatch.setattr(backend.result_cache, "set", recorded("set", backend.result_cache.set))
+    monkeypatch.setattr(asgi, "estimate_cost", recorded("estimate_cost", asgi.estimate_cost))
+    status, _, _ = post_resume(make_docx_bytes(make_resume_text(12)))
+    assert status == 200
+    assert set(threads) == {"get", "set", "estimate_cost"}
+    assert loop_thread not in threads.values()
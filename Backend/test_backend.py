@@ -55,7 +55,8 @@ def test_nltk_resources():
             nltk.data.find("corpora/stopwords")
             print("✓ NLTK stopwords available")
         except LookupError:
-            print("⚠ NLTK stopwords not found, will download on first use")
+            print("⚠ NLTK stopwords not found, using bundled fallback list")
+            print("  Run: python -m resume_analyzer download")
     except Exception as e:
         print(f"✗ NLTK resource check failed: {e}")
         return False
@@ -96,6 +97,178 @@ def test_file_extraction():
     
     return True
 
+def test_nlp_stage_is_feature_gated():
+    """spaCy must not run unless an enabled feature needs it."""
+    from resume_analyzer import features
+
+    assert features.required_capabilities() == set()
+    assert features.run_nlp_stage("Developed a Flask API") is None
+    assert features._pipelines == {}
+
+    features.register_feature("entities_probe", needs=("ner",), enabled=False)
+    try:
+        assert features.required_capabilities() == set()
+        assert features.required_pipes(features.required_capabilities(["entities_probe"])) == {"ner"}
+    finally:
+        del features.ANALYSIS_FEATURES["entities_probe"]
+    return True
+
+# Keyword lists the rule engine is compared with the legacy analyzer on, besides the catalog's
+LEGACY_KEYWORD_SETS = [[], ["Git", "git", "GitHub"], ["machine learning", "C++", ""], ["σοφος"]]
+
+def test_rule_engine_matches_legacy_analyzer_on_structured_resumes():
+    """Single-pass scoring produces byte-identical output to the old per-rule scans for well-structured resumes."""
+    from benchmarks.corpus import make_corpus
+    from benchmarks.legacy import legacy_analyze_resume_text
+    from resume_analyzer.catalog import get_catalog
+    from resume_analyzer.nlp_processor import analyze_resume_text
+
+    structured = make_corpus(25) + make_corpus(3, pages=3, seed=100)
+    for keywords in [role.keywords for role in get_catalog().roles.values()] + LEGACY_KEYWORD_SETS:
+        for text in structured:
+            assert analyze_resume_text(text, keywords) == legacy_analyze_resume_text(text, keywords)
+    return True
+
+def test_section_scoping_changes_only_section_points_of_flat_text():
+    """
+    Text that merely mentions "skills" or "experience" without headings no
+    longer earns those sections' points (scoring version 4), while keyword
+    matching, which still reads the whole text, is unchanged.
+    """
+    from benchmarks.legacy import legacy_analyze_resume_text
+    from resume_analyzer.catalog import get_catalog
+    from resume_analyzer.nlp_processor import analyze_resume_text
+
+    flat = [
+        "Skills: python3, Pythonic code. Work   history at x; led 12 people; $300 saved",
+        "Technical Skills\nEMAIL me@x.io\nphone 555\n10+ years\nlogo.PNG",
+        "ΟΔΥΣΣΕΑΣ ΣΟΦΟΣ developed designed built created implemented",
+        "professional experience; work experience; 3 months; summary objective projects",
+        "nothing relevant here at all",
+    ]
+    for keywords in [role.keywords for role in get_catalog().roles.values()] + LEGACY_KEYWORD_SETS:
+        for text in flat:
+            result, legacy = analyze_resume_text(text, keywords), legacy_analyze_resume_text(text, keywords)
+            assert result["keywordSuggestions"] == legacy["keywordSuggestions"]
+            assert result["atsScore"] <= legacy["atsScore"]
+    scoped = analyze_resume_text(flat[3], ["Python"])
+    assert scoped["atsScore"] < legacy_analyze_resume_text(flat[3], ["Python"])["atsScore"]
+    assert any("'Experience'" in tip for tip in scoped["formattingTips"])
+    return True
+
+def test_section_model_scopes_rules():
+    """Text is segmented once into typed sections; rules read only theirs; the model round-trips."""
+    import json
+
+    from resume_analyzer.nlp_processor import analyze_resume_text
+    from resume_analyzer.sections import ResumeDocument, parse_resume
+
+    text = (
+        "Jane Doe\njane@example.com | 555-0100\n\n"
+        "PROFESSIONAL SUMMARY\nBackend engineer.\n\n"
+        "Skills: Python, SQL, Docker\n\n"
+        "Work History\nAcme - developed billing APIs for 2000+ users, led 4 people\n\n"
+        "Certifications\nAWS, mentioned my skills and education\n"
+    )
+    document = parse_resume(text)
+    assert [(s.kind, s.heading) for s in document.sections] == [
+        ("contact", None), ("summary", "PROFESSIONAL SUMMARY"), ("skills", "Skills"),
+        ("experience", "Work History"), ("other", "Certifications"),
+    ]
+    assert document.section_text(("skills",)).strip() == "python, sql, docker"
+    assert document.has("experience") and not document.has("education")
+
+    restored = ResumeDocument.from_dict(json.loads(json.dumps(document.as_dict())))
+    assert [(s.kind, s.start, s.end) for s in restored.sections] == [(s.kind, s.start, s.end) for s in document.sections]
+
+    tips = " ".join(analyze_resume_text(document, ["Python"])["formattingTips"])
+    assert "Education" in tips  # "education" under Certifications is not an education section
+    assert "quantifiable" not in tips and "contact information" not in tips
+
+    # "skills" in an experience bullet is not a skills section; contact details are read from the header only
+    flat = analyze_resume_text("Experience\nImproved team skills. Contact: sales@acme.com", [])
+    assert any("'Skills'" in tip for tip in flat["formattingTips"])
+    assert any("contact information" in tip for tip in flat["formattingTips"])
+    return True
+
+def test_sections_align_when_lowercasing_changes_length():
+    """Section text is cut from the original text: "İ" lowercases to two code points and must not shift it."""
+    from resume_analyzer.sections import parse_resume
+
+    document = parse_resume("İstanbul İİİİ\nSkills\nPython, SQL\nExperience\nBuilt APIs\n")
+    assert document.section_text(("skills",)).strip() == "python, sql"
+    assert document.section_text(("experience",)).strip() == "built apis"
+    assert document.section_text(("contact",)).strip() == "i̇stanbul i̇i̇i̇i̇"
+    return True
+
+def test_import_does_not_load_nlp_models():
+    """Importing the analyzer must not import nltk/spaCy or download anything."""
+    import subprocess
+    probe = (
+        "import sys; import resume_analyzer.nlp_processor; "
+        "print(any(m in sys.modules for m in ('nltk', 'spacy')))"
+    )
+    output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert output.stdout.strip() == "False"
+
+    from resume_analyzer import resources
+    resources.warm_up(background=False)
+    assert resources.is_ready()
+    assert "the" in resources.get_stopwords()
+    return True
+
+def test_pdf_extraction_streams_pages_with_limits():
+    """Page-by-page PDF text matches pdfminer's extract_text and honours the limits."""
+    import io
+    from pdfminer.high_level import extract_text
+    from benchmarks.corpus import make_pdf_bytes, make_resume_text
+    from resume_analyzer.extractors import extract_pdf
+
+    data = make_pdf_bytes(make_resume_text(5, pages=3), image_pages=(2,))
+    extraction = extract_pdf(io.BytesIO(data))
+    assert extraction.text == extract_text(io.BytesIO(data))
+    assert extraction.image_only_pages == [2] and not extraction.truncated
+
+    limited = extract_pdf(io.BytesIO(data), max_pages=2)
+    assert limited.pages == 2 and limited.truncated
+    assert len(extract_pdf(io.BytesIO(data), max_chars=500).text) == 500
+
+    # A scanned document stops after the leading image-only pages
+    scanned = extract_pdf(io.BytesIO(make_pdf_bytes("", image_pages=(1, 2, 3, 4))), image_only_cutoff=2)
+    assert scanned.pages == 2 and not scanned.text.strip()
+    return True
+
+def test_docx_streaming_extraction_reads_each_cell_once():
+    """Streamed DOCX text keeps document order and emits merged cells once."""
+    import io
+    from docx import Document
+    from resume_analyzer.extractors import extract_docx, extract_docx_python_docx
+
+    document = Document()
+    document.add_paragraph("Jane Doe")
+    table = document.add_table(rows=3, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 2)).text = "Senior Python Developer"
+    table.cell(1, 0).merge(table.cell(2, 0)).text = "Acme"
+    table.cell(1, 1).text = "Built REST APIs"
+    table.cell(1, 2).text = "2020"
+    table.cell(2, 1).text = "Led a team\tof 4"
+    table.cell(2, 2).text = "2021"
+    document.add_paragraph("Education")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    text = extract_docx(io.BytesIO(buffer.getvalue()))
+    assert text.split("\n") == [
+        "Jane Doe", "Senior Python Developer", "Acme", "Built REST APIs", "2020",
+        "Led a team\tof 4", "2021", "Education",
+    ]
+    # python-docx repeats merged cells once per grid column they span
+    legacy = extract_docx_python_docx(io.BytesIO(buffer.getvalue()))
+    assert legacy.count("Senior Python Developer") == 3 and legacy.count("Acme") == 2
+    assert sorted(set(legacy.split("\n"))) == sorted(set(text.split("\n")))
+    return True
+
 def main():
     print("=" * 60)
     print("Backend Resume Analyzer - Test Suite")
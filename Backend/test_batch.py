@@ -0,0 +1,217 @@
+"""
+Tests for batch analysis (resume_analyzer.batch and the batch CLI).
+Run with: python -m pytest test_batch.py
+"""
+
+import io
+import json
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.corpus import make_docx_bytes, make_resume_text
+from resume_analyzer.__main__ import main
+from resume_analyzer.batch import iter_batch_results, iter_zip, load_completed, run_batch
+from resume_analyzer.dedupe import DuplicateIndex
+from resume_analyzer.search import ResumeIndex
+
+
+def write_resumes(directory, count):
+    for seed in range(count):
+        (directory / f"resume_{seed}.docx").write_bytes(make_docx_bytes(make_resume_text(seed)))
+    (directory / "notes.txt").write_text("not a resume")
+
+
+def edited_copy(seed):
+    """A DOCX resume with one line changed: a near duplicate of resume `seed`."""
+    lines = make_resume_text(seed).splitlines()
+    lines[3] = "Volunteer mentor at a local coding club"
+    return make_docx_bytes("\n".join(lines))
+
+
+def test_batch_writes_jsonl_and_resumes(tmp_path):
+    """Every resume gets one JSON line; a rerun skips files already recorded."""
+    source = tmp_path / "resumes"
+    source.mkdir()
+    write_resumes(source, 4)
+    output = tmp_path / "results.jsonl"
+
+    summary = run_batch(str(source), str(output))
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert summary["processed"] == 4 and summary["errors"] == 0
+    assert sorted(r["file"] for r in records) == [f"resume_{i}.docx" for i in range(4)]
+    assert all(r["result"]["atsScore"] > 0 for r in records)
+    assert set(summary["latencyMs"]) == {"p50", "p95", "p99"}
+
+    # Simulate a crash mid-write, then add a new file and resume
+    with open(output, "a") as fh:
+        fh.write('{"file": "resume_9.do')
+    write_resumes(source, 5)
+    assert len(load_completed(str(output))) == 4
+    summary = run_batch(str(source), str(output))
+    assert summary["processed"] == 1 and summary["skipped"] == 4
+    assert len(output.read_text().splitlines()) == 5
+
+
+def test_batch_cli_reads_zip_through_pool(tmp_path):
+    """The CLI accepts a zip archive and analyzes it in worker processes."""
+    archive = tmp_path / "resumes.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for seed in range(3):
+            zf.writestr(f"batch/resume_{seed}.docx", make_docx_bytes(make_resume_text(seed)))
+    output = tmp_path / "out.jsonl"
+
+    assert main(["batch", str(archive), "-o", str(output), "--workers", "1"]) == 0
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(records) == 3
+    assert all(r["status"] == "ok" for r in records)
+
+
+def test_zip_members_are_checked_before_decompressing():
+    """Oversized members get an error record; archives with too many members or bytes are rejected."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("ok.docx", make_docx_bytes(make_resume_text(1)))
+        zf.writestr("bomb.pdf", b"\0" * (2 * 1024 * 1024))
+    records = {r["file"]: r for r in iter_batch_results(iter_zip(buffer, max_file_bytes=1024 * 1024))}
+    assert records["ok.docx"]["status"] == "ok"
+    assert records["bomb.pdf"]["status"] == "error" and "maximum" in records["bomb.pdf"]["error"]
+
+    with pytest.raises(ValueError):
+        iter_zip(buffer, max_members=1)
+    with pytest.raises(ValueError):
+        iter_zip(buffer, max_total_bytes=1024)
+
+
+class HeldPool:
+    """Pool stand-in running jobs on threads; 'slow.docx' waits until released, then fails if `fail_slow`."""
+    workers, queue_size = 2, 2
+
+    def __init__(self, fail_slow=False):
+        self.executor = ThreadPoolExecutor(2)
+        self.release = threading.Event()
+        self.fail_slow = fail_slow
+
+    def submit(self, func, *args, cost=None, client=None):
+        def run():
+            if args[1] == "slow.docx":
+                self.release.wait(30)
+                if self.fail_slow:
+                    raise RuntimeError("worker died")
+            return func(*args)
+        return self.executor.submit(run)
+
+
+def test_batch_yields_records_in_completion_order():
+    """A slow file does not hold back the records of files that finished after it started."""
+    data = make_docx_bytes(make_resume_text(2))
+    pool = HeldPool()
+    records = iter_batch_results([("slow.docx", lambda: data), ("fast.docx", lambda: data)], pool=pool)
+    assert next(records)["file"] == "fast.docx"
+    pool.release.set()
+    assert next(records)["file"] == "slow.docx"
+    pool.executor.shutdown()
+
+
+def test_batch_job_description_idf_and_index(tmp_path):
+    """The idf command builds a table; a batch ranks resumes against a job description and indexes them."""
+    source = tmp_path / "resumes"
+    source.mkdir()
+    write_resumes(source, 3)
+    idf_path = tmp_path / "idf.json"
+    assert main(["idf", str(source), "-o", str(idf_path)]) == 0
+    assert json.loads(idf_path.read_text())["documents"] == 3
+
+    index = ResumeIndex(str(tmp_path / "index.db"))
+    summary = run_batch(str(source), str(tmp_path / "results.jsonl"),
+                        job_description="Python developer with Docker and SQL", index=index)
+    matches = summary["topMatches"]
+    assert sorted(m["file"] for m in matches) == [f"resume_{i}.docx" for i in range(3)]
+    assert [m["score"] for m in matches] == sorted((m["score"] for m in matches), reverse=True)
+    assert index.stats()["documents"] == 3
+    assert main(["search", str(tmp_path / "index.db"), "experience", "--min-score", "1"]) == 0
+
+
+def test_batch_dedupe_analyzes_one_resume_per_group(tmp_path):
+    """Near-duplicate files are reported against the first of their group instead of being analyzed."""
+    source = tmp_path / "resumes"
+    source.mkdir()
+    write_resumes(source, 2)
+    (source / "resume_0_copy.docx").write_bytes(edited_copy(0))
+    output = tmp_path / "results.jsonl"
+
+    assert main(["batch", str(source), "-o", str(output), "--workers", "0", "--dedupe"]) == 0
+    records = {r["file"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert records["resume_0.docx"]["status"] == records["resume_1.docx"]["status"] == "ok"
+    duplicate = records["resume_0_copy.docx"]
+    assert duplicate["status"] == "duplicate" and duplicate["duplicateOf"] == "resume_0.docx"
+    assert duplicate["similarity"] > 0.9 and "result" not in duplicate
+
+
+def test_duplicates_wait_for_their_representative():
+    """A duplicate is reported after its representative succeeds, and analyzed itself if it fails."""
+    original, copy = make_docx_bytes(make_resume_text(0)), edited_copy(0)
+    for fail_slow, expected in ((False, [("slow.docx", "ok"), ("copy.docx", "duplicate")]),
+                                (True, [("slow.docx", "error"), ("copy.docx", "ok")])):
+        pool = HeldPool(fail_slow)
+        records = iter_batch_results([("slow.docx", lambda: original), ("copy.docx", lambda: copy)],
+                                     pool=pool, dedupe=DuplicateIndex())
+        threading.Timer(0.2, pool.release.set).start()
+        assert [(r["file"], r["status"]) for r in records] == expected
+        pool.executor.shutdown()
+
+
+def test_pool_fingerprints_files_in_its_workers(monkeypatch):
+    """With a pool, files are fingerprinted by pool jobs, not the calling thread, and grouped in input order."""
+    from resume_analyzer import batch
+
+    threads = []
+    fingerprint_text = batch.fingerprint_text
+
+    def recorded_fingerprint_text(data, filename):
+        threads.append(threading.current_thread())
+        return fingerprint_text(data, filename)
+
+    monkeypatch.setattr(batch, "fingerprint_text", recorded_fingerprint_text)
+    executor, release, jobs = ThreadPoolExecutor(2), threading.Event(), []
+
+    class FingerprintPool:
+        """Pool stand-in whose fingerprint of 'original.docx' finishes after that of its copy."""
+        workers, queue_size = 2, 2
+
+        def submit(self, func, *args, cost=None, client=None):
+            name = args[0] if func is batch.fingerprint else args[1]
+            jobs.append((func.__name__, name))
+
+            def run():
+                if func is batch.fingerprint and name == "original.docx":
+                    release.wait(30)
+                return func(*args)
+            return executor.submit(run)
+
+    original, copy = make_docx_bytes(make_resume_text(0)), edited_copy(0)
+    records = iter_batch_results([("original.docx", lambda: original), ("copy.docx", lambda: copy)],
+                                 pool=FingerprintPool(), dedupe=DuplicateIndex())
+    threading.Timer(0.2, release.set).start()
+    assert [(r["file"], r["status"], r.get("duplicateOf")) for r in records] == [
+        ("original.docx", "ok", None), ("copy.docx", "duplicate", "original.docx")]
+    executor.shutdown()
+    assert jobs == [("fingerprint", "original.docx"), ("fingerprint", "copy.docx"),
+                    ("analyze_batch_item", "original.docx")]
+    assert len(threads) == 2 and threading.current_thread() not in threads
+
+
+def test_resumed_dedupe_groups_new_files_with_analyzed_ones(tmp_path):
+    """A resumed run still reports near duplicates of files the earlier run analyzed."""
+    source = tmp_path / "resumes"
+    source.mkdir()
+    write_resumes(source, 2)
+    output = tmp_path / "results.jsonl"
+    run_batch(str(source), str(output), dedupe=DuplicateIndex())
+
+    (source / "resume_0_copy.docx").write_bytes(edited_copy(0))
+    summary = run_batch(str(source), str(output), dedupe=DuplicateIndex())
+    assert summary["skipped"] == 2 and summary["duplicates"] == 1
+    assert json.loads(output.read_text().splitlines()[-1])["duplicateOf"] == "resume_0.docx"
@@ -0,0 +1,38 @@
+"""
+Tests for the synthetic corpus generator and the benchmark regression gate.
+Run with: python -m pytest test_benchmarks.py
+"""
+
+from benchmarks.corpus import lines_to_text, make_resume_file, make_resume_lines
+from benchmarks.run import compare
+from resume_analyzer.nlp_processor import extract_text_from_file
+
+
+def test_generator_is_deterministic_and_controls_shape():
+    """Same seed and shape give the same resume; layout and tables follow the arguments."""
+    lines = make_resume_lines(4, pages=2, sections=("experience", "skills"), table_density=1.0)
+    assert lines == make_resume_lines(4, pages=2, sections=("experience", "skills"), table_density=1.0)
+    text = lines_to_text(lines)
+    assert text.index("Professional Experience") < text.index("Technical Skills")
+    assert "Education" not in text
+    experience = lines[lines.index("Professional Experience") + 1:lines.index("Technical Skills")]
+    assert all(isinstance(line, tuple) for line in experience if line)
+    assert not any(isinstance(line, tuple) for line in make_resume_lines(4, pages=2))
+
+    assert make_resume_file(4, "pdf", table_density=0.5) == make_resume_file(4, "pdf", table_density=0.5)
+    for file_type in ("pdf", "docx"):
+        extracted = extract_text_from_file(make_resume_file(4, file_type, table_density=1.0), f"r.{file_type}")
+        assert "Professional Experience" in extracted
+
+
+def test_regression_gate_compares_against_baseline():
+    """Only stages slower than the threshold are reported as regressions."""
+    baseline = {"pdf-1p/extract": {"bestMeanMs": 10.0}, "pdf-1p/analyze": {"bestMeanMs": 1.0}}
+    results = {
+        "pdf-1p/extract": {"bestMeanMs": 13.0},
+        "pdf-1p/analyze": {"bestMeanMs": 1.1},
+        "pdf-1p/process": {"bestMeanMs": 50.0},
+    }
+    rows, regressions = compare(results, baseline, threshold=25)
+    assert regressions == ["pdf-1p/extract"]
+    assert [row[0] for row in rows] == ["pdf-1p/extract", "pdf-1p/analyze"]
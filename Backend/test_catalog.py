@@ -0,0 +1,121 @@
+"""
+Tests for the job role keyword catalog.
+Run with: python -m pytest test_catalog.py
+"""
+
+import json
+import os
+
+import pytest
+
+from resume_analyzer import catalog
+from resume_analyzer.catalog import RoleCatalog, UnknownRole, load_catalog_file
+
+SAMPLE = {
+    "defaultRole": "backend",
+    "synonyms": {"PostgreSQL": ["Postgres"], "JavaScript": ["JS"]},
+    "roles": {
+        "backend": {
+            "title": "Backend Developer",
+            "aliases": ["back-end developer", "Server Engineer"],
+            "keywords": ["SQL", "PostgreSQL", "JavaScript", "Machine Learning", "CI/CD",
+                         {"name": "Go", "synonyms": ["Golang"], "match": "word"}],
+        },
+        "frontend": {"keywords": ["React"]},
+    },
+}
+
+
+def test_keywords_synonyms_and_phrases():
+    """Keywords match inside tokens, synonyms and 'word' keywords only as whole tokens."""
+    index = RoleCatalog(SAMPLE)
+    role = index.resolve()
+    assert role.id == "backend"
+
+    text = "Used MySQL and postgres daily; some JSON; machine\nlearning; ci/cd; golang; Going"
+    assert index.match_role(role, text.lower()) == ["SQL", "PostgreSQL", "Machine Learning", "CI/CD", "Go"]
+    # "JS" is a whole-word synonym, so "JSON" does not count; "Going" is not "Go"
+    assert index.match_role(role, "json going") == []
+    assert index.match_role(role, "node js, go") == ["JavaScript", "Go"]
+
+
+def test_role_aliases_and_unknown_roles():
+    """Roles resolve by id or alias, case- and spacing-insensitively."""
+    index = RoleCatalog(SAMPLE)
+    assert index.resolve("server   engineer").id == "backend"
+    assert index.resolve("FRONTEND").id == "frontend"
+    with pytest.raises(UnknownRole) as error:
+        index.resolve("astronaut")
+    assert error.value.available == ["backend", "frontend"]
+
+
+def test_role_matrix_ranks_every_role_at_once():
+    """Matched keyword counts of all roles agree with matching each role, and rank_roles orders by score."""
+    from benchmarks.bench_catalog import make_catalog
+    from benchmarks.corpus import make_corpus
+    from resume_analyzer.nlp_processor import final_score, keyword_points, rank_roles
+
+    index = make_catalog(40, 30)
+    matrix = index.role_matrix()
+    assert index.role_matrix() is matrix
+    for text in make_corpus(5):
+        found = index.match(text.lower())
+        expected = [len(role.matched_keywords(found)) for role in index.roles.values()]
+        assert list(matrix.matched_counts(found)) == expected
+
+    sample = RoleCatalog(SAMPLE)
+    found = sample.match("react, golang and mysql")
+    assert list(sample.role_matrix().matched_counts(found)) == [2, 1]
+    assert list(sample.role_matrix().matched_counts(set())) == [0, 0]
+    backend, frontend = rank_roles(sample, found, 50, top=2)
+    assert backend == {"role": "backend", "title": "Backend Developer", "atsScore": 50 + keyword_points(2, 6),
+                       "matchedKeywords": ["SQL", "Go"],
+                       "missingKeywords": ["PostgreSQL", "JavaScript", "Machine Learning", "CI/CD"]}
+    # Normalized like an analysis: 58 points are an ATS score of 57
+    assert frontend["atsScore"] == final_score(58) == 57 and frontend["missingKeywords"] == []
+    assert [match["role"] for match in rank_roles(sample, found, 50, top=1)] == ["backend"]
+
+
+def test_role_matches_score_like_an_analysis_with_that_role():
+    """Each roleMatches score is the atsScore that analyzing the same resume with that role returns."""
+    from benchmarks.corpus import make_resume_text
+    from resume_analyzer.nlp_processor import process_resume_file
+    from resume_analyzer.sections import parse_resume
+
+    roles = len(catalog.get_catalog().roles)
+    # Varied coverage and sections reach raw scores (29, 57, 58) that normalization rounds down
+    for coverage in (0.2, 0.4, 0.6, 1.0):
+        for sections in (("experience",), ("summary", "experience"), ("skills", "experience", "education")):
+            document = parse_resume(make_resume_text(0, keyword_coverage=coverage, sections=sections))
+            ranked = process_resume_file(document, top_roles=roles)
+            assert len(ranked["roleMatches"]) == roles
+            for match in ranked["roleMatches"]:
+                assert match["atsScore"] == process_resume_file(document, role=match["role"])["atsScore"]
+
+
+def test_catalog_hot_reload_and_yaml(tmp_path, monkeypatch):
+    """Edits to the catalog file are picked up without a restart; bad edits are ignored."""
+    path = tmp_path / "roles.json"
+    path.write_text(json.dumps(SAMPLE))
+    monkeypatch.setattr(catalog, "CATALOG_PATH", str(path))
+    monkeypatch.setattr(catalog, "CATALOG_CHECK_SECONDS", 0)
+    monkeypatch.setattr(catalog, "_catalog", None)
+    monkeypatch.setattr(catalog, "_catalog_stamp", None)
+
+    first = catalog.get_catalog()
+    assert first.resolve().id == "backend"
+
+    SAMPLE_2 = dict(SAMPLE, defaultRole="frontend")
+    path.write_text(json.dumps(SAMPLE_2))
+    os.utime(path, ns=(1, 1))
+    second = catalog.get_catalog()
+    assert second.resolve().id == "frontend" and second.version != first.version
+
+    path.write_text("{not json")
+    os.utime(path, ns=(2, 2))
+    assert catalog.get_catalog() is second
+
+    yaml = pytest.importorskip("yaml")
+    yaml_path = tmp_path / "roles.yaml"
+    yaml_path.write_text(yaml.safe_dump(SAMPLE))
+    assert load_catalog_file(str(yaml_path)).resolve("back-end developer").id == "backend"
@@ -0,0 +1,42 @@
+"""
+Tests for near-duplicate detection (resume_analyzer.dedupe).
+Run with: python -m pytest test_dedupe.py
+"""
+
+from benchmarks.corpus import make_docx_bytes, make_pdf_bytes, make_resume_text
+from resume_analyzer.dedupe import DuplicateIndex, fingerprint_text, minhash, similarity
+
+
+def edited(text, line=3):
+    lines = text.splitlines()
+    lines[line] = "Volunteer mentor at a local coding club"
+    return "\n".join(lines)
+
+
+def test_signatures_group_near_duplicates_only():
+    """An edited copy matches its original in either format; a different resume does not."""
+    original, other = make_resume_text(1), make_resume_text(2)
+    assert similarity(minhash(original), minhash(edited(original))) > 0.9
+    assert similarity(minhash(original), minhash(other)) < 0.5
+    assert minhash("") is None
+
+    # The fast PDF pass yields the same words as the text that was rendered
+    pdf_text = fingerprint_text(make_pdf_bytes(original), "resume.pdf")
+    docx_text = fingerprint_text(make_docx_bytes(edited(original)), "resume.docx")
+    assert similarity(minhash(pdf_text), minhash(original)) == 1.0
+    assert fingerprint_text(b"not a pdf", "broken.pdf") is None
+
+    index = DuplicateIndex(threshold=0.8)
+    assert index.match("a.pdf", minhash(pdf_text)) is None
+    assert index.match("b.pdf", minhash(other)) is None
+    representative, score = index.match("a-copy.docx", minhash(docx_text))
+    assert representative == "a.pdf" and score > 0.9
+    assert index.match("unreadable.pdf", None) is None
+    assert len(index) == 2 and index.duplicates == 1
+
+    # A removed representative is matched no more; an added one is, without being matched itself
+    index.remove("a.pdf")
+    assert index.match("a-copy-2.docx", minhash(docx_text)) is None
+    index.add("a.pdf", minhash(pdf_text))
+    assert index.match("a-copy-3.docx", minhash(docx_text))[0] in ("a.pdf", "a-copy-2.docx")
+    assert len(index) == 3
@@ -0,0 +1,73 @@
+"""
+Tests for the process-pool analysis executor.
+Run with: python -m pytest test_executor.py
+"""
+
+import time
+
+import pytest
+
+from benchmarks.corpus import make_docx_bytes, make_resume_text
+from resume_analyzer import metrics
+from resume_analyzer.executor import AnalysisPool, JobTimeout, QueueFull
+from resume_analyzer.nlp_processor import process_resume_file
+
+
+def test_pool_runs_analysis_in_worker_process():
+    """Results from a worker match an inline analysis."""
+    data = make_docx_bytes(make_resume_text(3))
+    pool = AnalysisPool(workers=1, queue_size=2, initializer=None)
+    try:
+        assert pool.run(process_resume_file, data, "resume.docx") == process_resume_file(data, "resume.docx")
+        assert pool.stats()["completed"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_pool_relays_progress_from_worker():
+    """Stages reported inside the worker reach the parent's callback in order."""
+    data = make_docx_bytes(make_resume_text(4))
+    stages = []
+    pool = AnalysisPool(workers=1, queue_size=2, initializer=None)
+    try:
+        result = pool.submit(process_resume_file, data, "resume.docx", progress=stages.append).result()
+        assert stages == ["extracting", "scoring"]
+        assert result["atsScore"] > 0
+    finally:
+        pool.shutdown()
+
+
+def test_pool_forwards_worker_stage_metrics():
+    """Stage spans recorded in a worker process are counted in the parent."""
+    data = make_docx_bytes(make_resume_text(5))
+    before = {stage: metrics.STAGE_SECONDS.count(stage=stage) for stage in ("extract_docx", "nlp", "scoring")}
+    pool = AnalysisPool(workers=1, queue_size=2, initializer=None)
+    try:
+        pool.run(process_resume_file, data, "resume.docx")
+    finally:
+        pool.shutdown()
+    for stage, count in before.items():
+        assert metrics.STAGE_SECONDS.count(stage=stage) == count + 1
+
+
+def test_pool_kills_runaway_jobs_and_rejects_when_full():
+    """A job over its timeout is stopped; a full queue raises QueueFull."""
+    pool = AnalysisPool(workers=1, queue_size=1, timeout=0.5, initializer=None)
+    try:
+        with pytest.raises(JobTimeout):
+            pool.run(time.sleep, 10)
+
+        accepted = []
+        with pytest.raises(QueueFull) as excinfo:
+            for _ in range(5):
+                accepted.append(pool.submit(time.sleep, 0.3))
+        assert excinfo.value.retry_after >= 1
+        assert pool.stats()["rejected"] == 1
+        for future in accepted:
+            future.result()
+
+        # The killed worker was replaced and still serves jobs
+        assert pool.run(len, "abc") == 3
+        assert pool.stats()["timeouts"] == 1
+    finally:
+        pool.shutdown()
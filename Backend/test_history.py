@@ -0,0 +1,75 @@
+"""
+Tests for the analysis history store and its aggregates.
+Run with: python -m pytest test_history.py
+"""
+
+import sqlite3
+import time
+
+from resume_analyzer.history import AnalysisHistory, make_entry
+
+DAY = 86400
+
+
+def result(role, score, missing=(), tips=()):
+    return {"jobRole": role, "atsScore": score, "keywordSuggestions": list(missing), "formattingTips": list(tips)}
+
+
+def test_aggregates_match_the_raw_rows_and_outlive_them(tmp_path):
+    """Incremental aggregates equal a recount; windows select days; pruned rows stay counted."""
+    now = time.time()
+    history = AnalysisHistory(str(tmp_path / "history.db"), batch_size=3, retention_days=30)
+    history.add_many([
+        make_entry("a.pdf", result("dev", 85, ["SQL", "Docker"], ["Quite short (120 words)."]), now),
+        make_entry("b.docx", result("dev", 100, ["SQL"], ["Quite short (98 words)."]), now),
+        make_entry("c.pdf", result("dev", 40, ["Go"]), now - DAY),
+        make_entry("d.pdf", result("data", 0, ["Python"], ["Could not read file text."]), now - 3 * DAY),
+        make_entry("e.pdf", result("data", 55), now - 60 * DAY),
+    ])
+
+    stats = history.stats(days=7, now=now)
+    assert stats["analyses"] == 4 and stats["meanScore"] == 56.2
+    assert [day["analyses"] for day in stats["daily"]] == [1, 1, 2]
+    distribution = {bucket["range"]: bucket["count"] for bucket in stats["scoreDistribution"]}
+    assert distribution["0-9"] == 1 and distribution["80-89"] == 1 and distribution["90-100"] == 1
+    assert stats["roles"]["dev"]["missingKeywords"] == [{"keyword": "SQL", "count": 2},
+                                                        {"keyword": "Docker", "count": 1},
+                                                        {"keyword": "Go", "count": 1}]
+    assert stats["formattingTips"][0] == {"tip": "Quite short (N words).", "count": 2}
+
+    assert history.stats(days=1, role="dev", now=now)["analyses"] == 2
+    # The 60-day-old row was pruned on write, but the aggregates still count it
+    with sqlite3.connect(str(tmp_path / "history.db")) as db:
+        assert db.execute("SELECT COUNT(*) FROM analyses").fetchone()[0] == 4
+    assert history.stats(days=90, role="data", now=now)["analyses"] == 2
+
+
+def test_recorded_results_are_written_in_background_batches(tmp_path):
+    """record() only queues; the writer commits full batches and flush() waits for the rest."""
+    history = AnalysisHistory(str(tmp_path / "history.db"), batch_size=2, flush_seconds=0.05)
+    for score in (10, 20, 30):
+        history.record("resume.pdf", result("dev", score))
+    assert history.flush(timeout=10)
+    status = history.status()
+    assert status["written"] == 3 and 1 < status["batches"] <= 3 and status["failed"] == status["pending"] == 0
+    assert history.stats()["meanScore"] == 20.0
+
+
+def test_writer_survives_a_failing_batch():
+    """A write that raises anything drops that batch only; flush() still returns and later items are written."""
+    from resume_analyzer.writer import BatchWriter
+
+    written = []
+
+    def write(batch):
+        if any(not isinstance(item, int) for item in batch):
+            raise TypeError("not a row")
+        written.extend(batch)
+
+    writer = BatchWriter(write, batch_size=10, flush_seconds=0.05, name="test-writer", description="rows")
+    writer.put("bad")
+    assert writer.flush(timeout=10)
+    assert writer.failed == 1
+    writer.put(1)
+    assert writer.flush(timeout=10)
+    assert written == [1]
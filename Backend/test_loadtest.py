@@ -0,0 +1,69 @@
+"""
+Tests for the HTTP load-test harness.
+Run with: python -m pytest test_loadtest.py
+"""
+
+import json
+import os
+import threading
+
+os.environ.setdefault("RESUME_NLP_WARMUP", "lazy")
+os.environ.setdefault("RESUME_ANALYSIS_WORKERS", "0")
+
+import pytest
+from werkzeug.serving import make_server
+
+import app as backend
+from resume_analyzer import loadtest, resources
+
+
+def test_summary_timeline_and_slo(tmp_path):
+    """Records roll up into totals and intervals; SLO limits are checked by direction."""
+    records = [(0.5, 100.0, 200), (1.5, 300.0, 200), (1.8, 50.0, 503), (2.5, 200.0, 200)]
+    rss = [(0.0, 100.0), (1.0, 120.0), (3.0, 150.0)]
+    summary = loadtest.summarize(records, 3.0, rss)
+    assert summary["requests"] == 4 and summary["ok"] == 3 and summary["errorsByOutcome"] == {"503": 1}
+    assert summary["rps"] == 1.0 and summary["errorRate"] == 0.25
+    assert summary["p50Ms"] == 200.0 and summary["rssGrowthMb"] == 50.0
+    rows = loadtest.timeline(records, 3.0, rss, interval=1.0)
+    assert [row["errors"] for row in rows] == [0, 1, 0]
+    assert [row["rssMb"] for row in rows] == [120.0, 120.0, 150.0]
+
+    path = tmp_path / "slo.json"
+    path.write_text(json.dumps({"minRps": 2, "maxErrorRate": 0.5, "maxP99Ms": 250}))
+    assert loadtest.check_slo(summary, loadtest.load_slo(str(path))) == [
+        "minRps: rps 1.0 < 2", "maxP99Ms: p99Ms 300.0 > 250",
+    ]
+    path.write_text(json.dumps({"maxLatency": 1}))
+    with pytest.raises(ValueError):
+        loadtest.load_slo(str(path))
+
+
+def test_open_and_closed_loop_against_the_app(tmp_path):
+    """Both load models drive the real endpoint with a PDF/DOCX mix; a missed SLO fails the run."""
+    # main() waits for /api/health/ready
+    resources.warm_up(background=False)
+    server = make_server("127.0.0.1", 0, backend.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}"
+        uploads = loadtest.load_corpus(docs=4, pdf_ratio=0.5)
+        assert sorted(name.rsplit(".", 1)[1] for name, _ in uploads) == ["docx", "docx", "pdf", "pdf"]
+
+        closed = loadtest.run_load(url + "/api/analyze-resume", uploads, 1.0, concurrency=2)
+        assert closed and all(outcome == 200 for _, _, outcome in closed)
+        opened = loadtest.run_load(url + "/api/analyze-resume", uploads, 1.0, concurrency=2, rate=10,
+                                   arrivals="uniform")
+        assert 8 <= len(opened) <= 10 and all(outcome == 200 for _, _, outcome in opened)
+
+        slo = tmp_path / "slo.json"
+        slo.write_text(json.dumps({"minRps": 100000}))
+        output = tmp_path / "report.json"
+        status = loadtest.main(["--url", url, "--seconds", "1", "--warmup", "0", "--docs", "2",
+                                "--concurrency", "2", "--slo", str(slo), "--output", str(output)])
+        assert status == 1
+        report = json.loads(output.read_text())
+        assert report["summary"]["errors"] == 0 and report["slo"]["violations"]
+    finally:
+        server.shutdown()
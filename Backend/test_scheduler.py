@@ -0,0 +1,104 @@
+"""
+Tests for size-aware fair scheduling of analyses.
+Run with: python -m pytest test_scheduler.py
+"""
+
+import queue
+import threading
+import time
+
+import pytest
+
+from benchmarks.corpus import make_resume_file
+from resume_analyzer import scheduler
+from resume_analyzer.scheduler import FairQueue, estimate_cost, pdf_page_count
+
+
+def test_cost_estimate_reads_pdf_page_count():
+    """Page counts come from the page tree; costs grow with pages and stop at the analyzed page cap."""
+    one_page, long_pdf = make_resume_file(3, "pdf"), make_resume_file(3, "pdf", pages=10)
+    assert pdf_page_count(one_page) == 2 and pdf_page_count(long_pdf) == 12
+    assert pdf_page_count(b"%PDF-1.7 compressed object streams only") is None
+    assert estimate_cost(make_resume_file(3, "docx"), "r.docx") < estimate_cost(one_page, "r.pdf")
+    assert estimate_cost(one_page, "r.pdf") <= scheduler.FAST_LANE_SECONDS < estimate_cost(long_pdf, "r.pdf")
+    huge = long_pdf.replace(b"/Count 12", b"/Count 500")
+    assert estimate_cost(huge, "r.pdf") < scheduler.PDF_SECONDS_PER_PAGE * 30
+    assert estimate_cost({"text": "parsed"}, "r.pdf") == scheduler.BASE_SECONDS
+
+
+def test_page_count_scan_is_bounded_on_crafted_input():
+    """Inputs made of page tree fragments are scanned in linear time, and large files only at both ends."""
+    crafted = [b"/Count 1 " * 20000, b"/Type /Pages /Count 1 " * 20000, b"<< /Type /Pages " + b" " * 5000000,
+               b"<< /Type/Pages /Count 3 >> " * 400000, b"/Count " + b" " * 5000000 + b"/Type /Pages"]
+    for data in crafted:
+        started = time.perf_counter()
+        pdf_page_count(data)
+        estimate_cost(data, "r.pdf")
+        assert time.perf_counter() - started < 1.0
+    # The page tree root near the start of a large file is still found; one in its middle is not looked for
+    long_pdf = make_resume_file(3, "pdf", pages=10)
+    padding = b"\n" * (3 * scheduler.PDF_SCAN_BYTES)
+    assert pdf_page_count(long_pdf + padding) == 12
+    assert pdf_page_count(padding + long_pdf + padding) is None
+
+
+def drain(jobs):
+    order = []
+    while jobs.qsize():
+        entry = jobs.get()
+        order.append(entry.item)
+        jobs.done(entry)
+    return order
+
+
+def test_shortest_job_first_with_client_fairness_and_aging(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scheduler.time, "monotonic", lambda: now[0])
+
+    jobs = FairQueue(maxsize=10, workers=1, fast_lane_seconds=0.25, aging=0.5, client_share=1.0)
+    jobs.put_nowait("big pdf", 2.0, "a")
+    jobs.put_nowait("docx", 0.02, "a")
+    jobs.put_nowait("pdf", 0.1, "a")
+    assert drain(jobs) == ["docx", "pdf", "big pdf"]
+
+    # A client's queued work counts against it: "b" goes first despite arriving last
+    for i in range(4):
+        jobs.put_nowait(f"a{i}", 0.1, "a")
+    jobs.put_nowait("b0", 0.1, "b")
+    assert drain(jobs)[0] == "b0"
+
+    # A large job that waited long enough beats newer small ones
+    jobs.put_nowait("big pdf", 2.0, "a")
+    now[0] += 5
+    jobs.put_nowait("docx", 0.02, "b")
+    assert drain(jobs) == ["big pdf", "docx"]
+
+
+def test_slow_lane_keeps_a_worker_free_and_clients_share_the_queue():
+    jobs = FairQueue(maxsize=8, workers=4, fast_lane_seconds=0.25, client_share=0.5)
+    for i in range(4):
+        jobs.put_nowait(f"slow{i}", 1.0, f"client{i}")
+    running = [jobs.get() for _ in range(3)]
+    assert jobs.stats() == {"fastQueued": 0, "slowQueued": 1, "slowRunning": 3, "clients": 4}
+
+    # The fourth worker only takes fast jobs while three slow ones run
+    waiting = []
+    worker = threading.Thread(target=lambda: waiting.append(jobs.get()))
+    worker.start()
+    worker.join(0.2)
+    assert worker.is_alive()
+    jobs.put_nowait("docx", 0.02, "client0")
+    worker.join(5)
+    assert waiting[0].item == "docx"
+    jobs.done(waiting[0])
+    jobs.done(running[0])
+    assert jobs.get().item == "slow3"
+
+    for i in range(4):
+        jobs.put_nowait(f"flood{i}", 0.02, "flooder")
+    with pytest.raises(queue.Full):
+        jobs.put_nowait("flood4", 0.02, "flooder")
+    jobs.put_nowait("other", 0.02, "someone else")
+
+    jobs.stop(1)
+    assert len(drain(jobs)) == 5 and jobs.get() is None
@@ -0,0 +1,92 @@
+"""
+Tests for the search index of analyzed resumes.
+Run with: python -m pytest test_search.py
+"""
+
+import pytest
+
+from resume_analyzer.search import InvalidQuery, ResumeIndex, fts_query, section_mask
+
+
+def document(digest, text, score, keywords=(), sections=("skills",), role="developer"):
+    return {
+        "digest": digest,
+        "filename": f"{digest}.pdf",
+        "role": role,
+        "score": score,
+        "keywords": list(keywords),
+        "sections": section_mask(sections),
+        "text": text,
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ResumeIndex(str(tmp_path / "index.db"), batch_size=2)
+    index.add_many([
+        document("a", "Go and Kubernetes platform engineer", 80, ["Go", "Kubernetes"], ("skills", "experience")),
+        document("b", "Kubernetes operator written in C++", 60, ["Kubernetes", "C++"]),
+        document("c", "Frontend developer, React and CSS", 90, ["React"], ("skills", "experience", "education")),
+    ])
+    return index
+
+
+def test_query_translation_quotes_literal_terms():
+    assert fts_query('c++ AND (node.js OR "machine learning") NOT java*') == \
+        '"c++" AND ( "node.js" OR "machine learning" ) NOT "java"*'
+    assert fts_query("keywords:go") == 'keywords:"go"'
+
+
+def test_boolean_queries_filters_and_ranking(index):
+    files = lambda results: [r["file"] for r in results]
+    assert files(index.search("kubernetes AND go")) == ["a.pdf"]
+    assert set(files(index.search("kubernetes"))) == {"a.pdf", "b.pdf"}
+    assert files(index.search("kubernetes NOT go")) == ["b.pdf"]
+    assert files(index.search("c++")) == ["b.pdf"]
+    assert files(index.search("kube*", sort="score")) == ["a.pdf", "b.pdf"]
+    assert files(index.search("kubernetes", min_score=70)) == ["a.pdf"]
+    assert files(index.search(sections=["education"])) == ["c.pdf"]
+    assert files(index.search(max_score=85, limit=1)) == ["a.pdf"]
+
+    result = index.search("operator")[0]
+    assert result["keywords"] == ["Kubernetes", "C++"] and result["sections"] == ["skills"]
+    assert "[operator]" in result["snippet"]
+    with pytest.raises(InvalidQuery):
+        index.search(sections=["hobbies"])
+    with pytest.raises(InvalidQuery):
+        index.search("(go")
+
+
+def test_background_writes_are_batched_and_replace_by_content(index):
+    index.add(document("d", "Rust systems programmer", 70))
+    index.add(document("a", "Go engineer, now writing Rust", 85, ["Go"]))
+    assert index.flush(timeout=10)
+    assert [r["file"] for r in index.search("rust", sort="score")] == ["a.pdf", "d.pdf"]
+    assert index.search("kubernetes AND go") == []
+    stats = index.stats()
+    assert stats["documents"] == 4 and stats["pending"] == 0 and stats["failed"] == 0
+
+
+def test_near_duplicates_are_clustered_and_collapsed(tmp_path):
+    """Resumes written with signatures join the cluster of an earlier near duplicate; collapse keeps one."""
+    from benchmarks.corpus import make_resume_text
+    from resume_analyzer.dedupe import minhash
+
+    original = make_resume_text(1)
+    copy = original.replace("\n", "\nPython\n", 1)
+    index = ResumeIndex(str(tmp_path / "index.db"))
+    documents = [document("a", original, 70), document("b", copy, 75), document("c", make_resume_text(2), 60)]
+    for entry in documents:
+        entry["signature"] = minhash(entry["text"])
+    index.add_many(documents)
+
+    assert len(index.search(sort="score")) == 3
+    # Each group is shown as its best-ranked match, not its first resume
+    collapsed = index.search(sort="score", collapse=True)
+    assert [(r["file"], r["duplicates"]) for r in collapsed] == [("b.pdf", 1), ("c.pdf", 0)]
+    assert [r["file"] for r in index.search(sort="score", max_score=72, collapse=True)] == ["a.pdf", "c.pdf"]
+    # A group is found when only a duplicate matches the query
+    assert [(r["file"], r["duplicates"]) for r in index.search("python", collapse=True)] == [("b.pdf", 1)]
+    # Replacing the representative keeps its id, so the cluster stays intact
+    index.add_many([dict(documents[0], score=95)])
+    assert [r["atsScore"] for r in index.search(sort="score", collapse=True)] == [95, 60]
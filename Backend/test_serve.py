@@ -0,0 +1,81 @@
+"""
+Tests for the production server entry point.
+Run with: python -m pytest test_serve.py
+"""
+
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+from benchmarks.common import encode_multipart
+from benchmarks.corpus import make_docx_bytes, make_resume_text
+from resume_analyzer import serve
+
+
+def test_server_options_and_preload_freeze():
+    """Workers default to one per CPU; preload leaves the loaded heap frozen for fork."""
+    options = serve.server_options(workers=None, threads=4, max_requests=0)
+    assert options["workers"] == (serve.SERVER_WORKERS or os.cpu_count() or 1)
+    assert options["worker_class"] == "gthread" and options["preload_app"]
+    assert options["max_requests"] == 0
+    assert serve.default_workers(8) == 8
+
+    try:
+        serve.preload()
+        from resume_analyzer import resources
+        assert resources.is_ready()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+
+
+def test_serve_answers_requests_from_forked_workers():
+    """python -m resume_analyzer.serve preloads, forks and serves the API."""
+    pytest.importorskip("gunicorn")
+    port = 5091
+    # Served with the production defaults, not the inline analyses the API tests set up
+    env = {name: value for name, value in os.environ.items() if name not in serve.APP_ENVIRONMENT}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "resume_analyzer.serve", "--bind", f"127.0.0.1:{port}", "--workers", "2"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health/ready", timeout=2) as response:
+                    assert response.status == 200
+                    break
+            except OSError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.25)
+
+        body, content_type = encode_multipart({"resumeFile": ("resume.docx", make_docx_bytes(make_resume_text(2)))})
+        request = urllib.request.Request(f"http://127.0.0.1:{port}/api/analyze-resume", data=body,
+                                         headers={"Content-Type": content_type})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            assert json.loads(response.read())["atsScore"] > 0
+        # Every worker analyzes in a pool of its own, under its timeout and queue limits
+        for _ in range(4):
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=30) as response:
+                assert json.loads(response.read())["analysisPool"]["workers"] == 1
+
+        # An async job is visible to whichever worker a poll reaches
+        request = urllib.request.Request(f"http://127.0.0.1:{port}/api/analyze-resume?async=1", data=body,
+                                         headers={"Content-Type": content_type})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            status_url = json.loads(response.read())["statusUrl"]
+        for _ in range(10):
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}{status_url}", timeout=30) as response:
+                assert response.status == 200
+                assert json.loads(response.read())["status"] in ("queued", "running", "done")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
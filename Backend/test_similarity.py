@@ -0,0 +1,50 @@
+"""
+Tests for resume vs job description similarity.
+Run with: python -m pytest test_similarity.py
+"""
+
+from resume_analyzer.similarity import IdfTable, ResumeMatrix, job_match, term_counts
+
+RESUMES = {
+    "backend": "Python developer building Django REST APIs on PostgreSQL and Docker.",
+    "frontend": "Frontend engineer: React, TypeScript, CSS and accessibility.",
+    "data": "Data scientist using Python, pandas and scikit-learn for machine learning models.",
+}
+JOB = "We are hiring a backend Python developer with Django, PostgreSQL and Docker experience."
+
+
+def test_terms_skip_stopwords_and_numbers():
+    counts = term_counts("The C++ and Node.js developer, 2019 to 2021, shipped C++ code")
+    assert counts["c++"] == 2
+    assert "node.js" in counts
+    assert "the" not in counts and "2019" not in counts
+
+
+def test_idf_table_round_trip(tmp_path):
+    """Rare terms weigh more; the table survives save/load; unseen terms get the maximum."""
+    table = IdfTable.build(RESUMES.values())
+    assert table.documents == 3
+    assert table.weight("django") > table.weight("python")
+    assert table.weight("never-seen") > table.weight("django")
+
+    path = tmp_path / "idf.json"
+    table.save(path)
+    loaded = IdfTable.load(path)
+    assert loaded.documents == 3
+    assert abs(loaded.weight("django") - table.weight("django")) < 1e-6
+
+
+def test_job_match_and_matrix_ranking_agree():
+    """Ranking with one sparse product orders resumes like job_match, best first."""
+    idf = IdfTable.build(RESUMES.values())
+    matrix = ResumeMatrix(idf)
+    for name, text in RESUMES.items():
+        matrix.add(name, text)
+    ranked = matrix.rank(JOB, top_k=2)
+    assert [name for name, _ in ranked] == ["backend", "data"]
+
+    match = job_match(RESUMES["backend"], JOB)
+    assert 0 < match["score"] <= 100
+    assert {"django", "postgresql"} <= set(match["matchedTerms"])
+    assert "hiring" in match["missingTerms"]
+    assert job_match(RESUMES["frontend"], JOB)["score"] < match["score"]